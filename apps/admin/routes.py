@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends
+from apps.config.config import get_settings
+from apps.config.database import async_engine, async_read_engine, engine, pool_metrics, read_engine
+from apps.users.models import User
+from apps.common.security import require_admin
+from apps.common.responses import success_response
+from apps.common.singleflight import flight_groups
+
+settings = get_settings()
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+def _engines():
+    engines = {"primary": engine, "replica": read_engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if async_read_engine is not None:
+        engines["replica_async"] = async_read_engine.sync_engine
+    return {name: bound for name, bound in engines.items() if bound is not None}
+
+
+@router.get("/db-pool", response_model=None)
+async def get_db_pool_metrics(reset: bool = False, _: User = Depends(require_admin)):
+    """
+    Connection pool configuration and counters (Admin only).
+
+    - reset: Zero the counters after reading them (default: false)
+    """
+    data = {
+        "config": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+        },
+        "engines": {
+            name: pool_metrics[name].snapshot(bound.pool)
+            for name, bound in _engines().items()
+        },
+    }
+    if reset:
+        for metrics in pool_metrics.values():
+            metrics.reset()
+    return success_response(data=data, message="Pool metrics retrieved")
+
+
+@router.get("/request-coalescing", response_model=None)
+async def get_request_coalescing_metrics(reset: bool = False, _: User = Depends(require_admin)):
+    """
+    Request coalescing counters per router (Admin only).
+
+    `coalesced` counts requests that shared another request's query
+    instead of running their own.
+
+    - reset: Zero the counters after reading them (default: false)
+    """
+    data = {name: group.snapshot() for name, group in flight_groups.items()}
+    if reset:
+        for group in flight_groups.values():
+            group.reset()
+    return success_response(data=data, message="Request coalescing metrics retrieved")
@@ -12,8 +12,8 @@ settings = get_settings()
 router = APIRouter(prefix="/api/v1/auth", tags=["authentication"])
 
 @router.post("/login")
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, credentials.email, credentials.password)
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+    user = await authenticate_user(db, credentials.email, credentials.password)
     
     if not user:
         raise HTTPException(
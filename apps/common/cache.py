@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import orjson
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    A ttl of 0 disables caching: every get is a miss and set is a no-op.
+    Counters (incr/counter) live beside the entries in their own LRU of
+    `max_counters`. They start from the clock rather than 0, so neither a
+    restarted process nor a counter evicted and seeded again ever hands
+    out a value it issued before.
+    """
+
+    # Entries and counters are visible to this process only
+    shared = False
+
+    def __init__(self, maxsize: int, ttl: float, max_counters: int = 65536):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_counters = max_counters
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._counters: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _counter(self, key: Hashable) -> int:
+        value = self._counters.get(key)
+        if value is None:
+            value = self._counters[key] = time.time_ns()
+            while len(self._counters) > self.max_counters:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+        return value
+
+    def incr(self, key: Hashable) -> int:
+        with self._lock:
+            self._counters[key] = self._counter(key) + 1
+            return self._counters[key]
+
+    def counter(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            return self._counter(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "counters": len(self._counters),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RedisCache:
+    """
+    TTLCache's interface over a Redis-protocol server, shared by every worker.
+
+    Keys are prefixed with `namespace` and values are stored as JSON, so
+    they come back as plain JSON types (datetimes as ISO strings). The
+    cache never fails a request: when the server is unreachable a get is
+    a miss, writes are dropped and `errors` is counted.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, ttl: float, namespace: str = ""):
+        # Only Redis-backed deployments need the client
+        import redis
+
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._error = redis.RedisError
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            return getattr(self._client, method)(*args, **kwargs)
+        except self._error:
+            self.errors += 1
+            return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._call("get", self.namespace + key)
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return orjson.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._call("set", self.namespace + key, orjson.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._call("delete", self.namespace + key)
+
+    def incr(self, key: str) -> Optional[int]:
+        # Seeded from the clock, like TTLCache, so a flushed server never
+        # reissues a value
+        key = self.namespace + key
+        self._call("set", key, time.time_ns(), nx=True)
+        return self._call("incr", key)
+
+    def counter(self, key: str) -> Optional[int]:
+        """The counter's value, or None when the server is unreachable"""
+        key = self.namespace + key
+        value = self._call("get", key)
+        if value is None:
+            self._call("set", key, time.time_ns(), nx=True)
+            value = self._call("get", key)
+        return None if value is None else int(value)
+
+    def clear(self) -> None:
+        keys = self._call("keys", self.namespace + "*")
+        if keys:
+            self._call("delete", *keys)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def stats(self) -> dict:
+        """Hit/miss/error counters"""
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def build_cache(url: Optional[str], maxsize: int, ttl: float, namespace: str = ""):
+    """A RedisCache when `url` is set, otherwise a per-process TTLCache"""
+    if url:
+        return RedisCache(url, ttl=ttl, namespace=namespace)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,54 @@
+import hashlib
+from typing import Optional
+from starlette.requests import HTTPConnection
+from apps.config.config import get_settings
+from apps.common.cache import TTLCache
+
+settings = get_settings()
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Bearer tokens (hashed) that made a successful write within the window
+recent_writers = TTLCache(maxsize=100000, ttl=settings.read_your_writes_seconds)
+
+
+def client_key(headers) -> Optional[str]:
+    """Stable key for the caller's bearer token, or None when anonymous"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def is_recent_writer(connection: HTTPConnection) -> bool:
+    key = client_key(connection.headers)
+    return key is not None and recent_writers.get(key) is not None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Remembers which clients just wrote, for get_read_db.
+
+    Any successful POST/PUT/PATCH/DELETE made with a bearer token pins
+    that token to the primary database for READ_YOUR_WRITES_SECONDS. The
+    record is per process; behind several workers a client may still
+    reach a worker that has not seen its write.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        key = client_key(HTTPConnection(scope).headers)
+        if key is None:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                recent_writers.set(key, True)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,43 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from apps.config.database import reads_from_primary
+from apps.common.versions import shared_versions
+
+# Cache-Control policies: clients may keep a copy but must revalidate it
+# (If-None-Match) before every use
+PUBLIC_REVALIDATE = "public, no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def validators(request: Request, versions: Optional[tuple], *parts, cache_control: str) -> dict:
+    """
+    Caching headers for a representation built at `versions`.
+
+    The strong ETag is a digest of the version counters and `parts` (the
+    resource and whatever else the payload depends on, e.g. the caller),
+    so it is known before the database is queried. It is left out when
+    the counters are unavailable or the data comes from a read replica,
+    which may not have caught up with them yet, and when the counters are
+    per process and no single worker is declared (see shared_versions):
+    another worker's commit would not change them, so this worker would
+    keep answering 304 for stale data.
+    """
+    headers = {"Cache-Control": cache_control}
+    if versions is not None and shared_versions() and reads_from_primary(request):
+        digest = hashlib.blake2b(repr((parts, versions)).encode(), digest_size=12).hexdigest()
+        headers["ETag"] = f'"{digest}"'
+    return headers
+
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """A 304 when the request's If-None-Match names the current ETag, else None"""
+    etag = headers.get("ETag")
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or if_none_match is None:
+        return None
+    # If-None-Match uses the weak comparison: compressed responses carry W/
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,37 @@
+"""
+Eager-loading plans, one per to_dict() shape.
+
+Each function returns the loader options covering every relationship the
+matching to_dict() call reads, so serialization never lazy-loads (and
+never touches the database from the event loop in async mode).
+Collections use selectinload: one extra `IN` query for all parents, and
+parent columns are not repeated per child row as with a joined
+collection. Many-to-one references are joined onto the same query.
+"""
+from typing import List
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.users.models import User
+
+
+def course_options(include_enrollments: bool = False) -> List[LoaderOption]:
+    """For Course.to_dict(include_enrollments): the roster's students"""
+    if not include_enrollments:
+        return []
+    return [selectinload(Course.enrollments).joinedload(Enrollment.user)]
+
+
+def user_options(include_enrollments: bool = False) -> List[LoaderOption]:
+    """For User.to_dict(include_enrollments): the enrolled courses"""
+    if not include_enrollments:
+        return []
+    return [selectinload(User.enrollments).joinedload(Enrollment.course)]
+
+
+def enrollment_options(include_relations: bool = True) -> List[LoaderOption]:
+    """For Enrollment.to_dict(include_relations): its student and course"""
+    if not include_relations:
+        return []
+    return [joinedload(Enrollment.user), joinedload(Enrollment.course)]
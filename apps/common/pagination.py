@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import String, func, tuple_, type_coerce
+from sqlalchemy.orm import Query
+from apps.common.cache import TTLCache
+from apps.config.config import get_settings
+
+settings = get_settings()
+
+MAX_PAGE_SIZE = 1000
+
+# Recent exact totals of unfiltered listings, served (marked inexact)
+# when a page cannot compute its total for free
+list_total_cache = TTLCache(maxsize=64, ttl=settings.list_total_cache_seconds)
+
+
+class Page:
+    """One page of a listing plus its pagination metadata"""
+
+    def __init__(self, items: list, next_cursor: Optional[str], total: Optional[int],
+                 total_is_exact: bool, skip: int, limit: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.total_is_exact = total_is_exact
+        self.skip = skip
+        self.limit = limit
+
+    def to_dict(self, serialize_items: Callable[[list], list]) -> dict:
+        """Build the standard list payload, serializing the items in one batch"""
+        return {
+            "items": serialize_items(self.items),
+            "total": self.total,
+            "total_is_exact": self.total_is_exact,
+            "skip": self.skip,
+            "limit": self.limit,
+            "next_cursor": self.next_cursor
+        }
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def parse_sort(sort: str, allowed_fields: Sequence[str]) -> Tuple[str, bool]:
+    """Parse a sort spec like "created_at" or "-created_at" into (field, descending)"""
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in allowed_fields:
+        raise _bad_request(
+            f"Cannot sort by '{field}'. Allowed: {', '.join(allowed_fields)}")
+    return field, descending
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """Encode the sort key of the last row into an opaque cursor"""
+    payload = {
+        "s": sort,
+        "v": [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: List[Any]) -> List[Any]:
+    """Decode a cursor back into typed sort key values for `columns`"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = payload["v"]
+        if payload["s"] != sort or len(values) != len(columns):
+            raise ValueError("cursor does not match sort")
+        return [
+            datetime.fromisoformat(v) if column.type.python_type is datetime else v
+            for column, v in zip(columns, values)
+        ]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise _bad_request("Invalid cursor")
+
+
+def _comparable(query: Query, column, value):
+    """
+    Adapt a keyset bound to how the backend stores the column.
+
+    SQLite keeps CURRENT_TIMESTAMP values as 'YYYY-MM-DD HH:MM:SS' text and
+    compares them as strings, so datetime bounds are rendered the same way
+    instead of SQLAlchemy's default microsecond format.
+    """
+    if isinstance(value, datetime) and query.session.get_bind().dialect.name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return type_coerce(column, String), value.strftime(fmt)
+    return column, value
+
+
+def supports_window_functions(dialect) -> bool:
+    """Whether COUNT(*) OVER () can be attached to the page query"""
+    if dialect.name == "sqlite":
+        return (dialect.server_version_info or (0,)) >= (3, 25)
+    return dialect.name in ("postgresql", "mysql", "mariadb", "mssql", "oracle")
+
+
+def paginate(
+    query: Query,
+    model,
+    *,
+    sort: Optional[str],
+    allowed_sorts: Sequence[str],
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    total_cache_key: Optional[str] = None,
+    rank_by=None,
+) -> Page:
+    """
+    Fetch one page of `query` ordered by a stable (sort field, id) key.
+
+    With a cursor the page starts right after the row it encodes (keyset
+    pagination), so every page costs the same as the first. Without one,
+    `skip` is applied as a legacy OFFSET. next_cursor is None on the last page.
+
+    Totals are only computed when include_total is set. Offset pages get
+    them from a COUNT(*) OVER () column on the page query itself; cursor
+    pages (whose WHERE clause hides earlier rows) fall back to a recently
+    cached total when `total_cache_key` names an unfiltered listing, and
+    to a separate COUNT otherwise.
+
+    `rank_by` (e.g. a search relevance ordering) replaces the sort key;
+    ranked pages are offset-only and never issue a cursor.
+
+    `query` may select `model` itself or a DictBundle projection of it
+    (see apps/common/projections.py); projected pages hold the bundles'
+    dicts.
+    """
+    base_query = query
+    if rank_by is not None:
+        if cursor:
+            raise _bad_request(
+                "Cursor pagination is not available for ranked results; use skip or pass sort")
+        key_columns = []
+        order_by = [rank_by, model.id.asc()]
+    else:
+        field, descending = parse_sort(sort, allowed_sorts)
+        key_columns = [getattr(model, field)]
+        if field != "id":
+            key_columns.append(model.id)
+        order_by = [column.desc() if descending else column.asc() for column in key_columns]
+
+    if cursor:
+        if skip:
+            raise _bad_request("Use either skip or cursor, not both")
+        bounds = [
+            _comparable(query, column, value)
+            for column, value in zip(key_columns, decode_cursor(cursor, sort, key_columns))
+        ]
+        left = tuple_(*[column for column, _ in bounds])
+        right = tuple_(*[value for _, value in bounds])
+        query = query.filter(left < right if descending else left > right)
+
+    query = query.order_by(*order_by)
+    if skip:
+        query = query.offset(skip)
+
+    # Entity queries page ORM instances, bundle projections their dicts;
+    # both come back wrapped in rows when the total column rides along
+    entity_query = query.column_descriptions[0]["expr"] is model
+    windowed = (include_total and not cursor
+                and supports_window_functions(query.session.get_bind().dialect))
+    if windowed:
+        query = query.add_columns(func.count().over().label("total"))
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit] if entity_query and not windowed else [row[0] for row in rows[:limit]]
+
+    total, total_is_exact = None, False
+    if include_total:
+        if windowed and (rows or not skip):
+            total, total_is_exact = (rows[0].total if rows else 0), True
+        else:
+            cached = list_total_cache.get(total_cache_key) if total_cache_key else None
+            if cached is not None:
+                total = cached
+            else:
+                total, total_is_exact = base_query.count(), True
+        if total_is_exact and total_cache_key:
+            list_total_cache.set(total_cache_key, total)
+
+    next_cursor = None
+    if len(rows) > limit and items and key_columns:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, [
+            last[column.key] if isinstance(last, dict) else getattr(last, column.key)
+            for column in key_columns
+        ])
+
+    return Page(items, next_cursor, total, total_is_exact, skip, limit)
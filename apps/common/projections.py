@@ -0,0 +1,54 @@
+"""
+Column projections for the paginated list endpoints.
+
+Each listing selects exactly the columns of its response schema, loaded
+as one plain dict per row (a DictBundle, with nested objects as nested
+DictBundles) that the schema's serializer reads directly, so a page
+never hydrates ORM instances (identity map entries, instance state,
+change tracking) only to flatten them.
+"""
+from sqlalchemy.orm import Bundle, Query, Session
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.users.models import User
+
+
+class DictBundle(Bundle):
+    """A Bundle that loads as a plain dict rather than a Row"""
+
+    def create_row_processor(self, query, procs, labels):
+        def proc(row):
+            return dict(zip(labels, (process(row) for process in procs)))
+        return proc
+
+COURSE_COLUMNS = (
+    Course.id, Course.title, Course.code, Course.capacity, Course.is_active,
+    Course.enrolled_count, (Course.enrolled_count >= Course.capacity).label("is_full"),
+    Course.created_at, Course.updated_at,
+)
+
+USER_COLUMNS = (
+    User.id, User.name, User.email, User.role, User.is_active, User.created_at, User.updated_at,
+)
+
+ENROLLMENT_COLUMNS = (
+    Enrollment.id, Enrollment.user_id, Enrollment.course_id, Enrollment.created_at, Enrollment.updated_at,
+    DictBundle("user", User.id, User.name, User.email, User.role),
+    DictBundle("course", Course.id, Course.title, Course.code, Course.capacity, Course.is_active),
+)
+
+
+def course_rows(db: Session) -> Query:
+    return db.query(DictBundle("course", *COURSE_COLUMNS))
+
+
+def user_rows(db: Session) -> Query:
+    return db.query(DictBundle("user", *USER_COLUMNS))
+
+
+def enrollment_rows(db: Session) -> Query:
+    return (
+        db.query(DictBundle("enrollment", *ENROLLMENT_COLUMNS))
+        .join(User, Enrollment.user_id == User.id)
+        .join(Course, Enrollment.course_id == Course.id)
+    )
@@ -0,0 +1,148 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from apps.config.config import get_settings
+
+settings = get_settings()
+
+
+class LazyLoadError(RuntimeError):
+    """A relationship was lazy-loaded while strict mode was on"""
+
+
+class QueryStats:
+    """SQL statements and database time for one request or tracked block"""
+
+    def __init__(self, strict: bool = False, keep_statements: bool = False):
+        self.strict = strict
+        self.count = 0
+        self.duration_ms = 0.0
+        self.lazy_loads: List[str] = []
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, duration_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            if self.statements is not None:
+                self.statements.append(statement)
+
+    def record_lazy_load(self, attribute: str) -> None:
+        with self._lock:
+            self.lazy_loads.append(attribute)
+
+
+# Stats for the request being served; run_in_threadpool and the asyncio
+# extension's greenlets both carry it into the code that runs the queries
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Process-wide recorders (record_queries), which see every thread's statements
+_recorders: List[QueryStats] = []
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _active() -> List[QueryStats]:
+    stats = _current.get()
+    return _recorders + [stats] if stats is not None else _recorders
+
+
+@contextmanager
+def track_queries(strict: bool = False):
+    """Count the statements issued by the current context (request or task)"""
+    stats = QueryStats(strict=strict)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def record_queries():
+    """
+    Count every statement issued in the process while the block runs.
+
+    Unlike track_queries this is not tied to the calling context, so it
+    also sees the queries of requests served on another thread, e.g. the
+    TestClient's event loop. Statements are kept for failure messages.
+    """
+    stats = QueryStats(keep_statements=True)
+    _recorders.append(stats)
+    try:
+        yield stats
+    finally:
+        _recorders.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    targets = _active()
+    if targets:
+        duration_ms = (time.perf_counter() - context._query_stats_start) * 1000
+        for stats in targets:
+            stats.record_statement(statement, duration_ms)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # Only lazy loads set lazy_loaded_from; selectin/subquery eager loads don't
+    if not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+        return
+    targets = _active()
+    if not targets:
+        return
+    path = orm_execute_state.loader_strategy_path
+    attribute = str(path[-1]) if path else orm_execute_state.lazy_loaded_from.class_.__name__
+    for stats in targets:
+        stats.record_lazy_load(attribute)
+        if stats.strict:
+            raise LazyLoadError(
+                f"Lazy load of {attribute} while STRICT_LAZY_LOADS is on; "
+                f"eager-load it in the query (joinedload/selectinload)"
+            )
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL issued while serving each request.
+
+    With `headers` on (DEBUG) the counts are returned as X-DB-Query-Count,
+    X-DB-Query-Time-Ms and X-DB-Lazy-Loads. With `strict` on
+    (STRICT_LAZY_LOADS) a lazy relationship load raises LazyLoadError
+    instead of silently issuing one query per row.
+    """
+
+    def __init__(self, app, headers: bool = settings.debug, strict: bool = settings.strict_lazy_loads):
+        self.app = app
+        self.headers = headers
+        self.strict = strict
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with track_queries(strict=self.strict) as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and self.headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Query-Time-Ms"] = f"{stats.duration_ms:.2f}"
+                    headers["X-DB-Lazy-Loads"] = str(len(stats.lazy_loads))
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
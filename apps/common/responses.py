@@ -1,4 +1,8 @@
 from typing import Any, Optional
+import orjson
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 class StandardResponse(BaseModel):
@@ -7,13 +11,31 @@ class StandardResponse(BaseModel):
     message: str
     data: Optional[Any] = None
 
-def success_response(data: Any = None, message: str = "Success") -> dict:
-    """Helper to create a standard success response"""
-    return {
+class APIResponse(ORJSONResponse):
+    """
+    The app's JSON response, encoded with orjson.
+
+    Datetimes, enums and UUIDs are encoded natively; any other type orjson
+    does not know (e.g. a pydantic model) goes through jsonable_encoder.
+    Output is compact UTF-8, like Starlette's JSONResponse.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+def success_response(data: Any = None, message: str = "Success", status_code: int = status.HTTP_200_OK,
+                     headers: Optional[dict] = None) -> APIResponse:
+    """
+    Helper to create a standard success response.
+
+    The envelope is returned as a response rather than a dict so FastAPI
+    does not walk it with jsonable_encoder first.
+    """
+    return APIResponse(status_code=status_code, content={
         "status": "success",
         "message": message,
         "data": data
-    }
+    }, headers=headers)
 
 def error_response(message: str = "Error", data: Any = None) -> dict:
     """Helper to create a standard error response"""
@@ -0,0 +1,7 @@
+import re
+from typing import List
+
+
+def search_terms(term: str) -> List[str]:
+    """Split a search string into lowercase word tokens"""
+    return re.findall(r"\w+", term.lower())
@@ -1,32 +1,81 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from apps.config.config import get_settings
 from apps.config.database import get_db
+from apps.common.cache import build_cache
 from apps.users.models import User, UserRole
 from apps.users.schemas import TokenData
 
 settings = get_settings()
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+security = HTTPBearer()
 
 
-security = HTTPBearer()
+# Column snapshots of recently authenticated users, keyed by token subject.
+# Shared through CACHE_URL when set; otherwise each worker keeps its own, and
+# an update committed by one worker only evicts the snapshot there.
+principal_cache = build_cache(
+    settings.cache_url,
+    maxsize=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+    namespace="lms:principals:"
+)
+
+_UNCACHED_COLUMNS = {"hashed_password"}
+_TIMESTAMP_COLUMNS = {"created_at", "updated_at"}
+
+
+def _snapshot(user: User) -> dict:
+    """The user's columns as JSON values, without the password hash"""
+    snapshot = {}
+    for attr in inspect(User).column_attrs:
+        if attr.key in _UNCACHED_COLUMNS:
+            continue
+        value = getattr(user, attr.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UserRole):
+            value = value.value
+        snapshot[attr.key] = value
+    return snapshot
 
 
-def hash_password(password: str) -> str:
-    """Hash a plain password"""
-    return pwd_context.hash(password)
+def _attach_cached_principal(db: Session, snapshot: dict) -> User:
+    """Rebuild a cached user as a persistent instance of `db` without a SELECT"""
+    columns = dict(snapshot, role=UserRole(snapshot["role"]))
+    for key in _TIMESTAMP_COLUMNS:
+        if columns.get(key) is not None:
+            columns[key] = datetime.fromisoformat(columns[key])
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+def invalidate_principal(email: str) -> None:
+    """Drop a user from the principal cache"""
+    principal_cache.delete(email)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_flush(mapper, connection, target):
+    # Evict now, and again once the change is committed so a concurrent
+    # request cannot re-cache the pre-commit row
+    invalidate_principal(target.email)
+    pending = Session.object_session(target).info.setdefault("principal_invalidations", set())
+    pending.add(target.email)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for email in session.info.pop("principal_invalidations", ()):
+        invalidate_principal(email)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -67,12 +116,17 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    cached = principal_cache.get(token_data.email)
+    if cached is not None:
+        return await db.run_sync(_attach_cached_principal, cached)
+
     from apps.users.services import get_user_by_email
-    user = get_user_by_email(db, email=token_data.email)
+    user = await db.run_sync(get_user_by_email, token_data.email)
 
     if user is None:
         raise credentials_exception
 
+    principal_cache.set(token_data.email, _snapshot(user))
     return user
 
 
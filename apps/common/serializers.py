@@ -0,0 +1,74 @@
+import typing
+from typing import Any, Dict, List, Sequence
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer, core_schema
+from sqlalchemy.orm.attributes import instance_dict
+
+
+def _computed_fields(schema: typing.Type[BaseModel]) -> typing.Tuple[str, ...]:
+    return tuple(schema.__pydantic_decorators__.computed_fields)
+
+
+def _dict_schema(schema: typing.Type[BaseModel]) -> core_schema.TypedDictSchema:
+    """
+    A typed-dict core schema with the response schema's output fields.
+
+    Computed fields are plain keys of the input, and nested schemas (or
+    lists of them) become nested typed dicts. Values pass through as they
+    are: datetimes and enums are left for orjson to encode, so they render
+    exactly as the models' to_dict() did.
+    """
+    fields: Dict[str, core_schema.TypedDictField] = {}
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        nested = typing.get_args(annotation)[0] if typing.get_origin(annotation) in (list, List) else annotation
+        if isinstance(nested, type) and issubclass(nested, BaseModel):
+            value_schema = _dict_schema(nested)
+            if nested is not annotation:
+                value_schema = core_schema.list_schema(value_schema)
+        else:
+            value_schema = core_schema.any_schema()
+        fields[name] = core_schema.typed_dict_field(value_schema)
+    for name in _computed_fields(schema):
+        fields[name] = core_schema.typed_dict_field(core_schema.any_schema())
+    return core_schema.typed_dict_schema(fields)
+
+
+class Serializer:
+    """
+    Precompiled pydantic-core serializer for one response schema.
+
+    Reads plain dicts, such as the rows of the list projections
+    (apps/common/projections.py), and writes each item's output dict in
+    pydantic-core: no model is built per row, and keys the schema does
+    not declare are dropped. ORM instances of flat schemas are read
+    attribute by attribute; nested ORM shapes use the models' to_dict().
+    """
+
+    def __init__(self, schema: typing.Type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields) + _computed_fields(schema)
+        self._one = SchemaSerializer(_dict_schema(schema))
+        self._many = SchemaSerializer(core_schema.list_schema(_dict_schema(schema)))
+
+    def _source(self, obj) -> dict:
+        if isinstance(obj, dict):
+            return obj
+        # The loaded state holds the columns; properties (is_full) and
+        # expired columns go through attribute access
+        state = instance_dict(obj)
+        missing = [name for name in self.fields if name not in state]
+        if not missing:
+            return state
+        source = dict(state)
+        for name in missing:
+            source[name] = getattr(obj, name)
+        return source
+
+    def one(self, obj) -> Any:
+        return self._one.to_python(self._source(obj))
+
+    def many(self, objs: Sequence) -> List[Any]:
+        if objs and not isinstance(objs[0], dict):
+            objs = [self._source(obj) for obj in objs]
+        return self._many.to_python(objs)
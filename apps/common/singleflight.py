@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Every SingleFlight by name, reported by GET /api/v1/admin/request-coalescing
+flight_groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one execution.
+
+    The first caller for a key runs the call; callers that arrive with the
+    same key while it is in flight await its result (or exception) instead
+    of running their own. Nothing is kept afterwards: once the call
+    finishes, the next caller for the key runs it again. Keys must capture
+    everything the result depends on (resource, parameters, data versions,
+    and which database the caller may read). State is per process.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        flight_groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so one caller disconnecting does not cancel everyone's call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Marks the exception retrieved even if every caller went away
+            task.exception()
+
+    def snapshot(self) -> dict:
+        """Counters and the number of calls currently in flight"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+            "in_flight": len(self._in_flight),
+        }
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.executions = 0
@@ -0,0 +1,112 @@
+"""
+Version counters for cached and conditional reads.
+
+Every committed change bumps the counters of the data it affects:
+
+    course:{id}    one course, including its seat count
+    courses        any course
+    user:{id}      one user, or that user's enrollments
+    users          any user
+    enrollments    any enrollment
+
+The catalog cache keys and the ETags are derived from these counters
+rather than from the data, so neither survives a change. Readers take the
+counters before querying: a read that races a commit is labelled with
+the old values and never matches again.
+
+Changes are recorded on the session and applied after commit. Inserts,
+updates and deletes made through the ORM are recorded by mapper events;
+statements that bypass the mapper (the seat-count UPDATEs, the
+enrollment insert) call mark_course_changed / mark_enrollment_changed.
+
+With CACHE_URL set the counters live in Redis and every worker sees every
+change; otherwise they are per process, which is only exact for a single
+worker. ETags and the catalog cache are only used when shared_versions()
+says every worker sees every bump.
+"""
+from typing import Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from apps.config.config import get_settings
+from apps.common.cache import build_cache
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.users.models import User
+
+settings = get_settings()
+
+version_store = build_cache(settings.cache_url, maxsize=0, ttl=0, namespace="lms:versions:")
+
+COURSES = "courses"
+USERS = "users"
+ENROLLMENTS = "enrollments"
+
+
+def course_key(course_id: int) -> str:
+    return f"course:{course_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def shared_versions() -> bool:
+    """
+    Whether the counters follow every worker's commits: they live in Redis,
+    or SINGLE_WORKER=true declares that one worker serves every request.
+    """
+    return version_store.shared or settings.single_worker
+
+
+def current(*keys: str) -> Optional[Tuple[int, ...]]:
+    """The counters' values, or None when the store is unreachable"""
+    values = tuple(version_store.counter(key) for key in keys)
+    return None if None in values else values
+
+
+def mark_changed(db: Session, *keys: str) -> None:
+    """Bump these counters once `db` commits"""
+    db.info.setdefault("version_bumps", set()).update(keys)
+
+
+def mark_course_changed(db: Session, course_id: int) -> None:
+    mark_changed(db, course_key(course_id), COURSES)
+
+
+def mark_enrollment_changed(db: Session, user_id: int, course_id: int) -> None:
+    mark_changed(db, user_key(user_id), ENROLLMENTS)
+    mark_course_changed(db, course_id)
+
+
+@event.listens_for(Course, "after_insert")
+def _course_inserted(mapper, connection, target):
+    mark_changed(Session.object_session(target), COURSES)
+
+
+@event.listens_for(Course, "after_update")
+@event.listens_for(Course, "after_delete")
+def _course_changed(mapper, connection, target):
+    mark_course_changed(Session.object_session(target), target.id)
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    mark_changed(Session.object_session(target), USERS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    mark_changed(Session.object_session(target), user_key(target.id), USERS)
+
+
+@event.listens_for(Enrollment, "after_insert")
+@event.listens_for(Enrollment, "after_delete")
+def _enrollment_changed(mapper, connection, target):
+    mark_enrollment_changed(Session.object_session(target), target.user_id, target.course_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    for key in session.info.pop("version_bumps", ()):
+        version_store.incr(key)
@@ -1,14 +1,43 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./lms.db"
+    database_async: bool = False
+    read_database_url: Optional[str] = None
+    read_your_writes_seconds: int = 5
+    check_migrations_on_startup: bool = True
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    sqlite_profile: Literal["default", "performance"] = "default"
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size_kib: int = 65536
+    sqlite_busy_timeout_ms: int = 5000
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     app_name: str = "LMS"
     debug: bool = True
+    strict_lazy_loads: bool = False
+    list_total_cache_seconds: int = 5
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_size: int = 10000
+    cache_url: Optional[str] = None
+    course_cache_ttl_seconds: int = 60
+    course_cache_max_size: int = 1024
+    single_worker: bool = False
+    availability_heartbeat_seconds: float = 15
+    availability_max_courses: int = 50
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 64
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
     
     class Config:
         env_file = ".env"
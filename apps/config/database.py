@@ -1,20 +1,170 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from contextlib import asynccontextmanager
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from apps.config.config import get_settings
+from apps.config.pool import PoolMetrics, engine_options, watch_invalidations
+from apps.common.consistency import is_recent_writer
 
 settings = get_settings()
 
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+class DatabaseSession(Session):
+    """
+    Sync session that also speaks AsyncSession's `run_sync` convention.
+
+    Routers are async and do their ORM work through
+    `await db.run_sync(fn, *args)`; with this session that runs `fn` in the
+    threadpool, with an AsyncSession it runs in SQLAlchemy's greenlet.
+    """
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self, *args, **kwargs)
+
+
+def sqlite_pragmas(settings) -> dict:
+    """
+    PRAGMAs for the configured SQLITE_PROFILE.
+
+    "performance" switches to WAL so readers no longer block on the writer,
+    relaxes fsync to commit boundaries of the WAL (synchronous=NORMAL stays
+    durable against application crashes, not power loss), memory-maps the
+    file, enlarges the page cache and waits for locks instead of failing.
+    """
+    if settings.sqlite_profile != "performance":
+        return {}
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """Run `pragmas` on every new connection of a SQLite engine"""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def async_database_url(url: str):
+    """The URL of the same database through its asyncio driver"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+# Pool counters per engine, reported by GET /api/v1/admin/db-pool
+pool_metrics = {"primary": PoolMetrics()}
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    **engine_options(settings.database_url, settings, pool_metrics["primary"])
 )
+watch_invalidations(engine, pool_metrics["primary"])
+apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=DatabaseSession, autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# Optional read replica for GET handlers (see get_read_db)
+read_engine = None
+ReadSessionLocal = None
+if settings.read_database_url:
+    pool_metrics["replica"] = PoolMetrics()
+    read_engine = create_engine(
+        settings.read_database_url,
+        connect_args={"check_same_thread": False} if "sqlite" in settings.read_database_url else {},
+        **engine_options(settings.read_database_url, settings, pool_metrics["replica"])
+    )
+    watch_invalidations(read_engine, pool_metrics["replica"])
+    apply_sqlite_pragmas(read_engine, sqlite_pragmas(settings))
+    ReadSessionLocal = sessionmaker(class_=DatabaseSession, autocommit=False, autoflush=False, bind=read_engine)
+
+# Async mode: requests get an AsyncSession; the sync engines above still
+# serve create_all, the health check and manage.py
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if settings.database_async:
+    # Imported only in async mode: the asyncio extension (and the PostgreSQL
+    # dialect it pulls in) adds ~50-100 ms to every sync worker's boot
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    pool_metrics["async"] = PoolMetrics()
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url),
+        **engine_options(settings.database_url, settings, pool_metrics["async"], is_async=True)
+    )
+    watch_invalidations(async_engine.sync_engine, pool_metrics["async"])
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas(settings))
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False)
+
+    if settings.read_database_url:
+        pool_metrics["replica_async"] = PoolMetrics()
+        async_read_engine = create_async_engine(
+            async_database_url(settings.read_database_url),
+            **engine_options(settings.read_database_url, settings, pool_metrics["replica_async"], is_async=True)
+        )
+        watch_invalidations(async_read_engine.sync_engine, pool_metrics["replica_async"])
+        apply_sqlite_pragmas(async_read_engine.sync_engine, sqlite_pragmas(settings))
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def _session_scope(session_factory, async_session_factory):
+    if async_session_factory is not None:
+        async with async_session_factory() as db:
+            yield db
+        return
+
+    db = session_factory()
     try:
         yield db
     finally:
+        # Close on the loop: waiting for a threadpool slot here while every
+        # slot waits for a pooled connection would deadlock under load
         db.close()
+
+
+async def get_db():
+    async with _session_scope(SessionLocal, AsyncSessionLocal) as db:
+        yield db
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether get_read_db serves this request from the primary"""
+    return ReadSessionLocal is None or is_recent_writer(request)
+
+
+async def get_read_db(request: Request, primary=Depends(get_db)):
+    """
+    Session for read-only handlers: the replica when one is configured.
+
+    Clients that made a successful write within READ_YOUR_WRITES_SECONDS
+    keep reading from the primary, so they never miss their own changes
+    while the replica catches up. Sessions connect lazily, so the unused
+    primary session costs nothing.
+    """
+    if reads_from_primary(request):
+        yield primary
+        return
+
+    async with _session_scope(ReadSessionLocal, AsyncReadSessionLocal) as db:
+        yield db
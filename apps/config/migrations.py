@@ -0,0 +1,61 @@
+import ast
+from pathlib import Path
+from typing import Set
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "migrations" / "versions"
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """The database is not at the migration head this code expects"""
+
+
+def _as_set(value) -> Set[str]:
+    if value is None:
+        return set()
+    if isinstance(value, (tuple, list)):
+        return set(value)
+    return {value}
+
+
+def migration_heads(versions_dir: Path = VERSIONS_DIR) -> Set[str]:
+    """
+    Head revision(s) of the migration scripts.
+
+    The `revision`/`down_revision` assignments are read with `ast` rather
+    than through Alembic's ScriptDirectory, which would import Alembic and
+    every revision module on each worker boot.
+    """
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        declared = {}
+        for node in ast.parse(path.read_text()).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                if node.targets[0].id in ("revision", "down_revision"):
+                    declared[node.targets[0].id] = ast.literal_eval(node.value)
+        if "revision" in declared:
+            revisions.add(declared["revision"])
+            parents |= _as_set(declared.get("down_revision"))
+    return revisions - parents
+
+
+def database_revisions(engine) -> Set[str]:
+    """Revision(s) recorded in the database's alembic_version table"""
+    with engine.connect() as conn:
+        try:
+            return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+        except DBAPIError:
+            # No alembic_version table: the database was never migrated
+            return set()
+
+
+def check_schema_current(engine) -> None:
+    """Refuse to start against a database that has not been migrated to head"""
+    expected = migration_heads()
+    current = database_revisions(engine)
+    if current != expected:
+        raise SchemaOutOfDateError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head`"
+        )
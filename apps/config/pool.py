@@ -0,0 +1,128 @@
+import bisect
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last is open
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Counters for one engine's connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.overflow_opened = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, wait_ms: float, opened_overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_opened += opened_overflow
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self, soft: bool) -> None:
+        with self._lock:
+            if soft:
+                self.soft_invalidations += 1
+            else:
+                self.invalidations += 1
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_opened": self.overflow_opened,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "wait_ms": {
+                    "mean": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    "max": round(self.wait_max_ms, 3),
+                    "histogram": dict(zip(labels, self.wait_histogram)),
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        return data
+
+
+class _InstrumentedPool:
+    """Mixin timing every checkout, including waits for a free connection"""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        overflow = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(
+            (time.perf_counter() - start) * 1000,
+            opened_overflow=self.overflow() > max(overflow, 0))
+        return connection
+
+
+def instrumented_pool_class(base, metrics: PoolMetrics):
+    """A `base` pool subclass reporting to `metrics` (kept across recreate())"""
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics": metrics})
+
+
+def watch_invalidations(engine, metrics: PoolMetrics) -> None:
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation(soft=False)
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation(soft=True)
+
+
+def engine_options(url: str, settings, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """
+    create_engine()/create_async_engine() keyword arguments for the pool.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool, so
+    only file and server databases get the sized, instrumented queue pool.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": instrumented_pool_class(base, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
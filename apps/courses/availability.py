@@ -0,0 +1,165 @@
+"""
+Live seat availability for Server-Sent Events subscribers.
+
+Every committed change to a course's seats (enrollments, deregistrations,
+capacity or status updates) is recorded on the session with the values
+the write produced, and published to `availability_hub` after commit; no
+query runs per change and none per subscriber.
+
+The hub keeps, per connection, only the latest unsent snapshot of each
+course it follows. A slow client therefore never queues more than one
+event per course: newer snapshots replace older ones (counted as
+`conflated`) while the connection drains, and its memory stays bounded.
+The hub is per process; each worker only sees the changes it committed
+itself.
+"""
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from apps.courses.models import Course
+
+
+def availability(course_id: int, enrolled_count: int, capacity: int, is_active: bool) -> dict:
+    """The payload of one availability event"""
+    return {
+        "course_id": course_id,
+        "enrolled_count": enrolled_count,
+        "capacity": capacity,
+        "seats_left": max(capacity - enrolled_count, 0),
+        "is_full": enrolled_count >= capacity,
+        "is_active": is_active,
+    }
+
+
+def sse_event(snapshot: dict) -> bytes:
+    return b"event: availability\ndata: " + orjson.dumps(snapshot) + b"\n\n"
+
+
+class Subscription:
+    """One stream's view of the hub: the latest pending snapshot per course"""
+
+    def __init__(self, course_ids: Iterable[int]):
+        self.course_ids = frozenset(course_ids)
+        self.conflated = 0
+        self._pending: Dict[int, dict] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, snapshot: dict) -> None:
+        if snapshot["course_id"] in self._pending:
+            self.conflated += 1
+        self._pending[snapshot["course_id"]] = snapshot
+        self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> List[dict]:
+        """Snapshots published since the last call; empty after `timeout` seconds"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        snapshots = list(self._pending.values())
+        self._pending.clear()
+        return snapshots
+
+
+class AvailabilityHub:
+    """
+    In-process fan-out of availability snapshots to subscriptions.
+
+    Subscriptions are made on the event loop; `publish` may be called
+    from any thread (sync sessions commit in the threadpool) and hands the
+    snapshots to the loop.
+    """
+
+    def __init__(self):
+        self.published = 0
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, course_ids: Iterable[int]) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(course_ids)
+        for course_id in subscription.course_ids:
+            self._subscribers[course_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for course_id in subscription.course_ids:
+            subscribers = self._subscribers.get(course_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[course_id]
+
+    def publish(self, snapshots: List[dict]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if not any(snapshot["course_id"] in self._subscribers for snapshot in snapshots):
+            return
+        loop.call_soon_threadsafe(self._dispatch, snapshots)
+
+    def _dispatch(self, snapshots: List[dict]) -> None:
+        for snapshot in snapshots:
+            self.published += 1
+            for subscription in self._subscribers.get(snapshot["course_id"], ()):
+                subscription.offer(snapshot)
+
+    def stats(self) -> dict:
+        """Open subscriptions and the courses they follow"""
+        subscriptions = set().union(*self._subscribers.values())
+        return {
+            "subscriptions": len(subscriptions),
+            "courses": len(self._subscribers),
+            "published": self.published,
+            "conflated": sum(subscription.conflated for subscription in subscriptions),
+        }
+
+
+availability_hub = AvailabilityHub()
+
+
+async def availability_stream(subscription: Subscription, initial: List[dict], heartbeat: float) -> AsyncIterator[bytes]:
+    """
+    SSE body for a subscription: the current snapshots, then every change.
+
+    A comment line is sent after `heartbeat` idle seconds so proxies keep
+    the connection open and a vanished client is noticed.
+    """
+    try:
+        for snapshot in initial:
+            yield sse_event(snapshot)
+        while True:
+            snapshots = await subscription.next(timeout=heartbeat)
+            if not snapshots:
+                yield b": keepalive\n\n"
+            for snapshot in snapshots:
+                yield sse_event(snapshot)
+    finally:
+        availability_hub.unsubscribe(subscription)
+
+
+def record_availability(db: Session, course_id: int, enrolled_count: int, capacity: int, is_active: bool) -> None:
+    """Publish a course's seats once `db` commits"""
+    db.info.setdefault("availability", {})[course_id] = availability(course_id, enrolled_count, capacity, is_active)
+
+
+@event.listens_for(Course, "after_update")
+def _record_update(mapper, connection, target):
+    record_availability(Session.object_session(target), target.id, target.enrolled_count, target.capacity,
+                        target.is_active)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_on_commit(session):
+    snapshots = session.info.pop("availability", None)
+    if snapshots:
+        availability_hub.publish(list(snapshots.values()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("availability", None)
@@ -0,0 +1,66 @@
+"""
+Read-through cache for the public course catalog.
+
+GET /courses pages and GET /courses/{id} payloads are cached as the
+serialized data the endpoints return. Entries are never overwritten;
+instead their keys carry the version counters (apps.common.versions) of
+what they show:
+
+    course:{id}:v{course version}          one course
+    courses:g{catalog version}:{params}    one catalog page
+
+A committed change bumps the counters, so readers move on to fresh keys
+and the old entries age out with the TTL. That only holds where the
+counters see every commit and the data is read right after them, so
+see use_catalog_cache for when the cache is bypassed. Concurrent misses for the same
+data are coalesced through `catalog_flights`, so a cold or just
+invalidated entry costs one query however many requests want it.
+"""
+from typing import Optional
+from fastapi import Request
+from apps.config.config import get_settings
+from apps.config.database import reads_from_primary
+from apps.common.cache import build_cache
+from apps.common.consistency import is_recent_writer
+from apps.common.singleflight import SingleFlight
+from apps.common.versions import shared_versions
+
+settings = get_settings()
+
+catalog_cache = build_cache(
+    settings.cache_url,
+    maxsize=settings.course_cache_max_size,
+    ttl=settings.course_cache_ttl_seconds,
+    namespace="lms:catalog:"
+)
+
+catalog_flights = SingleFlight("courses")
+
+
+def use_catalog_cache(request: Request, key: Optional[str]) -> bool:
+    """
+    Whether this read may be served from and stored in the cache.
+
+    Not when the versions are unknown, or per process without a declared
+    single worker (another worker's commit would leave this worker's keys
+    current). Not with a read replica either: a page read from a lagging
+    replica would be stored under the new version and outlive the lag
+    for the whole TTL. Clients that just wrote read the primary directly.
+    """
+    # Only a client that just wrote reads the primary when a replica is set
+    return (key is not None and shared_versions() and reads_from_primary(request)
+            and not is_recent_writer(request))
+
+
+def course_cache_key(course_id: int, versions: Optional[tuple]) -> Optional[str]:
+    """Key of a course's payload, or None when the versions are unknown"""
+    return None if versions is None else f"course:{course_id}:v{versions[0]}"
+
+
+def page_cache_key(versions: Optional[tuple], **params) -> Optional[str]:
+    """Key of a catalog page, or None when the versions are unknown"""
+    if versions is None:
+        return None
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"courses:g{versions[0]}:{query}"
+
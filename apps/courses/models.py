@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, Boolean, func
+from sqlalchemy import Column, DDL, DateTime, Integer, String, Boolean, Index, event, func
 from sqlalchemy.orm import relationship
 from apps.config.database import Base
 
@@ -6,12 +6,19 @@ from apps.config.database import Base
 class Course(Base):
     """Course model representing courses in the system"""
     __tablename__ = "courses"
+    __table_args__ = (
+        # Catalog listings filtered by status, paged by id
+        Index("ix_courses_is_active_id", "is_active", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     code = Column(String, unique=True, index=True, nullable=False)
     capacity = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Denormalized seat counter, kept in sync by the enrollment routes
+    enrolled_count = Column(Integer, nullable=False,
+                            default=0, server_default="0")
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
@@ -32,11 +39,6 @@ class Course(Base):
     def __repr__(self):
         return f"<Course(id={self.id}, code={self.code}, title={self.title})>"
 
-    @property
-    def enrolled_count(self):
-        """Get count of enrolled students"""
-        return len(self.enrollments)
-
     @property
     def is_full(self):
         """Check if course is at capacity"""
@@ -66,3 +68,51 @@ class Course(Base):
             ]
 
         return data
+
+
+# Full-text search index over title and code, plus a substring index over
+# code (see apps/courses/search.py).
+# SQLite: external-content FTS5 tables (the code one with the trigram
+# tokenizer) kept in sync by triggers.
+# PostgreSQL: a generated tsvector column with a GIN index, and a pg_trgm
+# GIN index on code.
+COURSE_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5("
+        "title, code, content='courses', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_ai AFTER INSERT ON courses BEGIN "
+        "INSERT INTO courses_fts(rowid, title, code) VALUES (new.id, new.title, new.code); END",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_ad AFTER DELETE ON courses BEGIN "
+        "INSERT INTO courses_fts(courses_fts, rowid, title, code) "
+        "VALUES ('delete', old.id, old.title, old.code); END",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_au AFTER UPDATE OF title, code ON courses BEGIN "
+        "INSERT INTO courses_fts(courses_fts, rowid, title, code) "
+        "VALUES ('delete', old.id, old.title, old.code); "
+        "INSERT INTO courses_fts(rowid, title, code) VALUES (new.id, new.title, new.code); END",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts_code USING fts5("
+        "code, content='courses', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_code_ai AFTER INSERT ON courses BEGIN "
+        "INSERT INTO courses_fts_code(rowid, code) VALUES (new.id, new.code); END",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_code_ad AFTER DELETE ON courses BEGIN "
+        "INSERT INTO courses_fts_code(courses_fts_code, rowid, code) VALUES ('delete', old.id, old.code); END",
+        "CREATE TRIGGER IF NOT EXISTS courses_fts_code_au AFTER UPDATE OF code ON courses BEGIN "
+        "INSERT INTO courses_fts_code(courses_fts_code, rowid, code) VALUES ('delete', old.id, old.code); "
+        "INSERT INTO courses_fts_code(rowid, code) VALUES (new.id, new.code); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', title || ' ' || code)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_courses_code_trgm ON courses USING gin (code gin_trgm_ops)",
+    ],
+}
+
+for _dialect, _statements in COURSE_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Course.__table__, "after_create",
+                     DDL(_statement).execute_if(dialect=_dialect))
+
+for _table in ("courses_fts", "courses_fts_code"):
+    event.listen(Course.__table__, "before_drop",
+                 DDL(f"DROP TABLE IF EXISTS {_table}").execute_if(dialect="sqlite"))
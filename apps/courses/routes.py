@@ -1,154 +1,194 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from apps.config.database import get_db
-from apps.courses.models import Course
-from apps.courses.schemas import CourseCreate, CourseUpdate
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from apps.config.config import get_settings
+from apps.config.database import get_db, get_read_db, reads_from_primary
+from apps.courses.schemas import CourseCreate, CourseUpdate, course_serializer
+from apps.courses.search import SEARCH_MODES
+from apps.courses import services
+from apps.courses.cache import catalog_cache, catalog_flights, course_cache_key, page_cache_key, use_catalog_cache
+from apps.courses.availability import availability_hub, availability_stream
 from apps.users.models import User
 from apps.common.security import require_admin
+from apps.common.etags import PRIVATE_REVALIDATE, PUBLIC_REVALIDATE, not_modified, validators
+from apps.common.versions import COURSES, USERS, course_key, current
 from apps.common.responses import success_response
+from apps.common.pagination import MAX_PAGE_SIZE
 
+settings = get_settings()
 router = APIRouter(prefix="/api/v1/courses", tags=["courses"])
 
 
+async def _stream_availability(course_ids, db: Session) -> StreamingResponse:
+    # Subscribe before reading the current seats so no change falls in between
+    subscription = availability_hub.subscribe(course_ids)
+    try:
+        initial = await db.run_sync(services.get_availability, course_ids)
+    except Exception:
+        availability_hub.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        availability_stream(subscription, initial, settings.availability_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("")
-def get_all_courses(
+async def get_all_courses(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
+    sort: str = None,
+    include_total: bool = True,
     search: str = None,
+    search_mode: str = "fulltext",
     is_active: bool = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all courses with optional filtering and pagination.
     
-    - skip: Number of records to skip (default: 0)
+    - skip: Number of records to skip (legacy offset mode, default: 0)
     - limit: Maximum number of records to return (default: 100, max: 1000)
+    - cursor: Opaque `next_cursor` from the previous page (keyset mode)
+    - sort: id, title, code or created_at; prefix with "-" for descending (default: id, or relevance when searching)
+    - include_total: Compute the matching total (default: true); `total_is_exact` is false when a recently cached total is returned
     - search: Search courses by title or code (case-insensitive)
+    - search_mode: "fulltext" (default) prefix-matches words via the search index, or any part of a code, and ranks by relevance; "substring" matches anywhere in title or code
     - is_active: Filter by active status (true/false)
     """
     # Limit max page size
-    limit = min(limit, 1000)
-    
-    query = db.query(Course)
-    
-    # Apply filters
-    if is_active is not None:
-        query = query.filter(Course.is_active == is_active)
+    limit = min(limit, MAX_PAGE_SIZE)
     
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Course.title.ilike(search_term)) | (Course.code.ilike(search_term))
-        )
-    
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    courses = query.offset(skip).limit(limit).all()
+    if search_mode not in SEARCH_MODES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"search_mode must be one of: {', '.join(SEARCH_MODES)}")
+
+    versions = current(COURSES)
+    headers = validators(request, versions, "courses", cache_control=PUBLIC_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    key = page_cache_key(versions, skip=skip, limit=limit, cursor=cursor, sort=sort, include_total=include_total,
+                         search=search, search_mode=search_mode, is_active=is_active)
+    cached = use_catalog_cache(request, key)
+    data = catalog_cache.get(key) if cached else None
+    if data is None:
+        async def load():
+            page = await db.run_sync(
+                services.list_courses, skip=skip, limit=limit, cursor=cursor, sort=sort,
+                include_total=include_total, search=search, search_mode=search_mode,
+                is_active=is_active)
+            data = page.to_dict(course_serializer.many)
+            if cached:
+                catalog_cache.set(key, data)
+            return data
+
+        # Identical concurrent misses share one query
+        data = await catalog_flights.do(
+            ("courses", versions, reads_from_primary(request), skip, limit, cursor, sort, include_total,
+             search, search_mode, is_active), load)
     
-    return success_response(
-        data={
-            "items": [c.to_dict() for c in courses],
-            "total": total,
-            "skip": skip,
-            "limit": limit
-        },
-        message="Courses retrieved"
-    )
+    return success_response(data=data, message="Courses retrieved", headers=headers)
+
+
+@router.get("/availability/stream", response_model=None)
+async def stream_courses_availability(course_ids: str, db: Session = Depends(get_db)):
+    """
+    Stream seat availability of several courses as Server-Sent Events.
+
+    - course_ids: Comma-separated course IDs (at most AVAILABILITY_MAX_COURSES)
+
+    Sends one `availability` event per course on connect, then one per
+    change: course_id, enrolled_count, capacity, seats_left, is_full and
+    is_active.
+    """
+    try:
+        ids = sorted({int(course_id) for course_id in course_ids.split(",") if course_id.strip()})
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="course_ids must be comma-separated integers")
+    if not ids or len(ids) > settings.availability_max_courses:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"course_ids must name 1 to {settings.availability_max_courses} courses")
+    return await _stream_availability(ids, db)
+
+
+@router.get("/{course_id}/availability/stream", response_model=None)
+async def stream_course_availability(course_id: int, db: Session = Depends(get_db)):
+    """Stream a course's seat availability as Server-Sent Events"""
+    return await _stream_availability([course_id], db)
 
 
 @router.get("/{course_id}", response_model=None)
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    return success_response(data=course.to_dict(), message="Course retrieved")
+async def get_course(course_id: int, request: Request, db: Session = Depends(get_read_db)):
+    versions = current(course_key(course_id))
+    headers = validators(request, versions, "course", course_id, cache_control=PUBLIC_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    key = course_cache_key(course_id, versions)
+    cached = use_catalog_cache(request, key)
+    data = catalog_cache.get(key) if cached else None
+    if data is None:
+        async def load():
+            course = await db.run_sync(services.get_course_or_404, course_id)
+            data = course_serializer.one(course)
+            if cached:
+                catalog_cache.set(key, data)
+            return data
+
+        data = await catalog_flights.do(("course", course_id, versions, reads_from_primary(request)), load)
+    return success_response(data=data, message="Course retrieved", headers=headers)
 
 
 @router.get("/{course_id}/with-students", response_model=None)
-def get_course_with_students(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+async def get_course_with_students(course_id: int, request: Request, db: Session = Depends(get_read_db), _: User = Depends(require_admin)):
     """Get course with enrolled students (admin only)"""
-    course_with_enrollments = db.query(Course).options(
-        joinedload(Course.enrollments)
-    ).filter(Course.id == course_id).first()
+    versions = current(course_key(course_id), USERS)
+    headers = validators(request, versions, "course-students", course_id, cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
 
-    if not course_with_enrollments:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    async def load():
+        course_with_enrollments = await db.run_sync(services.get_course_with_students, course_id)
+        return course_with_enrollments.to_dict(include_enrollments=True)
 
-    return success_response(data=course_with_enrollments.to_dict(include_enrollments=True), message="Course with students retrieved")
+    # Every admin sees the same roster
+    data = await catalog_flights.do(("course-students", course_id, versions, reads_from_primary(request)), load)
+    return success_response(data=data, message="Course with students retrieved", headers=headers)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-def create_course(course_data: CourseCreate, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    if db.query(Course).filter(Course.code == course_data.code).first():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Course code already exists")
-    new_course = Course(title=course_data.title, code=course_data.code,
-                        capacity=course_data.capacity, is_active=True)
-    db.add(new_course)
-    db.commit()
-    db.refresh(new_course)
-    return success_response(data=new_course.to_dict(), message="Course created")
+async def create_course(course_data: CourseCreate, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    new_course = await db.run_sync(services.create_course, course_data)
+    return success_response(data=course_serializer.one(new_course), message="Course created", status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/{course_id}")
-def update_course(course_id: int, course_update: CourseUpdate, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if course_update.code and course_update.code != course.code:
-        if db.query(Course).filter(Course.code == course_update.code).first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Course code already exists")
-
-    if course_update.title is not None:
-        course.title = course_update.title
-    if course_update.code is not None:
-        course.code = course_update.code
-    if course_update.capacity is not None:
-        course.capacity = course_update.capacity
-    if course_update.is_active is not None:
-        course.is_active = course_update.is_active
-
-    db.commit()
-    db.refresh(course)
-    return success_response(data=course.to_dict(), message="Course updated")
+async def update_course(course_id: int, course_update: CourseUpdate, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    course = await db.run_sync(services.update_course, course_id, course_update)
+    return success_response(data=course_serializer.one(course), message="Course updated")
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_200_OK)
-def delete_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    course.is_active = False
-    db.commit()
+async def delete_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    await db.run_sync(services.set_course_active, course_id, False)
     return success_response(data=None, message="Course deleted")
 
 
 @router.patch("/{course_id}/activate")
-def activate_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    course.is_active = True
-    db.commit()
-    db.refresh(course)
-    return success_response(data=course.to_dict(), message="Course activated")
+async def activate_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    course = await db.run_sync(services.set_course_active, course_id, True)
+    return success_response(data=course_serializer.one(course), message="Course activated")
 
 
 @router.patch("/{course_id}/deactivate")
-def deactivate_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    course.is_active = False
-    db.commit()
-    db.refresh(course)
-    return success_response(data=course.to_dict(), message="Course deactivated")
+async def deactivate_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    course = await db.run_sync(services.set_course_active, course_id, False)
+    return success_response(data=course_serializer.one(course), message="Course deactivated")
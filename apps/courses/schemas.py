@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
+from apps.common.serializers import Serializer
 
 
 class CourseBase(BaseModel):
@@ -76,3 +77,6 @@ class CourseWithEnrollments(CourseBase):
     model_config = {
         "from_attributes": True
     }
+
+
+course_serializer = Serializer(CourseResponse)
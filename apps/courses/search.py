@@ -0,0 +1,92 @@
+from typing import Optional, Tuple
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.orm import Query, Session
+from apps.common.search import search_terms
+from apps.courses.models import Course
+
+SEARCH_MODES = ("fulltext", "substring")
+
+courses_fts = table("courses_fts", column("rowid"), column("rank"))
+courses_fts_code = table("courses_fts_code", column("rowid"))
+
+# Trigram indexes only serve substrings of at least three characters
+CODE_MATCH_MIN_LENGTH = 3
+
+# Per-database answer to "was the search index created?", keyed by URL
+_fulltext_available = {}
+
+
+def fulltext_available(db: Session) -> bool:
+    """Whether the course search index exists on this database"""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fulltext_available:
+        if bind.dialect.name == "sqlite":
+            found = db.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses_fts_code'"
+            )).first()
+        elif bind.dialect.name == "postgresql":
+            found = db.execute(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'courses' AND column_name = 'search_vector'"
+            )).first()
+        else:
+            found = None
+        _fulltext_available[key] = found is not None
+    return _fulltext_available[key]
+
+
+def substring_filter(term: str):
+    """The original case-insensitive infix match on title or code"""
+    search_term = f"%{term}%"
+    return (Course.title.ilike(search_term)) | (Course.code.ilike(search_term))
+
+
+def apply_course_search(query: Query, db: Session, term: str, mode: str = "fulltext") -> Tuple[Query, Optional[object]]:
+    """
+    Filter a Course query by a search term.
+
+    In fulltext mode every word must prefix-match a word of the title or
+    code, using the FTS5 index on SQLite or the tsvector GIN index on
+    PostgreSQL. A course whose code contains the whole term also matches
+    ("101" finds PY101), through a trigram index on code; such matches
+    rank after the word matches. Returns (query, rank_order) where
+    rank_order orders by relevance. Falls back to the substring filter,
+    with no ranking, when substring mode is requested, the term has no
+    words, or the index is missing on this database.
+    """
+    terms = search_terms(term)
+    if mode != "fulltext" or not terms or not fulltext_available(db):
+        return query.filter(substring_filter(term)), None
+
+    fragment = term.strip()
+    match_code = len(fragment) >= CODE_MATCH_MIN_LENGTH
+    if db.get_bind().dialect.name == "sqlite":
+        match = literal_column("courses_fts").op("MATCH")(" ".join(f'"{t}"*' for t in terms))
+        if not match_code:
+            query = query.join(courses_fts, courses_fts.c.rowid == Course.id).filter(match)
+            # bm25 rank: lower is more relevant
+            return query, courses_fts.c.rank.asc()
+        code_hits = select(courses_fts_code.c.rowid).where(
+            literal_column("courses_fts_code").op("MATCH")('"{}"'.format(fragment.replace('"', '""'))))
+        ranked = select(courses_fts.c.rowid, courses_fts.c.rank).where(match).subquery()
+        query = query.filter(Course.id.in_(select(courses_fts.c.rowid).where(match).union(code_hits)))
+        query = query.outerjoin(ranked, ranked.c.rowid == Course.id)
+        return query, ranked.c.rank.asc().nulls_last()
+
+    ts_query = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+    search_vector = literal_column("courses.search_vector")
+    condition = search_vector.op("@@")(ts_query)
+    if match_code:
+        condition = condition | Course.code.ilike(f"%{fragment}%")
+    query = query.filter(condition)
+    return query, func.ts_rank(search_vector, ts_query).desc()
+
+
+def rebuild_search_index(db: Session) -> None:
+    """Repopulate the course search index from the courses table"""
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')"))
+        db.execute(text("INSERT INTO courses_fts_code(courses_fts_code) VALUES ('rebuild')"))
+        db.commit()
+    # PostgreSQL's generated search_vector column never needs a rebuild
@@ -0,0 +1,159 @@
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from apps.courses.models import Course
+from apps.courses.schemas import CourseCreate, CourseUpdate
+from apps.courses.search import apply_course_search
+from apps.enrollments.models import Enrollment
+from apps.common.pagination import Page, paginate
+from apps.common.loaders import course_options
+from apps.common.projections import course_rows
+from apps.common.versions import mark_course_changed
+from apps.courses.availability import availability, record_availability
+
+COURSE_SORT_FIELDS = ("id", "title", "code", "created_at")
+
+
+def get_course_or_404(db: Session, course_id: int) -> Course:
+    """Load a course or raise 404"""
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return course
+
+
+def list_courses(
+    db: Session,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: Optional[str],
+    include_total: bool,
+    search: Optional[str],
+    search_mode: str,
+    is_active: Optional[bool]
+) -> Page:
+    """One page of the course catalog, as course_rows dicts"""
+    query = course_rows(db)
+    rank_by = None
+
+    # Apply filters
+    if is_active is not None:
+        query = query.filter(Course.is_active == is_active)
+
+    if search:
+        query, rank_by = apply_course_search(query, db, search, search_mode)
+
+    # Apply pagination (the total rides along on the page query when possible)
+    return paginate(
+        query, Course, sort=sort or "id", allowed_sorts=COURSE_SORT_FIELDS,
+        limit=limit, skip=skip, cursor=cursor, include_total=include_total,
+        total_cache_key="courses" if is_active is None and not search else None,
+        rank_by=rank_by if sort is None else None)
+
+
+def get_availability(db: Session, course_ids: List[int]) -> List[dict]:
+    """Current seats of each course, 404 if any does not exist"""
+    rows = db.query(Course.id, Course.enrolled_count, Course.capacity, Course.is_active).filter(
+        Course.id.in_(course_ids)).all()
+    if len(rows) != len(set(course_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return [availability(*row) for row in rows]
+
+
+def get_course_with_students(db: Session, course_id: int) -> Course:
+    """Load a course with its enrollments and their students"""
+    course = db.query(Course).options(
+        *course_options(include_enrollments=True)
+    ).filter(Course.id == course_id).first()
+
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return course
+
+
+def create_course(db: Session, course_data: CourseCreate) -> Course:
+    """Create an active course with a unique code"""
+    if db.query(Course).filter(Course.code == course_data.code).first():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Course code already exists")
+    new_course = Course(title=course_data.title, code=course_data.code,
+                        capacity=course_data.capacity, is_active=True)
+    db.add(new_course)
+    db.commit()
+    db.refresh(new_course)
+    return new_course
+
+
+def update_course(db: Session, course_id: int, course_update: CourseUpdate) -> Course:
+    """Apply a partial update to a course"""
+    course = get_course_or_404(db, course_id)
+    if course_update.code and course_update.code != course.code:
+        if db.query(Course).filter(Course.code == course_update.code).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Course code already exists")
+
+    if course_update.title is not None:
+        course.title = course_update.title
+    if course_update.code is not None:
+        course.code = course_update.code
+    if course_update.capacity is not None:
+        course.capacity = course_update.capacity
+    if course_update.is_active is not None:
+        course.is_active = course_update.is_active
+
+    db.commit()
+    db.refresh(course)
+    return course
+
+
+def set_course_active(db: Session, course_id: int, is_active: bool) -> Course:
+    """Activate or deactivate a course"""
+    course = get_course_or_404(db, course_id)
+    course.is_active = is_active
+    db.commit()
+    db.refresh(course)
+    return course
+
+
+def adjust_enrolled_count(db: Session, course_id: int, delta: int) -> None:
+    """Atomically shift a course's denormalized enrolled_count by delta"""
+    seats = db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(enrolled_count=Course.enrolled_count + delta)
+        .returning(Course.enrolled_count, Course.capacity, Course.is_active)
+    ).one()
+    mark_course_changed(db, course_id)
+    record_availability(db, course_id, *seats)
+
+
+def reconcile_enrolled_counts(db: Session) -> int:
+    """
+    Recompute enrolled_count from the enrollments table.
+
+    Only courses whose stored counter has drifted are rewritten.
+    Returns the number of courses that were repaired.
+    """
+    actual = (
+        select(func.count(Enrollment.id))
+        .where(Enrollment.course_id == Course.id)
+        .scalar_subquery()
+    )
+    repaired = db.execute(
+        update(Course)
+        .where(Course.enrolled_count != actual)
+        .values(enrolled_count=actual)
+        .returning(Course.id, Course.enrolled_count, Course.capacity, Course.is_active)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for course_id, *seats in repaired:
+        mark_course_changed(db, course_id)
+        record_availability(db, course_id, *seats)
+    db.commit()
+    return len(repaired)
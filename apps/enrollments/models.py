@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from apps.config.database import Base
@@ -7,6 +7,14 @@ from apps.config.database import Base
 class Enrollment(Base):
     """Enrollment model representing student-course relationships"""
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # A student can hold at most one seat per course
+        Index("ix_enrollments_user_id_course_id",
+              "user_id", "course_id", unique=True),
+        # Per-course rosters in enrollment order
+        Index("ix_enrollments_course_id_created_at",
+              "course_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey(
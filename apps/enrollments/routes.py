@@ -1,159 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from apps.config.database import get_db
-from apps.enrollments.models import Enrollment
-from apps.enrollments.schemas import EnrollmentCreate, EnrollmentResponse, EnrollmentWithDetails
-from apps.courses.models import Course
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from apps.config.database import get_db, get_read_db
+from apps.enrollments.schemas import BulkEnrollmentCreate, BulkEnrollmentPairs, EnrollmentCreate, enrollment_serializer
+from apps.enrollments import services
 from apps.users.models import User, UserRole
 from apps.common.security import get_current_active_user, require_admin
 from apps.common.responses import success_response
+from apps.common.etags import PRIVATE_REVALIDATE, not_modified, validators
+from apps.common.versions import COURSES, ENROLLMENTS, USERS, course_key, current, user_key
+from apps.common.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/v1/enrollments", tags=["enrollments"])
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=None)
-def enroll_in_course(enrollment_data: EnrollmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def enroll_in_course(enrollment_data: EnrollmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Only students can enroll")
 
-    course = db.query(Course).filter(
-        Course.id == enrollment_data.course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if not course.is_active:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Cannot enroll in inactive course")
-
-    if db.query(Enrollment).filter(Enrollment.user_id == current_user.id, Enrollment.course_id == enrollment_data.course_id).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled")
-
-    if course.is_full:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Course is at full capacity")
-
-    new_enrollment = Enrollment(
-        user_id=current_user.id, course_id=enrollment_data.course_id)
-    db.add(new_enrollment)
-    db.commit()
-    db.refresh(new_enrollment)
+    enrollment_id = await db.run_sync(
+        services.enroll_student, current_user.id, enrollment_data.course_id)
 
     # Eagerly load relationships
-    enrollment_with_relations = db.query(Enrollment).options(
-        joinedload(Enrollment.user),
-        joinedload(Enrollment.course)
-    ).filter(Enrollment.id == new_enrollment.id).first()
+    enrollment_with_relations = await db.run_sync(
+        services.get_enrollment_with_details, enrollment_id)
 
-    return success_response(data=enrollment_with_relations.to_dict(), message="Enrolled successfully")
+    return success_response(data=enrollment_with_relations.to_dict(), message="Enrolled successfully", status_code=status.HTTP_201_CREATED)
 
 
-@router.delete("/{enrollment_id}")
-def deregister_from_course(enrollment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.id == enrollment_id).first()
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
-
-    if enrollment.user_id != current_user.id and current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="Cannot deregister another student")
+def _bulk_response(results):
+    enrolled = sum(result["status"] == "enrolled" for result in results)
+    return success_response(
+        data={"enrolled": enrolled, "rejected": len(results) - enrolled, "results": results},
+        message="Bulk enrollment processed")
+
+
+@router.post("/bulk", response_model=None)
+async def bulk_enroll_course(data: BulkEnrollmentCreate, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    """
+    Enroll many students into one course in a single transaction (Admin only).
+
+    Returns one result per user ID, in request order: `enrolled` with the
+    new enrollment_id, or `rejected` with the reason in `detail`. Seats are
+    given in request order until the course is full.
+    """
+    results = await db.run_sync(
+        services.bulk_enroll, [(user_id, data.course_id) for user_id in data.user_ids])
+    return _bulk_response(results)
+
 
-    db.delete(enrollment)
-    db.commit()
+@router.post("/bulk/pairs", response_model=None)
+async def bulk_enroll_pairs(data: BulkEnrollmentPairs, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    """Enroll many (user_id, course_id) pairs in a single transaction (Admin only)"""
+    results = await db.run_sync(
+        services.bulk_enroll, [(pair.user_id, pair.course_id) for pair in data.enrollments])
+    return _bulk_response(results)
+
+
+@router.delete("/{enrollment_id}")
+async def deregister_from_course(enrollment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    await db.run_sync(services.deregister, enrollment_id, current_user)
     return success_response(data=None, message="Deregistered")
 
 
 @router.delete("/courses/{course_id}/deregister")
-def deregister_by_course_id(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.user_id == current_user.id, Enrollment.course_id == course_id).first()
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Not enrolled")
-    db.delete(enrollment)
-    db.commit()
+async def deregister_by_course_id(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    await db.run_sync(services.deregister_by_course, current_user.id, course_id)
     return success_response(data=None, message="Deregistered")
 
 
 @router.get("/my-enrollments", response_model=None)
-def get_my_enrollments(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    enrollments = db.query(Enrollment).options(
-        joinedload(Enrollment.user),
-        joinedload(Enrollment.course)
-    ).filter(Enrollment.user_id == current_user.id).all()
-    return success_response(data=[e.to_dict() for e in enrollments], message="My enrollments retrieved")
+async def get_my_enrollments(request: Request, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
+    headers = validators(request, current(user_key(current_user.id), COURSES), "user-enrollments", current_user.id,
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    enrollments = await db.run_sync(services.list_user_enrollments, current_user.id)
+    return success_response(data=[e.to_dict() for e in enrollments], message="My enrollments retrieved", headers=headers)
 
 
 @router.get("", response_model=None)
-def get_all_enrollments(
+async def get_all_enrollments(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
+    sort: str = "id",
+    include_total: bool = True,
     user_id: int = None,
     course_id: int = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_admin)
 ):
     """
     Get all enrollments with optional filtering and pagination (Admin only).
     
-    - skip: Number of records to skip (default: 0)
+    - skip: Number of records to skip (legacy offset mode, default: 0)
     - limit: Maximum number of records to return (default: 100, max: 1000)
+    - cursor: Opaque `next_cursor` from the previous page (keyset mode)
+    - sort: id or created_at; prefix with "-" for descending (default: id)
+    - include_total: Compute the matching total (default: true); `total_is_exact` is false when a recently cached total is returned
     - user_id: Filter by user ID
     - course_id: Filter by course ID
     """
     # Limit max page size
-    limit = min(limit, 1000)
+    limit = min(limit, MAX_PAGE_SIZE)
     
-    query = db.query(Enrollment).options(
-        joinedload(Enrollment.user),
-        joinedload(Enrollment.course)
-    )
-    
-    # Apply filters
-    if user_id:
-        query = query.filter(Enrollment.user_id == user_id)
-    if course_id:
-        query = query.filter(Enrollment.course_id == course_id)
-    
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    enrollments = query.offset(skip).limit(limit).all()
+    headers = validators(request, current(ENROLLMENTS, USERS, COURSES), "enrollments",
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    page = await db.run_sync(
+        services.list_enrollments, skip=skip, limit=limit, cursor=cursor, sort=sort,
+        include_total=include_total, user_id=user_id, course_id=course_id)
     
     return success_response(
-        data={
-            "items": [e.to_dict() for e in enrollments],
-            "total": total,
-            "skip": skip,
-            "limit": limit
-        },
-        message="All enrollments retrieved"
+        data=page.to_dict(enrollment_serializer.many),
+        message="All enrollments retrieved",
+        headers=headers
     )
 
 
 @router.get("/courses/{course_id}", response_model=None)
-def get_enrollments_for_course(course_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    if not db.query(Course).filter(Course.id == course_id).first():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    enrollments = db.query(Enrollment).options(
-        joinedload(Enrollment.user),
-        joinedload(Enrollment.course)
-    ).filter(Enrollment.course_id == course_id).all()
-    return success_response(data=[e.to_dict() for e in enrollments], message="Course enrollments retrieved")
+async def get_enrollments_for_course(course_id: int, request: Request, db: Session = Depends(get_read_db), _: User = Depends(require_admin)):
+    headers = validators(request, current(course_key(course_id), USERS), "course-enrollments", course_id,
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    enrollments = await db.run_sync(services.list_course_enrollments, course_id)
+    return success_response(data=[e.to_dict() for e in enrollments], message="Course enrollments retrieved", headers=headers)
 
 
 @router.delete("/admin/{enrollment_id}")
-def admin_remove_student(enrollment_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.id == enrollment_id).first()
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
-    db.delete(enrollment)
-    db.commit()
+async def admin_remove_student(enrollment_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+    await db.run_sync(services.remove_enrollment, enrollment_id)
     return success_response(data=None, message="Student removed")
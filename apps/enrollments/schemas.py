@@ -1,17 +1,38 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
+from apps.common.serializers import Serializer
 
 if TYPE_CHECKING:
     from apps.users.schemas import UserResponse
     from apps.courses.schemas import CourseResponse
 
+# Largest number of pairs one bulk enrollment request may carry
+MAX_BULK_ENROLLMENTS = 10000
+
 
 class EnrollmentCreate(BaseModel):
     """Schema for creating an enrollment"""
     course_id: int
 
 
+class BulkEnrollmentCreate(BaseModel):
+    """Schema for enrolling many students into one course"""
+    course_id: int
+    user_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ENROLLMENTS)
+
+
+class EnrollmentPair(BaseModel):
+    """One (student, course) pair of a bulk enrollment"""
+    user_id: int
+    course_id: int
+
+
+class BulkEnrollmentPairs(BaseModel):
+    """Schema for enrolling many (student, course) pairs"""
+    enrollments: List[EnrollmentPair] = Field(..., min_length=1, max_length=MAX_BULK_ENROLLMENTS)
+
+
 class UserInEnrollment(BaseModel):
     """Nested user data in enrollment"""
     id: int
@@ -65,3 +86,6 @@ class EnrollmentWithDetails(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+enrollment_serializer = Serializer(EnrollmentResponse)
@@ -0,0 +1,339 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from apps.courses.models import Course
+from apps.common.versions import mark_enrollment_changed
+from apps.courses.availability import record_availability
+from apps.courses.services import adjust_enrolled_count, get_course_or_404
+from apps.enrollments.models import Enrollment
+from apps.users.models import User, UserRole
+from apps.common.pagination import Page, paginate
+from apps.common.loaders import enrollment_options
+from apps.common.projections import enrollment_rows
+
+ENROLLMENT_SORT_FIELDS = ("id", "created_at")
+
+
+def _with_relations(db: Session):
+    return db.query(Enrollment).options(*enrollment_options())
+
+
+def _insert_enrollment(db: Session, user_id: int, course_id: int):
+    """
+    INSERT an enrollment, skipping it if the (user_id, course_id) pair exists.
+
+    Returns the new enrollment id, or None when the student was already enrolled.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # Dialect modules load on first use; SQLite deployments never import PostgreSQL's
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = (
+            dialect_insert(Enrollment)
+            .values(user_id=user_id, course_id=course_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(Enrollment.id)
+        )
+        return db.execute(stmt).scalar()
+
+    try:
+        with db.begin_nested():
+            return db.execute(
+                insert(Enrollment)
+                .values(user_id=user_id, course_id=course_id)
+                .returning(Enrollment.id)
+            ).scalar()
+    except IntegrityError:
+        return None
+
+
+def _raise_rejection(db: Session, user_id: int, course_id: int):
+    """Explain why a seat could not be claimed, in the original check order"""
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if not course.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Cannot enroll in inactive course")
+    if db.query(Enrollment.id).filter(Enrollment.user_id == user_id, Enrollment.course_id == course_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled")
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Course is at full capacity")
+
+
+def enroll_student(db: Session, user_id: int, course_id: int) -> int:
+    """
+    Admit a student into a course and return the new enrollment id.
+
+    The seat is claimed with a single conditional UPDATE (active, not full)
+    and the row is written with an insert-on-conflict against the unique
+    (user_id, course_id) index, so concurrent requests can neither
+    oversubscribe a course nor double-enroll a student. Lookups only run
+    on the rejection path to pick the right error.
+    """
+    seats = db.execute(
+        update(Course)
+        .where(
+            Course.id == course_id,
+            Course.is_active.is_(True),
+            Course.enrolled_count < Course.capacity
+        )
+        .values(enrolled_count=Course.enrolled_count + 1)
+        .returning(Course.enrolled_count, Course.capacity)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if seats is None:
+        db.rollback()
+        _raise_rejection(db, user_id, course_id)
+    mark_enrollment_changed(db, user_id, course_id)
+
+    enrollment_id = _insert_enrollment(db, user_id, course_id)
+    if enrollment_id is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled")
+
+    record_availability(db, course_id, seats.enrolled_count, seats.capacity, True)
+    db.commit()
+    return enrollment_id
+
+
+def _bulk_result(user_id: int, course_id: int, enrollment_id: Optional[int] = None,
+                 detail: Optional[str] = None) -> dict:
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "status": "enrolled" if detail is None else "rejected",
+        "enrollment_id": enrollment_id,
+        "detail": detail,
+    }
+
+
+def _lock_courses(db: Session, course_ids) -> Dict[int, object]:
+    """
+    Read the courses' seats, holding their rows locked until commit.
+
+    PostgreSQL locks them FOR UPDATE in id order, so concurrent bulk
+    requests cannot deadlock. SQLite ignores FOR UPDATE and a SELECT does
+    not start a write transaction, so the lock is a no-op UPDATE, which
+    takes the database's write lock; it keeps updated_at as it is.
+    """
+    columns = (Course.id, Course.enrolled_count, Course.capacity, Course.is_active)
+    if db.get_bind().dialect.name == "sqlite":
+        statement = (
+            update(Course)
+            .where(Course.id.in_(course_ids))
+            .values(enrolled_count=Course.enrolled_count, updated_at=Course.updated_at)
+            .returning(*columns)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        statement = select(*columns).where(Course.id.in_(course_ids)).order_by(Course.id).with_for_update()
+    return {row.id: row for row in db.execute(statement)}
+
+
+def bulk_enroll(db: Session, pairs: Sequence[Tuple[int, int]]) -> List[dict]:
+    """
+    Enroll many (user_id, course_id) pairs in one transaction.
+
+    Returns one result per pair, in request order: the new enrollment id,
+    or the reason it was rejected (the same reasons as a single enrollment,
+    plus unknown, inactive or non-student users and repeated pairs).
+    Seats go to pairs in request order until a course is full.
+
+    Checks are set-based: one statement each reads the users, the courses
+    and the existing enrollments, the admitted rows are inserted together
+    and each course's counter is shifted once. The courses are locked
+    before anything is read (see _lock_courses), so concurrent enrollments
+    wait for this transaction and cannot claim the same seats or pairs;
+    the counter UPDATE is also conditional on capacity and the whole batch
+    rolls back with a 409 rather than overshoot.
+    """
+    results: List[Optional[dict]] = [None] * len(pairs)
+    first_seen: Dict[Tuple[int, int], int] = {}
+    for index, pair in enumerate(pairs):
+        if pair in first_seen:
+            results[index] = _bulk_result(*pair, detail="Duplicate in request")
+        else:
+            first_seen[pair] = index
+    user_ids = {user_id for user_id, _ in first_seen}
+    course_ids = {course_id for _, course_id in first_seen}
+
+    courses = _lock_courses(db, course_ids)
+    users = {
+        row.id: row for row in db.execute(
+            select(User.id, User.role, User.is_active).where(User.id.in_(user_ids)))
+    }
+    existing = set(db.execute(
+        select(Enrollment.user_id, Enrollment.course_id)
+        .where(Enrollment.course_id.in_(course_ids), Enrollment.user_id.in_(user_ids))
+    ).tuples())
+
+    admitted: Dict[int, int] = {}
+    rows = []
+    for (user_id, course_id), index in first_seen.items():
+        user = users.get(user_id)
+        course = courses.get(course_id)
+        if user is None:
+            detail = "User not found"
+        elif user.role != UserRole.STUDENT:
+            detail = "Only students can enroll"
+        elif not user.is_active:
+            detail = "Inactive user"
+        elif course is None:
+            detail = "Course not found"
+        elif not course.is_active:
+            detail = "Cannot enroll in inactive course"
+        elif (user_id, course_id) in existing:
+            detail = "Already enrolled"
+        elif course.enrolled_count + admitted.get(course_id, 0) >= course.capacity:
+            detail = "Course is at full capacity"
+        else:
+            admitted[course_id] = admitted.get(course_id, 0) + 1
+            rows.append({"user_id": user_id, "course_id": course_id})
+            continue
+        results[index] = _bulk_result(user_id, course_id, detail=detail)
+
+    if rows:
+        # Returned rows carry their pair, so they may come back in any order
+        # (asking for parameter order makes SQLite insert row by row)
+        inserted = db.execute(
+            insert(Enrollment).returning(Enrollment.id, Enrollment.user_id, Enrollment.course_id), rows)
+        for enrollment_id, user_id, course_id in inserted:
+            results[first_seen[user_id, course_id]] = _bulk_result(user_id, course_id, enrollment_id)
+        courses_table = Course.__table__
+        shifted = db.execute(
+            update(courses_table)
+            .where(courses_table.c.id == bindparam("course"),
+                   courses_table.c.enrolled_count + bindparam("added") <= courses_table.c.capacity)
+            .values(enrolled_count=courses_table.c.enrolled_count + bindparam("added")),
+            [{"course": course_id, "added": added} for course_id, added in admitted.items()])
+        if db.get_bind().dialect.supports_sane_multi_rowcount and shifted.rowcount != len(admitted):
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Course seats changed during bulk enrollment; retry the request")
+        for course_id, added in admitted.items():
+            course = courses[course_id]
+            record_availability(db, course_id, course.enrolled_count + added, course.capacity, True)
+        for row in rows:
+            mark_enrollment_changed(db, row["user_id"], row["course_id"])
+
+    db.commit()
+    return results
+
+
+def get_enrollment_with_details(db: Session, enrollment_id: int) -> Optional[Enrollment]:
+    """Load an enrollment with its student and course"""
+    return _with_relations(db).filter(Enrollment.id == enrollment_id).first()
+
+
+def _remove(db: Session, enrollment: Enrollment) -> None:
+    """
+    Delete an enrollment and release its seat.
+
+    The seat is only released when this DELETE removed the row, so two
+    concurrent deregistrations of one enrollment shift the counter once
+    and the second gets a 404.
+    """
+    deleted = db.execute(delete(Enrollment).where(Enrollment.id == enrollment.id)).rowcount
+    if deleted != 1:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+    # A bulk DELETE skips the mapper events that record the change
+    mark_enrollment_changed(db, enrollment.user_id, enrollment.course_id)
+    adjust_enrolled_count(db, enrollment.course_id, -1)
+    db.commit()
+
+
+@event.listens_for(Enrollment, "after_delete")
+def _release_seat(mapper, connection, target):
+    """Enrollments deleted through the ORM (e.g. with their user) release their seat too"""
+    courses = Course.__table__
+    seats = connection.execute(
+        update(courses)
+        .where(courses.c.id == target.course_id)
+        .values(enrolled_count=courses.c.enrolled_count - 1)
+        .returning(courses.c.enrolled_count, courses.c.capacity, courses.c.is_active)
+    ).first()
+    if seats is not None:
+        record_availability(Session.object_session(target), target.course_id, *seats)
+
+
+def get_enrollment_or_404(db: Session, enrollment_id: int) -> Enrollment:
+    """Load an enrollment or raise 404"""
+    enrollment = db.query(Enrollment).filter(
+        Enrollment.id == enrollment_id).first()
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+    return enrollment
+
+
+def deregister(db: Session, enrollment_id: int, current_user: User) -> None:
+    """Remove an enrollment owned by the current user (admins may remove any)"""
+    enrollment = get_enrollment_or_404(db, enrollment_id)
+    if enrollment.user_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Cannot deregister another student")
+    _remove(db, enrollment)
+
+
+def deregister_by_course(db: Session, user_id: int, course_id: int) -> None:
+    """Remove a student's enrollment in a course"""
+    enrollment = db.query(Enrollment).filter(
+        Enrollment.user_id == user_id, Enrollment.course_id == course_id).first()
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Not enrolled")
+    _remove(db, enrollment)
+
+
+def remove_enrollment(db: Session, enrollment_id: int) -> None:
+    """Remove any enrollment (admin)"""
+    _remove(db, get_enrollment_or_404(db, enrollment_id))
+
+
+def list_user_enrollments(db: Session, user_id: int) -> List[Enrollment]:
+    """All of a student's enrollments"""
+    return _with_relations(db).filter(Enrollment.user_id == user_id).all()
+
+
+def list_course_enrollments(db: Session, course_id: int) -> List[Enrollment]:
+    """All enrollments in a course, 404 if the course does not exist"""
+    get_course_or_404(db, course_id)
+    return _with_relations(db).filter(Enrollment.course_id == course_id).all()
+
+
+def list_enrollments(
+    db: Session,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: str,
+    include_total: bool,
+    user_id: Optional[int],
+    course_id: Optional[int]
+) -> Page:
+    """One page of the admin enrollment listing, as enrollment_rows dicts"""
+    query = enrollment_rows(db)
+
+    # Apply filters
+    if user_id:
+        query = query.filter(Enrollment.user_id == user_id)
+    if course_id:
+        query = query.filter(Enrollment.course_id == course_id)
+
+    # Apply pagination (the total rides along on the page query when possible)
+    return paginate(
+        query, Enrollment, sort=sort, allowed_sorts=ENROLLMENT_SORT_FIELDS,
+        limit=limit, skip=skip, cursor=cursor, include_total=include_total,
+        total_cache_key="enrollments" if not (user_id or course_id) else None)
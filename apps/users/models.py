@@ -1,5 +1,5 @@
-from sqlalchemy import Column, DateTime, Integer, String, Boolean, Enum, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DDL, DateTime, ForeignKey, Integer, String, Boolean, Enum, Index, delete, event, func
+from sqlalchemy.orm import declarative_base, relationship
 from apps.config.database import Base
 import enum
 
@@ -13,6 +13,10 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """User model representing system users"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin listings filtered by role/status, paged by id
+        Index("ix_users_role_is_active_id", "role", "is_active", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -66,3 +70,56 @@ class User(Base):
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+
+# The token table only exists where indexed user search reads it (not on
+# PostgreSQL), so it is kept off Base.metadata and created, dropped and
+# cleaned up by the listeners below
+SearchTokenBase = declarative_base()
+
+
+def uses_search_tokens(dialect) -> bool:
+    """PostgreSQL searches users through pg_trgm indexes rather than tokens"""
+    return dialect.name != "postgresql"
+
+
+class UserSearchToken(SearchTokenBase):
+    """Normalized word tokens of a user's name and email, for indexed prefix search"""
+    __tablename__ = "user_search_tokens"
+    __table_args__ = (
+        Index("ix_user_search_tokens_user_id", "user_id"),
+    )
+
+    # (token, user_id) primary key doubles as the prefix-range index
+    token = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey(
+        User.id, ondelete="CASCADE"), primary_key=True)
+
+
+@event.listens_for(User.__table__, "after_create")
+def _create_search_tokens(target, connection, **kw):
+    if uses_search_tokens(connection.dialect):
+        UserSearchToken.__table__.create(connection, checkfirst=True)
+
+
+@event.listens_for(User.__table__, "before_drop")
+def _drop_search_tokens(target, connection, **kw):
+    UserSearchToken.__table__.drop(connection, checkfirst=True)
+
+
+@event.listens_for(User, "before_delete")
+def _delete_search_tokens(mapper, connection, target):
+    if uses_search_tokens(connection.dialect):
+        connection.execute(delete(UserSearchToken).where(UserSearchToken.user_id == target.id))
+
+
+# PostgreSQL serves indexed user search from trigram indexes instead of tokens
+USER_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)",
+]
+
+for _statement in USER_SEARCH_DDL:
+    event.listen(User.__table__, "after_create",
+                 DDL(_statement).execute_if(dialect="postgresql"))
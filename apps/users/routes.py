@@ -1,133 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from apps.config.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from apps.config.database import get_db, get_read_db
 from apps.users.models import User
-from apps.users.schemas import UserCreate, UserUpdate
-from apps.users.services import get_user_by_email
-from apps.common.security import hash_password, get_current_active_user, require_admin
+from apps.users.schemas import UserCreate, UserUpdate, user_serializer
+from apps.users.search import SEARCH_MODES
+from apps.users import services
+from apps.common.security import get_current_active_user, require_admin
+from apps.common.passwords import password_hasher
 from apps.common.responses import success_response
+from apps.common.etags import PRIVATE_REVALIDATE, not_modified, validators
+from apps.common.versions import COURSES, USERS, current, user_key
+from apps.common.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    if get_user_by_email(db, user_data.email):
+async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+    if await db.run_sync(services.get_user_by_email, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    new_user = User(
-        name=user_data.name,
-        email=user_data.email,
-        hashed_password=hash_password(user_data.password),
-        role=user_data.role,
-        is_active=True
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return success_response(data=new_user.to_dict(), message="User registered successfully")
+    hashed_password = await password_hasher.hash(user_data.password)
+    new_user = await db.run_sync(services.create_user, user_data, hashed_password)
+    return success_response(data=user_serializer.one(new_user), message="User registered successfully", status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/me", response_model=None)
-def get_my_profile(current_user: User = Depends(get_current_active_user)):
-    return success_response(data=current_user.to_dict(), message="Profile retrieved successfully")
+async def get_my_profile(request: Request, current_user: User = Depends(get_current_active_user)):
+    headers = validators(request, current(user_key(current_user.id)), "user", current_user.id,
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    return success_response(data=user_serializer.one(current_user), message="Profile retrieved successfully", headers=headers)
 
 
 @router.get("/me/with-enrollments", response_model=None)
-def get_my_profile_with_courses(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def get_my_profile_with_courses(request: Request, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
     """Get current user profile with enrolled courses"""
-    user_with_enrollments = db.query(User).options(
-        joinedload(User.enrollments)
-    ).filter(User.id == current_user.id).first()
+    headers = validators(request, current(user_key(current_user.id), COURSES), "user-courses", current_user.id,
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
 
-    return success_response(data=user_with_enrollments.to_dict(include_enrollments=True), message="Profile with courses retrieved successfully")
+    user_with_enrollments = await db.run_sync(services.get_user_with_enrollments, current_user.id)
+    return success_response(data=user_with_enrollments.to_dict(include_enrollments=True), message="Profile with courses retrieved successfully",
+                            headers=headers)
 
 
 @router.put("/me")
-def update_my_profile(user_update: UserUpdate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    if user_update.name is not None:
-        current_user.name = user_update.name
-    if user_update.is_active is not None:
-        current_user.is_active = user_update.is_active
-    db.commit()
-    db.refresh(current_user)
-    return success_response(data=current_user.to_dict(), message="Profile updated successfully")
+async def update_my_profile(user_update: UserUpdate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    user = await db.run_sync(services.update_profile, current_user, user_update)
+    return success_response(data=user_serializer.one(user), message="Profile updated successfully")
 
 
 @router.get("", response_model=None)
-def get_all_users(
+async def get_all_users(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
+    sort: str = "id",
+    include_total: bool = True,
     search: str = None,
+    search_mode: str = "indexed",
     role: str = None,
     is_active: bool = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_admin)
 ):
     """
     Get all users with optional filtering and pagination (Admin only).
     
-    - skip: Number of records to skip (default: 0)
+    - skip: Number of records to skip (legacy offset mode, default: 0)
     - limit: Maximum number of records to return (default: 100, max: 1000)
+    - cursor: Opaque `next_cursor` from the previous page (keyset mode)
+    - sort: id, name, email or created_at; prefix with "-" for descending (default: id)
+    - include_total: Compute the matching total (default: true); `total_is_exact` is false when a recently cached total is returned
     - search: Search users by name or email (case-insensitive)
+    - search_mode: "indexed" (default) uses the search index (word prefixes; trigram substring match on PostgreSQL); "substring" matches anywhere in name or email
     - role: Filter by role (student/admin)
     - is_active: Filter by active status (true/false)
     """
     # Limit max page size
-    limit = min(limit, 1000)
-    
-    query = db.query(User)
-    
-    # Apply filters
-    if role:
-        query = query.filter(User.role == role)
-    if is_active is not None:
-        query = query.filter(User.is_active == is_active)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (User.name.ilike(search_term)) | (User.email.ilike(search_term))
-        )
-    
-    # Get total count before pagination
-    total = query.count()
+    limit = min(limit, MAX_PAGE_SIZE)
     
-    # Apply pagination
-    users = query.offset(skip).limit(limit).all()
+    if search_mode not in SEARCH_MODES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"search_mode must be one of: {', '.join(SEARCH_MODES)}")
+
+    headers = validators(request, current(USERS), "users", cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    page = await db.run_sync(
+        services.list_users, skip=skip, limit=limit, cursor=cursor, sort=sort,
+        include_total=include_total, search=search, search_mode=search_mode,
+        role=role, is_active=is_active)
     
     return success_response(
-        data={
-            "items": [u.to_dict() for u in users],
-            "total": total,
-            "skip": skip,
-            "limit": limit
-        },
-        message="Users retrieved successfully"
+        data=page.to_dict(user_serializer.many),
+        message="Users retrieved successfully",
+        headers=headers
     )
 
 
 
 @router.get("/{user_id}", response_model=None)
-def get_user(user_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return success_response(data=user.to_dict(), message="User retrieved successfully")
+async def get_user(user_id: int, request: Request, db: Session = Depends(get_read_db), _: User = Depends(require_admin)):
+    headers = validators(request, current(user_key(user_id)), "user", user_id, cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    user = await db.run_sync(services.get_user_or_404, user_id)
+    return success_response(data=user_serializer.one(user), message="User retrieved successfully", headers=headers)
 
 
 @router.get("/{user_id}/with-enrollments", response_model=None)
-def get_user_with_enrollments(user_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)):
+async def get_user_with_enrollments(user_id: int, request: Request, db: Session = Depends(get_read_db), _: User = Depends(require_admin)):
     """Get user with enrolled courses"""
-    user_with_enrollments = db.query(User).options(
-        joinedload(User.enrollments)
-    ).filter(User.id == user_id).first()
-
-    if not user_with_enrollments:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    return success_response(data=user_with_enrollments.to_dict(include_enrollments=True), message="User with courses retrieved successfully")
+    headers = validators(request, current(user_key(user_id), COURSES), "user-courses", user_id,
+                         cache_control=PRIVATE_REVALIDATE)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+
+    user_with_enrollments = await db.run_sync(services.get_user_with_enrollments, user_id)
+    return success_response(data=user_with_enrollments.to_dict(include_enrollments=True), message="User with courses retrieved successfully",
+                            headers=headers)
@@ -3,6 +3,7 @@ from typing import Optional, List
 from datetime import datetime
 import re
 from apps.users.models import UserRole
+from apps.common.serializers import Serializer
 
 
 class UserBase(BaseModel):
@@ -120,3 +121,6 @@ class TokenData(BaseModel):
     """Schema for token payload data"""
     email: Optional[str] = None
     role: Optional[str] = None
+
+
+user_serializer = Serializer(UserResponse)
@@ -0,0 +1,96 @@
+from typing import Iterable, List, Set
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Query, Session
+from apps.common.search import search_terms
+from apps.users.models import User, UserSearchToken, uses_search_tokens
+
+SEARCH_MODES = ("indexed", "substring")
+
+# Upper bound for a prefix range scan: sorts after every string with the prefix
+_PREFIX_END = chr(0x10FFFF)
+
+# Prefixes matching more tokens than this are filtered by scanning users in
+# page order instead of materializing every matching id
+BROAD_PREFIX_THRESHOLD = 10000
+
+
+def user_tokens(name: str, email: str) -> Set[str]:
+    """Every word of the name and email (local part and domain pieces)"""
+    return set(search_terms(name)) | set(search_terms(email))
+
+
+def _token_rows(users) -> List[dict]:
+    return [
+        {"user_id": u.id, "token": token}
+        for u in users
+        for token in user_tokens(u.name, u.email)
+    ]
+
+
+def index_user_search_tokens(db: Session, users: Iterable[User]) -> None:
+    """
+    Rewrite the search tokens of `users` inside the caller's transaction.
+
+    Users must already have ids (flush first). No-op on PostgreSQL.
+    """
+    if not uses_search_tokens(db.get_bind().dialect):
+        return
+    users = list(users)
+    db.execute(delete(UserSearchToken).where(
+        UserSearchToken.user_id.in_([u.id for u in users])))
+    rows = _token_rows(users)
+    if rows:
+        db.execute(insert(UserSearchToken), rows)
+
+
+def substring_filter(term: str):
+    """The original case-insensitive infix match on name or email"""
+    search_term = f"%{term}%"
+    return (User.name.ilike(search_term)) | (User.email.ilike(search_term))
+
+
+def apply_user_search(query: Query, db: Session, term: str, mode: str = "indexed") -> Query:
+    """
+    Filter a User query by a search term.
+
+    Indexed mode on PostgreSQL is the substring match served by pg_trgm GIN
+    indexes. Elsewhere every word of the term must prefix-match one of the
+    user's name/email tokens via a range scan on the token index. A bounded
+    probe sizes each prefix first: selective words become an id IN (...)
+    filter, while broad ones become a correlated EXISTS that stops as soon
+    as a page is filled, so latency tracks the page size rather than the
+    table size. Substring mode, or a term with no words, uses the plain ILIKE.
+    """
+    terms = search_terms(term)
+    if mode != "indexed" or not terms or not uses_search_tokens(db.get_bind().dialect):
+        return query.filter(substring_filter(term))
+
+    for t in terms:
+        in_range = (UserSearchToken.token >= t) & (UserSearchToken.token < t + _PREFIX_END)
+        probe = select(UserSearchToken.user_id).where(in_range).limit(BROAD_PREFIX_THRESHOLD).subquery()
+        if db.execute(select(func.count()).select_from(probe)).scalar() < BROAD_PREFIX_THRESHOLD:
+            query = query.filter(User.id.in_(select(UserSearchToken.user_id).where(in_range)))
+        else:
+            query = query.filter(exists().where(UserSearchToken.user_id == User.id, in_range))
+    return query
+
+
+def rebuild_user_search_index(db: Session, batch_size: int = 5000) -> int:
+    """Regenerate every user's search tokens; returns the number of users indexed"""
+    if not uses_search_tokens(db.get_bind().dialect):
+        return 0
+    db.execute(delete(UserSearchToken))
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(User.id, User.name, User.email)
+            .where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        db.execute(insert(UserSearchToken), _token_rows(batch))
+        indexed += len(batch)
+        last_id = batch[-1].id
+    db.commit()
+    return indexed
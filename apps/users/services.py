@@ -1,7 +1,15 @@
 from typing import Optional
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from apps.users.models import User, UserRole
-from apps.common.security import verify_password
+from apps.users.schemas import UserCreate, UserUpdate
+from apps.users.search import apply_user_search, index_user_search_tokens
+from apps.common.passwords import password_hasher
+from apps.common.pagination import Page, paginate
+from apps.common.loaders import user_options
+from apps.common.projections import user_rows
+
+USER_SORT_FIELDS = ("id", "name", "email", "created_at")
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -9,11 +17,92 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user"""
-    user = get_user_by_email(db, email)
+def get_user_or_404(db: Session, user_id: int) -> User:
+    """Load a user or raise 404"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
+def get_user_with_enrollments(db: Session, user_id: int) -> User:
+    """Load a user with their enrollments and courses"""
+    user = db.query(User).options(
+        *user_options(include_enrollments=True)
+    ).filter(User.id == user_id).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
+def create_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
+    """Insert a new active user and index it for search"""
+    new_user = User(
+        name=user_data.name,
+        email=user_data.email,
+        hashed_password=hashed_password,
+        role=user_data.role,
+        is_active=True
+    )
+    db.add(new_user)
+    db.flush()
+    index_user_search_tokens(db, [new_user])
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
+def update_profile(db: Session, user: User, user_update: UserUpdate) -> User:
+    """Apply a self-service profile update"""
+    if user_update.name is not None:
+        user.name = user_update.name
+        index_user_search_tokens(db, [user])
+    if user_update.is_active is not None:
+        user.is_active = user_update.is_active
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def list_users(
+    db: Session,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: str,
+    include_total: bool,
+    search: Optional[str],
+    search_mode: str,
+    role: Optional[str],
+    is_active: Optional[bool]
+) -> Page:
+    """One page of the admin user listing, as user_rows dicts"""
+    query = user_rows(db)
+
+    # Apply filters
+    if role:
+        query = query.filter(User.role == role)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    if search:
+        query = apply_user_search(query, db, search, search_mode)
+
+    # Apply pagination (the total rides along on the page query when possible)
+    return paginate(
+        query, User, sort=sort, allowed_sorts=USER_SORT_FIELDS,
+        limit=limit, skip=skip, cursor=cursor, include_total=include_total,
+        total_cache_key="users" if not (role or search) and is_active is None else None)
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """Authenticate a user (bcrypt runs in the password-hashing pool)"""
+    user = await db.run_sync(get_user_by_email, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
     return user
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark request throughput with sync sessions vs DATABASE_ASYNC=true
+
+Starts uvicorn once per mode against the same seeded database and drives
+the public catalog endpoints (course page + course detail) with many
+concurrent clients, reporting requests/s and latency percentiles. In sync
+mode every request's ORM work queues for Starlette's threadpool (40
+threads by default); in async mode it runs on the event loop.
+
+Usage:
+    python benchmarks/bench_async_throughput.py
+    python benchmarks/bench_async_throughput.py --concurrency 50 200 500 --duration 10
+    python benchmarks/bench_async_throughput.py --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from apps.config.database import Base
+import apps.users.models  # noqa: F401
+import apps.enrollments.models  # noqa: F401
+from apps.courses.models import Course
+
+
+def seed(url, n_courses):
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "capacity": 50, "is_active": True, "enrolled_count": 0}
+            for i in range(n_courses)
+        ])
+    engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(url, database_async, port):
+    env = dict(os.environ, DATABASE_URL=url, DATABASE_ASYNC=str(database_async).lower(), DEBUG="false",
+               CHECK_MIGRATIONS_ON_STARTUP="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def drive(port, n_courses, concurrency, duration):
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+        async def worker(seed):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < stop_at:
+                if rng.random() < 0.5:
+                    path = f"/api/v1/courses?limit=20&include_total=false&skip={rng.randrange(n_courses - 20)}"
+                else:
+                    path = f"/api/v1/courses/{rng.randrange(1, n_courses + 1)}"
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per measurement")
+    parser.add_argument("--database-url", help="Scratch database (all tables are dropped). Defaults to a temp SQLite file.")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+    seed(url, args.courses)
+
+    print(f"{'mode':<8}{'clients':>9}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for database_async in (False, True):
+        port = free_port()
+        server = start_server(url, database_async, port)
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(drive(port, args.courses, concurrency, args.duration))
+                print(f"{'async' if database_async else 'sync':<8}{concurrency:>9}{result['rps']:>10.0f}"
+                      f"{result['p50']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
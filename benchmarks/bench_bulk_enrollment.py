@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk enrollment against one enrollment per request
+
+Seeds students and courses, then enrolls the same batch of (user, course)
+pairs (10k by default, with a share of repeats and pairs that are already
+enrolled) twice on fresh copies of the data: once pair by pair through
+enroll_student, as a loop of POST /api/v1/enrollments would, and once
+through bulk_enroll in a single transaction. Prints wall time, pairs/s
+and SQL statements for each.
+
+Usage:
+    python benchmarks/bench_bulk_enrollment.py
+    python benchmarks/bench_bulk_enrollment.py --pairs 10000 --courses 20
+    python benchmarks/bench_bulk_enrollment.py --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from apps.config.database import Base, DatabaseSession
+from apps.common.query_stats import record_queries
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.enrollments.services import bulk_enroll, enroll_student
+from apps.users.models import User, UserRole
+
+
+def seed(engine, n_students, n_courses, capacity, preenrolled):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"Student {i}", "email": f"student{i}@bench.test", "hashed_password": "x",
+             "role": UserRole.STUDENT, "is_active": True}
+            for i in range(n_students)
+        ])
+        counts = {}
+        for _, course_id in preenrolled:
+            counts[course_id] = counts.get(course_id, 0) + 1
+        conn.execute(insert(Course), [
+            {"id": i, "title": f"Course {i}", "code": f"C{i:05d}", "capacity": capacity, "is_active": True,
+             "enrolled_count": counts.get(i, 0)}
+            for i in range(1, n_courses + 1)
+        ])
+        conn.execute(insert(Enrollment), [{"user_id": u, "course_id": c} for u, c in preenrolled])
+
+
+def one_by_one(session, pairs):
+    enrolled = 0
+    for user_id, course_id in pairs:
+        try:
+            enroll_student(session, user_id, course_id)
+            enrolled += 1
+        except HTTPException:
+            pass
+    return enrolled
+
+
+def bulk(session, pairs):
+    return sum(result["status"] == "enrolled" for result in bulk_enroll(session, pairs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=10000)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--database-url", help="Scratch database (all tables are dropped). Defaults to a temp SQLite file.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    n_students = args.pairs // 2
+    # Distinct pairs plus 5% repeats; 5% of the distinct pairs are enrolled beforehand
+    distinct = list({(rng.randrange(1, n_students + 1), rng.randrange(1, args.courses + 1))
+                     for _ in range(args.pairs)})
+    pairs = distinct + rng.sample(distinct, len(distinct) // 20)
+    rng.shuffle(pairs)
+    preenrolled = rng.sample(distinct, len(distinct) // 20)
+    capacity = len(distinct) // args.courses  # tight enough that some courses fill up
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_bulk.db')}"
+    engine = create_engine(url)
+    Session = sessionmaker(class_=DatabaseSession, bind=engine, autoflush=False)
+
+    print(f"{len(pairs)} pairs, {args.courses} courses of {capacity} seats")
+    print(f"{'mode':<14}{'seconds':>10}{'pairs/s':>10}{'statements':>12}{'enrolled':>10}")
+    for name, run in (("one by one", one_by_one), ("bulk", bulk)):
+        seed(engine, n_students, args.courses, capacity, preenrolled)
+        with Session() as session, record_queries() as stats:
+            started = time.perf_counter()
+            enrolled = run(session, pairs)
+            elapsed = time.perf_counter() - started
+        print(f"{name:<14}{elapsed:>10.2f}{len(pairs) / elapsed:>10.0f}{stats.count:>12}{enrolled:>10}")
+
+
+if __name__ == "__main__":
+    main()
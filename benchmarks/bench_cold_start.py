@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker cold start: import-time create_all vs the migration head check
+
+Migrates a scratch database to head, then boots fresh interpreter
+processes the way a uvicorn/gunicorn worker does, in two modes:
+
+    create_all  the old boot: import main with the asyncio extension and
+                PostgreSQL dialect loaded eagerly, then
+                Base.metadata.create_all
+    head-check  import main, then the lifespan's startup check, which only
+                compares alembic_version with the migration scripts' head
+
+and reports the median import time, schema step time and total process
+wall time per worker.
+
+Usage:
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --runs 20 --database-url postgresql://...
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT = {
+    "create_all": """
+import json, time
+start = time.perf_counter()
+import sqlalchemy.ext.asyncio, sqlalchemy.dialects.postgresql
+import main
+imported = time.perf_counter()
+from apps.config.database import Base, engine
+Base.metadata.create_all(bind=engine)
+print(json.dumps({"import": imported - start, "schema": time.perf_counter() - imported}))
+""",
+    "head-check": """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.check_schema_current(main.engine)
+print(json.dumps({"import": imported - start, "schema": time.perf_counter() - imported}))
+""",
+}
+
+
+def boot_once(mode, env):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", BOOT[mode]], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    wall = time.perf_counter() - start
+    timings = json.loads(output.strip().splitlines()[-1])
+    return timings["import"] * 1000, timings["schema"] * 1000, wall * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", help="Scratch database to migrate. Defaults to a temp SQLite file.")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_boot.db')}"
+    env = dict(os.environ, DATABASE_URL=url, CHECK_MIGRATIONS_ON_STARTUP="true")
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env,
+                   check=True, capture_output=True)
+
+    print(f"{'mode':<12}{'import ms':>11}{'schema ms':>11}{'process ms':>12}")
+    for mode in ("create_all", "head-check"):
+        samples = [boot_once(mode, env) for _ in range(args.runs)]
+        imported, schema, wall = (statistics.median(column) for column in zip(*samples))
+        print(f"{mode:<12}{imported:>11.1f}{schema:>11.2f}{wall:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
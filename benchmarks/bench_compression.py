@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression on a large admin listing
+
+Renders a GET /api/v1/enrollments page (each enrollment embedding its
+student and course, as the endpoint returns them) and compresses the
+body with CompressionMiddleware's encoders at several levels. For each
+it reports the body size, the median time to compress it, and the
+estimated latency to deliver the page over a link of --mbps megabits
+per second (compression time plus transfer time).
+
+Brotli rows are shown only when the `brotli` package is installed.
+
+Usage:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --items 1000 --mbps 20 --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.common import compression
+from apps.common.compression import BrotliEncoder, GzipEncoder
+from apps.common.responses import success_response
+
+
+def enrollment_page(items):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_id": i,
+            "course_id": i % 50,
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=i),
+            "user": {"id": i, "name": f"Student {i}", "email": f"student{i}@example.com", "role": "student"},
+            "course": {"id": i % 50, "title": f"Introduction to Topic {i % 50}", "code": f"C{i % 50:05d}",
+                       "capacity": 30, "is_active": True},
+        }
+        for i in range(items)
+    ]
+
+
+def median_ms(compress, body, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        compress(body)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--mbps", type=float, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    data = {"items": enrollment_page(args.items), "total": args.items, "total_is_exact": True,
+            "skip": 0, "limit": args.items, "next_cursor": None}
+    body = success_response(data=data, message="Enrollments retrieved").body
+
+    encodings = [("identity", lambda body: body)]
+    encodings += [(f"gzip-{level}", lambda body, level=level: GzipEncoder(level).finish(body))
+                  for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        encodings += [(f"br-{quality}", lambda body, quality=quality: BrotliEncoder(quality).finish(body))
+                      for quality in (1, 4, 11)]
+
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+    print(f"{'encoding':<10}{'bytes':>10}{'ratio':>8}{'cpu ms':>9}{'latency ms':>12}")
+    for name, compress in encodings:
+        size = len(compress(body))
+        cpu = median_ms(compress, body, args.runs)
+        print(f"{name:<10}{size:>10}{len(body) / size:>8.1f}{cpu:>9.2f}{cpu + size / bytes_per_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark course catalog search: substring ILIKE vs the full-text index
+
+Loads a synthetic catalog (100k courses by default) and times one page of
+GET /api/v1/courses?search=... worth of SQL for several search terms in
+both search modes, printing the query plans.
+
+Usage:
+    python benchmarks/bench_course_search.py
+    python benchmarks/bench_course_search.py --courses 20000 --runs 50
+    python benchmarks/bench_course_search.py --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from apps.config.database import Base
+import apps.users.models  # noqa: F401
+import apps.enrollments.models  # noqa: F401
+from apps.courses.models import Course
+from apps.courses.search import apply_course_search
+from apps.common.pagination import paginate
+
+SUBJECTS = ["Python", "Databases", "Statistics", "Algorithms", "Networks", "Design", "Marketing",
+            "Accounting", "Biology", "Chemistry", "Physics", "Calculus", "Writing", "History",
+            "Economics", "Security", "Robotics", "Compilers", "Graphics", "Linguistics"]
+LEVELS = ["Introduction to", "Advanced", "Applied", "Foundations of", "Topics in", "Practical"]
+EXTRAS = ["for Beginners", "with Projects", "and Society", "in Practice", "Workshop", "Seminar", ""]
+
+SEARCHES = ["pyth", "advanced data", "robotics seminar", "calc", "00123", "zzz"]
+
+
+def populate(engine, n_courses, chunk=20000):
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        for start in range(0, n_courses, chunk):
+            conn.execute(insert(Course), [
+                {
+                    "title": f"{rng.choice(LEVELS)} {rng.choice(SUBJECTS)} {rng.choice(EXTRAS)}".strip(),
+                    "code": f"{rng.choice(SUBJECTS)[:3].upper()}{i:06d}",
+                    "capacity": 50,
+                    "is_active": True,
+                    "enrolled_count": 0,
+                }
+                for i in range(start, min(start + chunk, n_courses))
+            ])
+
+
+def time_search(Session, term, mode, runs):
+    timings = []
+    for _ in range(runs):
+        db = Session()
+        try:
+            start = time.perf_counter()
+            query, rank_by = apply_course_search(db.query(Course), db, term, mode)
+            page = paginate(query, Course, sort="id", allowed_sorts=("id",), limit=100, rank_by=rank_by)
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    return statistics.median(timings), page.total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--database-url", help="Scratch database (all tables are dropped). Defaults to a temp SQLite file.")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_search.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    start = time.perf_counter()
+    populate(engine, args.courses)
+    print(f"Loaded {args.courses} courses in {time.perf_counter() - start:.1f}s ({engine.dialect.name})\n")
+
+    print(f"{'search':<20}{'substring ms':>14}{'hits':>8}{'fulltext ms':>14}{'hits':>8}{'speedup':>10}")
+    for term in SEARCHES:
+        substring_ms, substring_hits = time_search(Session, term, "substring", args.runs)
+        fulltext_ms, fulltext_hits = time_search(Session, term, "fulltext", args.runs)
+        print(f"{term:<20}{substring_ms:>14.2f}{substring_hits:>8}{fulltext_ms:>14.2f}{fulltext_hits:>8}"
+              f"{substring_ms / fulltext_ms:>9.1f}x")
+
+    db = Session()
+    for mode in ("substring", "fulltext"):
+        query, rank_by = apply_course_search(db.query(Course), db, "pyth", mode)
+        statement = query.order_by(rank_by if rank_by is not None else Course.id).limit(100).statement
+        compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as conn:
+            prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+            plan = conn.exec_driver_sql(prefix + str(compiled)).fetchall()
+        print(f"\nPlan ({mode}, 'pyth'):")
+        for row in plan:
+            print(f"    {row[-1] if engine.dialect.name == 'sqlite' else row[0]}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
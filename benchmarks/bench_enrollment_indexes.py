@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the enrollment/user/course composite indexes
+
+Builds a synthetic dataset (1M enrollments by default), then runs the hot
+lookups with and without the composite indexes from migration 0003,
+printing each query plan and its median latency.
+
+Usage:
+    python benchmarks/bench_enrollment_indexes.py
+    python benchmarks/bench_enrollment_indexes.py --enrollments 200000
+    python benchmarks/bench_enrollment_indexes.py --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+
+from apps.config.database import Base
+from apps.users.models import User
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+
+COMPOSITE_INDEXES = {
+    "ix_enrollments_user_id_course_id": "CREATE UNIQUE INDEX ix_enrollments_user_id_course_id ON enrollments (user_id, course_id)",
+    "ix_enrollments_course_id_created_at": "CREATE INDEX ix_enrollments_course_id_created_at ON enrollments (course_id, created_at)",
+    "ix_users_role_is_active_id": "CREATE INDEX ix_users_role_is_active_id ON users (role, is_active, id)",
+    "ix_courses_is_active_id": "CREATE INDEX ix_courses_is_active_id ON courses (is_active, id)",
+}
+
+QUERIES = {
+    "duplicate check": (
+        "SELECT id FROM enrollments WHERE user_id = :user_id AND course_id = :course_id",
+        lambda r, n: {"user_id": r.randrange(n["users"]) + 1, "course_id": r.randrange(n["courses"]) + 1},
+    ),
+    "my-enrollments": (
+        "SELECT id, course_id FROM enrollments WHERE user_id = :user_id",
+        lambda r, n: {"user_id": r.randrange(n["users"]) + 1},
+    ),
+    "course roster": (
+        "SELECT id, user_id FROM enrollments WHERE course_id = :course_id ORDER BY created_at",
+        lambda r, n: {"course_id": r.randrange(n["courses"]) + 1},
+    ),
+    "active students page": (
+        "SELECT id, name FROM users WHERE role = 'STUDENT' AND is_active = :active AND id > :after ORDER BY id LIMIT 100",
+        lambda r, n: {"active": True, "after": r.randrange(n["users"])},
+    ),
+    "active courses page": (
+        "SELECT id, title FROM courses WHERE is_active = :active AND id > :after ORDER BY id LIMIT 100",
+        lambda r, n: {"active": True, "after": r.randrange(n["courses"])},
+    ),
+}
+
+
+def populate(engine, n_enrollments, per_user=10, n_courses=2000, chunk=50000):
+    """Insert users, courses and n_enrollments unique (user, course) pairs"""
+    n_users = n_enrollments // per_user
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "capacity": 1000,
+             "is_active": i % 10 != 0, "enrolled_count": 0}
+            for i in range(n_courses)
+        ])
+        for start in range(0, n_users, chunk):
+            conn.execute(insert(User), [
+                {"name": f"User {i}", "email": f"user{i}@bench.local", "hashed_password": "x",
+                 "role": "STUDENT" if i % 50 else "ADMIN", "is_active": i % 20 != 0}
+                for i in range(start, min(start + chunk, n_users))
+            ])
+        rows = []
+        for u in range(n_users):
+            for j in range(per_user):
+                # 197 * j stays below n_courses, so each user's courses are distinct
+                rows.append({"user_id": u + 1, "course_id": (u * 31 + j * 197) % n_courses + 1})
+            if len(rows) >= chunk:
+                conn.execute(insert(Enrollment), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Enrollment), rows)
+    return {"users": n_users, "courses": n_courses}
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return [row[-1] for row in rows]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"), params).fetchall()]
+
+
+def measure(engine, sizes, runs):
+    rng = random.Random(42)
+    with engine.connect() as conn:
+        for name, (sql, make_params) in QUERIES.items():
+            plan = explain(conn, sql, make_params(rng, sizes))
+            timings = []
+            for _ in range(runs):
+                params = make_params(rng, sizes)
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {name:<22} median {statistics.median(timings):9.3f} ms   p95 {sorted(timings)[int(runs * 0.95) - 1]:9.3f} ms")
+            for line in plan:
+                print(f"      plan: {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--database-url", help="Scratch database (all tables are dropped). Defaults to a temp SQLite file.")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        for name in COMPOSITE_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    start = time.perf_counter()
+    sizes = populate(engine, args.enrollments)
+    print(f"Loaded {args.enrollments} enrollments, {sizes['users']} users, {sizes['courses']} courses "
+          f"in {time.perf_counter() - start:.1f}s ({engine.dialect.name})")
+
+    print("\nWithout composite indexes:")
+    measure(engine, sizes, args.runs)
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for ddl in COMPOSITE_INDEXES.values():
+            conn.execute(text(ddl))
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+        else:
+            conn.execute(text("ANALYZE users; ANALYZE courses; ANALYZE enrollments"))
+    print(f"\nBuilt composite indexes in {time.perf_counter() - start:.1f}s")
+
+    print("\nWith composite indexes:")
+    measure(engine, sizes, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark rendering a large list response: stdlib JSON vs orjson
+
+Builds the envelope of a GET /api/v1/courses page (item dicts as the
+list endpoints produce them) and times the two ways of turning it into
+a response body:
+
+    stdlib  FastAPI's old path for a returned dict: jsonable_encoder,
+            then Starlette's JSONResponse (json.dumps)
+    orjson  success_response's APIResponse, which encodes the envelope
+            directly with orjson
+
+Usage:
+    python benchmarks/bench_json_response.py
+    python benchmarks/bench_json_response.py --items 5000 --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from apps.common.responses import success_response
+
+
+def course_page(items):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "title": f"Introduction to Topic {i}",
+            "code": f"C{i:05d}",
+            "capacity": 30,
+            "is_active": True,
+            "enrolled_count": i % 31,
+            "is_full": i % 31 >= 30,
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+            "updated_at": (start + timedelta(minutes=i)).isoformat()
+        }
+        for i in range(items)
+    ]
+
+
+def stdlib(data):
+    content = jsonable_encoder({"status": "success", "message": "Courses retrieved", "data": data})
+    return JSONResponse(content).body
+
+
+def orjson_(data):
+    return success_response(data=data, message="Courses retrieved").body
+
+
+def median_ms(render, data, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render(data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    data = {"items": course_page(args.items), "total": args.items, "total_is_exact": True,
+            "skip": 0, "limit": args.items, "next_cursor": None}
+    assert stdlib(data) == orjson_(data)
+
+    print(f"{'renderer':<10}{'ms/page':>10}{'bytes':>10}")
+    for name, render in (("stdlib", stdlib), ("orjson", orjson_)):
+        print(f"{name:<10}{median_ms(render, data, args.runs):>10.2f}{len(render(data)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark list pages: ORM hydration + to_dict() vs column projections
+
+Seeds a file database, then builds a page of GET /courses, /users and
+/enrollments two ways:
+
+    orm         the previous path: paginate ORM instances (enrollments
+                with their student and course joined in) and flatten
+                each one with to_dict()
+    projection  the current services: select only the serialized
+                columns as plain row dicts and serialize them with the
+                response schema's serializer
+
+and reports the median CPU time and the peak traced memory per page.
+
+Usage:
+    python benchmarks/bench_list_projection.py
+    python benchmarks/bench_list_projection.py --rows 5000 --limit 1000 --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from apps.common.loaders import enrollment_options
+from apps.common.pagination import paginate
+from apps.config.database import Base
+from apps.courses.models import Course
+from apps.courses.schemas import course_serializer
+from apps.courses.services import COURSE_SORT_FIELDS, list_courses
+from apps.enrollments.models import Enrollment
+from apps.enrollments.schemas import enrollment_serializer
+from apps.enrollments.services import ENROLLMENT_SORT_FIELDS, list_enrollments
+from apps.users.models import User
+from apps.users.schemas import user_serializer
+from apps.users.services import USER_SORT_FIELDS, list_users
+
+
+def seed(path, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "capacity": 100, "is_active": True, "enrolled_count": 1}
+            for i in range(rows)
+        ])
+        conn.execute(insert(User), [
+            {"name": f"Student {i}", "email": f"student{i}@example.com", "hashed_password": "x" * 60,
+             "role": "STUDENT", "is_active": True}
+            for i in range(rows)
+        ])
+        conn.execute(insert(Enrollment), [
+            {"user_id": i + 1, "course_id": i + 1} for i in range(rows)
+        ])
+    return engine
+
+
+def orm_page(db, model, allowed_sorts, limit, options=()):
+    page = paginate(db.query(model).options(*options), model, sort="id", allowed_sorts=allowed_sorts,
+                    limit=limit, include_total=True)
+    return page.to_dict(lambda objs: [obj.to_dict() for obj in objs])
+
+
+LISTINGS = {
+    "courses": (
+        lambda db, limit: orm_page(db, Course, COURSE_SORT_FIELDS, limit),
+        lambda db, limit: list_courses(db, skip=0, limit=limit, cursor=None, sort=None, include_total=True,
+                                       search=None, search_mode="fulltext", is_active=None).to_dict(course_serializer.many),
+    ),
+    "users": (
+        lambda db, limit: orm_page(db, User, USER_SORT_FIELDS, limit),
+        lambda db, limit: list_users(db, skip=0, limit=limit, cursor=None, sort="id", include_total=True,
+                                     search=None, search_mode="indexed", role=None,
+                                     is_active=None).to_dict(user_serializer.many),
+    ),
+    "enrollments": (
+        lambda db, limit: orm_page(db, Enrollment, ENROLLMENT_SORT_FIELDS, limit, enrollment_options()),
+        lambda db, limit: list_enrollments(db, skip=0, limit=limit, cursor=None, sort="id", include_total=True,
+                                           user_id=None, course_id=None).to_dict(enrollment_serializer.many),
+    ),
+}
+
+
+def measure(Session, build, limit, runs):
+    cpu = []
+    for _ in range(runs):
+        db = Session()
+        start = time.process_time()
+        page = build(db, limit)
+        cpu.append((time.process_time() - start) * 1000)
+        db.close()
+        assert len(page["items"]) == limit
+
+    db = Session()
+    tracemalloc.start()
+    build(db, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.close()
+    return statistics.median(cpu), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = seed(os.path.join(tempfile.mkdtemp(), "bench_lists.db"), args.rows)
+    Session = sessionmaker(bind=engine)
+
+    print(f"{'listing':<13}{'path':<12}{'cpu ms':>9}{'peak KiB':>11}")
+    for name, (orm, projection) in LISTINGS.items():
+        for path, build in (("orm", orm), ("projection", projection)):
+            with Session() as db:
+                build(db, args.limit)  # warm the statement caches
+            cpu, peak = measure(Session, build, args.limit, args.runs)
+            print(f"{name:<13}{path:<12}{cpu:>9.2f}{peak:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark row serialization: Model.to_dict() vs the schema serializers
+
+Seeds a file database, loads 1000-row pages and serializes them:
+
+    to_dict          the models' hand-written to_dict() over ORM instances
+    serializer       the response schemas' precompiled pydantic-core
+                     serializers (apps/common/serializers.py) over the
+                     same ORM instances
+    serializer/rows  the same serializers over the projected row dicts
+                     the list endpoints fetch (apps/common/projections.py)
+
+for courses, users and enrollments (with student and course), then
+reports the median milliseconds per page to serialize (every path then
+goes through the same orjson encoding) and to load and serialize, since
+the projected dicts are built while the rows are fetched.
+
+Usage:
+    python benchmarks/bench_serializers.py
+    python benchmarks/bench_serializers.py --rows 5000 --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from apps.common.loaders import enrollment_options
+from apps.common.projections import course_rows, enrollment_rows, user_rows
+from apps.config.database import Base
+from apps.courses.models import Course
+from apps.courses.schemas import course_serializer
+from apps.enrollments.models import Enrollment
+from apps.enrollments.schemas import enrollment_serializer
+from apps.users.models import User
+from apps.users.schemas import user_serializer
+
+
+def seed(path, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "capacity": rows, "is_active": True, "enrolled_count": 1}
+            for i in range(rows)
+        ])
+        conn.execute(insert(User), [
+            {"name": f"Student {i}", "email": f"student{i}@example.com", "hashed_password": "x",
+             "role": "STUDENT", "is_active": True}
+            for i in range(rows)
+        ])
+        # Every student takes course 1 (the roster) and one other course
+        conn.execute(insert(Enrollment), [{"user_id": i + 1, "course_id": 1} for i in range(rows)])
+        conn.execute(insert(Enrollment), [{"user_id": i + 1, "course_id": i + 2} for i in range(rows - 1)])
+    return engine
+
+
+def median_ms(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = seed(os.path.join(tempfile.mkdtemp(), "bench_serializers.db"), args.rows)
+    db = sessionmaker(bind=engine)()
+    limit = args.rows
+
+    def load(query):
+        def run():
+            db.expunge_all()
+            return query().limit(limit).all()
+        return run
+
+    loaders = {
+        "courses": load(lambda: db.query(Course)),
+        "users": load(lambda: db.query(User)),
+        "enrollments": load(lambda: db.query(Enrollment).options(*enrollment_options())),
+        "course rows": lambda: [row[0] for row in course_rows(db).limit(limit)],
+        "user rows": lambda: [row[0] for row in user_rows(db).limit(limit)],
+        "enrollment rows": lambda: [row[0] for row in enrollment_rows(db).limit(limit)],
+    }
+    to_dict = lambda items: [item.to_dict() for item in items]
+    cases = [
+        ("courses", "to_dict", "courses", to_dict),
+        ("courses", "serializer", "courses", course_serializer.many),
+        ("courses", "serializer/rows", "course rows", course_serializer.many),
+        ("users", "to_dict", "users", to_dict),
+        ("users", "serializer", "users", user_serializer.many),
+        ("users", "serializer/rows", "user rows", user_serializer.many),
+        ("enrollments", "to_dict", "enrollments", to_dict),
+        ("enrollments", "serializer/rows", "enrollment rows", enrollment_serializer.many),
+    ]
+
+    print(f"{'page':<13}{'path':<17}{'serialize ms':>13}{'load+serialize ms':>19}")
+    for page, path, source, serialize in cases:
+        items = loaders[source]()
+        serialize_ms = median_ms(lambda: orjson.dumps(serialize(items)), args.runs)
+        total_ms = median_ms(lambda: orjson.dumps(serialize(loaders[source]())), args.runs)
+        print(f"{page:<13}{path:<17}{serialize_ms:>13.2f}{total_ms:>19.2f}")
+
+if __name__ == "__main__":
+    main()
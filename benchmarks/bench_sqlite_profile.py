@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark mixed read/write throughput under each SQLITE_PROFILE
+
+Seeds a file database, then runs worker threads that each either read a
+catalog page or enroll a random student (the write path of
+POST /api/v1/enrollments) for a fixed time, once with SQLite's defaults
+and once with the "performance" profile (WAL, synchronous=NORMAL, mmap,
+larger cache, busy_timeout).
+
+Usage:
+    python benchmarks/bench_sqlite_profile.py
+    python benchmarks/bench_sqlite_profile.py --threads 16 --write-ratio 0.5 --duration 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from apps.config.config import Settings
+from apps.config.database import Base, apply_sqlite_pragmas, sqlite_pragmas
+from apps.courses.models import Course
+from apps.courses.services import list_courses
+from apps.enrollments.services import enroll_student
+from apps.users.models import User
+
+
+def seed(path, n_courses, n_students):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "capacity": n_students, "is_active": True, "enrolled_count": 0}
+            for i in range(n_courses)
+        ])
+        conn.execute(insert(User), [
+            {"name": f"Student {i}", "email": f"student{i}@example.com", "hashed_password": "x",
+             "role": "STUDENT", "is_active": True}
+            for i in range(n_students)
+        ])
+    engine.dispose()
+
+
+def run(path, profile, args):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=args.threads, max_overflow=0)
+    apply_sqlite_pragmas(engine, sqlite_pragmas(Settings(sqlite_profile=profile)))
+    Session = sessionmaker(bind=engine)
+    reads, writes, errors = [], [], [0]
+    stop_at = time.perf_counter() + args.duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop_at:
+            db = Session()
+            start = time.perf_counter()
+            try:
+                if rng.random() < args.write_ratio:
+                    try:
+                        enroll_student(db, rng.randrange(1, args.students + 1), rng.randrange(1, args.courses + 1))
+                    except HTTPException:
+                        pass  # already enrolled
+                    writes.append((time.perf_counter() - start) * 1000)
+                else:
+                    list_courses(db, skip=rng.randrange(args.courses - 20), limit=20, cursor=None, sort=None,
+                                 include_total=True, search=None, search_mode="substring", is_active=None)
+                    reads.append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                errors[0] += 1  # "database is locked"
+                db.rollback()
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    def pct(values, q):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+    return {
+        "ops": (len(reads) + len(writes)) / elapsed,
+        "read_p50": statistics.median(reads) if reads else 0.0,
+        "read_p99": pct(reads, 0.99),
+        "write_p50": statistics.median(writes) if writes else 0.0,
+        "write_p99": pct(writes, 0.99),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+    args = parser.parse_args()
+
+    print(f"{'profile':<13}{'ops/s':>8}{'read p50':>10}{'read p99':>10}{'write p50':>11}{'write p99':>11}{'locked':>8}")
+    for profile in ("default", "performance"):
+        path = os.path.join(tempfile.mkdtemp(), f"bench_{profile}.db")
+        seed(path, args.courses, args.students)
+        result = run(path, profile, args)
+        print(f"{profile:<13}{result['ops']:>8.0f}{result['read_p50']:>10.2f}{result['read_p99']:>10.2f}"
+              f"{result['write_p50']:>11.2f}{result['write_p99']:>11.2f}{result['errors']:>8}")
+    print("\nLatencies in ms; 'locked' counts operations that failed with 'database is locked'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the seat availability stream with many idle subscribers
+
+Starts uvicorn against a seeded database, opens thousands of raw
+connections to GET /api/v1/courses/{id}/availability/stream and leaves
+them idle, reporting the server's resident memory per subscriber. Then
+students enroll one at a time and the time from each POST until every
+subscriber has received the new seat count is measured (fan-out latency).
+
+Usage:
+    python benchmarks/bench_sse_subscribers.py
+    python benchmarks/bench_sse_subscribers.py --subscribers 1000 5000 10000 --enrollments 20
+"""
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+import orjson
+from sqlalchemy import create_engine, insert
+
+from apps.config.database import Base
+import apps.enrollments.models  # noqa: F401
+from apps.common.passwords import hash_password
+from apps.common.security import create_access_token
+from apps.courses.models import Course
+from apps.users.models import User, UserRole
+
+
+def seed(url, n_students):
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    hashed = hash_password("Password@123")
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [
+            {"title": "Course 0", "code": "C00000", "capacity": n_students, "is_active": True, "enrolled_count": 0}
+        ])
+        conn.execute(insert(User), [
+            {"name": f"Student {i}", "email": f"student{i}@bench.test", "hashed_password": hashed,
+             "role": UserRole.STUDENT, "is_active": True}
+            for i in range(n_students)
+        ])
+    engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(url, port):
+    env = dict(os.environ, DATABASE_URL=url, DEBUG="false", CHECK_MIGRATIONS_ON_STARTUP="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "16384"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+class Subscriber:
+    """One raw SSE connection; records when each enrolled_count arrives"""
+
+    def __init__(self):
+        self.received = {}
+        self.ready = asyncio.Event()
+
+    async def run(self, port, course_id):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET /api/v1/courses/{course_id}/availability/stream HTTP/1.1\r\n"
+                     f"Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await reader.readuntil(b"\r\n\r\n")
+        try:
+            while True:
+                # Chunked framing: size line, then data, then CRLF
+                size = int((await reader.readline()).strip(), 16)
+                chunk = await reader.readexactly(size + 2)
+                for line in chunk.split(b"\n"):
+                    if line.startswith(b"data: "):
+                        self.received[orjson.loads(line[6:])["enrolled_count"]] = time.perf_counter()
+                        self.ready.set()
+        finally:
+            writer.close()
+
+
+async def measure(port, server_pid, n_subscribers, n_enrollments, offset):
+    idle_rss = rss_mb(server_pid)
+    subscribers = [Subscriber() for _ in range(n_subscribers)]
+    tasks = []
+    for i in range(0, n_subscribers, 500):
+        tasks += [asyncio.ensure_future(s.run(port, 1)) for s in subscribers[i:i + 500]]
+        await asyncio.gather(*(s.ready.wait() for s in subscribers[i:i + 500]))
+    await asyncio.sleep(1)
+    rss = rss_mb(server_pid)
+
+    fan_out = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        for i in range(offset, offset + n_enrollments):
+            token = create_access_token({"sub": f"student{i}@bench.test"})
+            started = time.perf_counter()
+            response = await client.post("/api/v1/enrollments", json={"course_id": 1},
+                                         headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 201, response.text
+            count = i + 1
+            while not all(count in s.received for s in subscribers):
+                await asyncio.sleep(0.001)
+            fan_out.append((max(s.received[count] for s in subscribers) - started) * 1000)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "rss": rss,
+        "per_subscriber_kb": (rss - idle_rss) * 1024 / n_subscribers,
+        "p50": statistics.median(fan_out),
+        "max": max(fan_out),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--enrollments", type=int, default=10, help="Enrollments timed per measurement")
+    args = parser.parse_args()
+
+    # Each subscriber is a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_sse.db')}"
+    seed(url, args.enrollments * len(args.subscribers))
+
+    print(f"{'subscribers':>12}{'RSS MB':>10}{'KB/sub':>10}{'fan-out p50 ms':>16}{'max ms':>10}")
+    for round_, n_subscribers in enumerate(args.subscribers):
+        port = free_port()
+        server = start_server(url, port)
+        try:
+            result = asyncio.run(measure(port, server.pid, n_subscribers, args.enrollments,
+                                         round_ * args.enrollments))
+            print(f"{n_subscribers:>12}{result['rss']:>10.1f}{result['per_subscriber_kb']:>10.1f}"
+                  f"{result['p50']:>16.1f}{result['max']:>10.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 from fastapi import FastAPI, Request, status, HTTPException
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from apps.config.database import Base, engine
+from apps.config.database import engine
+from apps.config.migrations import check_schema_current
 from apps.config.config import get_settings
+from contextlib import asynccontextmanager
 from datetime import datetime
 from sqlalchemy import text
 import time
@@ -16,16 +17,33 @@ from apps.auth.routes import router as auth_router
 from apps.users.routes import router as users_router
 from apps.courses.routes import router as courses_router
 from apps.enrollments.routes import router as enrollments_router
-from apps.common.responses import success_response
+from apps.admin.routes import router as admin_router
+from apps.common.responses import APIResponse, error_response, success_response
+from apps.common.passwords import password_hasher
+from apps.common.consistency import ReadYourWritesMiddleware
+from apps.common.query_stats import QueryStatsMiddleware
+from apps.common.compression import CompressionMiddleware
 
 settings = get_settings()
-Base.metadata.create_all(bind=engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is owned by Alembic (`alembic upgrade head`); workers only
+    # confirm the database is at the head revision
+    if settings.check_migrations_on_startup:
+        check_schema_current(engine)
+    yield
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    lifespan=lifespan,
+    default_response_class=APIResponse,
     swagger_ui_parameters={
         "persistAuthorization": True
     }
@@ -63,6 +81,8 @@ app.openapi = custom_openapi
 
 app.state.start_time = time.time()
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -70,11 +90,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(courses_router)
 app.include_router(enrollments_router)
+app.include_router(admin_router)
 
 
 @app.exception_handler(RequestValidationError)
@@ -85,25 +107,18 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         msg = error.get("msg")
         error_messages.append(f"{field}: {msg}")
 
-    return JSONResponse(
+    return APIResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={
-            "status": "error",
-            "message": "Validation failed",
-            "data": {"errors": error_messages}
-        },
+        content=error_response(message="Validation failed", data={"errors": error_messages}),
     )
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return APIResponse(
         status_code=exc.status_code,
-        content={
-            "status": "error",
-            "message": exc.detail,
-            "data": None
-        },
+        content=error_response(message=exc.detail),
+        headers=getattr(exc, "headers", None),
     )
 
 
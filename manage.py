@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the LMS API
+
+Usage:
+    python manage.py reconcile-counts
+    python manage.py rebuild-search-index
+    python manage.py rebuild-user-search
+"""
+import argparse
+import sys
+
+from apps.config.database import SessionLocal
+
+import apps.users.models  # noqa: F401  (register mappers)
+import apps.enrollments.models  # noqa: F401
+
+
+def reconcile_counts(args):
+    """Repair courses.enrolled_count from the enrollments table"""
+    from apps.courses.services import reconcile_enrolled_counts
+
+    db = SessionLocal()
+    try:
+        repaired = reconcile_enrolled_counts(db)
+    finally:
+        db.close()
+    print(f"Reconciled enrolled_count on {repaired} course(s)")
+
+
+def rebuild_search_index(args):
+    """Repopulate the course full-text search index"""
+    from apps.courses.search import rebuild_search_index as rebuild
+
+    db = SessionLocal()
+    try:
+        rebuild(db)
+    finally:
+        db.close()
+    print("Rebuilt the course search index")
+
+
+def rebuild_user_search(args):
+    """Regenerate the user search tokens"""
+    from apps.users.search import rebuild_user_search_index
+
+    db = SessionLocal()
+    try:
+        indexed = rebuild_user_search_index(db)
+    finally:
+        db.close()
+    print(f"Indexed {indexed} user(s) for search")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LMS maintenance commands")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser(
+        "reconcile-counts",
+        help="Recompute each course's enrolled_count from its enrollments"
+    ).set_defaults(func=reconcile_counts)
+
+    subcommands.add_parser(
+        "rebuild-search-index",
+        help="Repopulate the course full-text search index"
+    ).set_defaults(func=rebuild_search_index)
+
+    subcommands.add_parser(
+        "rebuild-user-search",
+        help="Regenerate the admin user-search tokens"
+    ).set_defaults(func=rebuild_user_search)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
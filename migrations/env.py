@@ -0,0 +1,78 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from apps.config.config import get_settings
+from apps.config.database import Base
+
+import apps.users.models  # noqa: F401  (register tables on Base.metadata)
+import apps.courses.models  # noqa: F401
+import apps.enrollments.models  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", get_settings().database_url)
+
+target_metadata = Base.metadata
+
+# Search-index objects created by raw DDL rather than declared on the models
+UNMANAGED_TABLE_PREFIXES = ("courses_fts", "user_search_tokens")
+UNMANAGED_NAMES = {"search_vector", "ix_courses_search_vector", "ix_courses_code_trgm",
+                   "ix_users_name_trgm", "ix_users_email_trgm"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate from proposing to drop the search-index objects"""
+    if reflected and compare_to is None:
+        if type_ == "table" and name.startswith(UNMANAGED_TABLE_PREFIXES):
+            return False
+        if name in UNMANAGED_NAMES:
+            return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit migration SQL without a database connection"""
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations against a live connection"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,33 @@
+"""denormalized courses.enrolled_count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.add_column(
+            sa.Column("enrolled_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Backfill from existing enrollments
+    op.execute(
+        "UPDATE courses SET enrolled_count = "
+        "(SELECT count(enrollments.id) FROM enrollments "
+        "WHERE enrollments.course_id = courses.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("enrolled_count")
@@ -0,0 +1,43 @@
+"""composite indexes for enrollment, user and course queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The unique index cannot be built over duplicate seats: keep the
+    # oldest enrollment per (user, course) and recount the affected courses.
+    op.execute(
+        "DELETE FROM enrollments WHERE id NOT IN "
+        "(SELECT min(id) FROM enrollments GROUP BY user_id, course_id)"
+    )
+    op.execute(
+        "UPDATE courses SET enrolled_count = "
+        "(SELECT count(enrollments.id) FROM enrollments "
+        "WHERE enrollments.course_id = courses.id)"
+    )
+
+    op.create_index("ix_enrollments_user_id_course_id", "enrollments",
+                    ["user_id", "course_id"], unique=True)
+    op.create_index("ix_enrollments_course_id_created_at", "enrollments",
+                    ["course_id", "created_at"])
+    op.create_index("ix_users_role_is_active_id", "users",
+                    ["role", "is_active", "id"])
+    op.create_index("ix_courses_is_active_id", "courses",
+                    ["is_active", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_courses_is_active_id", table_name="courses")
+    op.drop_index("ix_users_role_is_active_id", table_name="users")
+    op.drop_index("ix_enrollments_course_id_created_at", table_name="enrollments")
+    op.drop_index("ix_enrollments_user_id_course_id", table_name="enrollments")
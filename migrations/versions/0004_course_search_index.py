@@ -0,0 +1,51 @@
+"""full-text search index for courses
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5("
+    "title, code, content='courses', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_ai AFTER INSERT ON courses BEGIN "
+    "INSERT INTO courses_fts(rowid, title, code) VALUES (new.id, new.title, new.code); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_ad AFTER DELETE ON courses BEGIN "
+    "INSERT INTO courses_fts(courses_fts, rowid, title, code) "
+    "VALUES ('delete', old.id, old.title, old.code); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_au AFTER UPDATE OF title, code ON courses BEGIN "
+    "INSERT INTO courses_fts(courses_fts, rowid, title, code) "
+    "VALUES ('delete', old.id, old.title, old.code); "
+    "INSERT INTO courses_fts(rowid, title, code) VALUES (new.id, new.title, new.code); END",
+    "INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')",
+]
+
+POSTGRESQL_UPGRADE = [
+    "ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', title || ' ' || code)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("courses_fts_ai", "courses_fts_ad", "courses_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS courses_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_courses_search_vector")
+        op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,52 @@
+"""indexed user search: token table (SQLite) and trigram indexes (PostgreSQL)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _tokens(name, email):
+    return set(re.findall(r"\w+", name.lower())) | set(re.findall(r"\w+", email.lower()))
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)")
+        return
+
+    tokens = op.create_table(
+        "user_search_tokens",
+        sa.Column("token", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("token", "user_id"),
+    )
+    op.create_index("ix_user_search_tokens_user_id", "user_search_tokens", ["user_id"])
+
+    users = bind.execute(sa.text("SELECT id, name, email FROM users")).fetchall()
+    rows = [{"user_id": u.id, "token": t} for u in users for t in _tokens(u.name, u.email)]
+    if rows:
+        op.bulk_insert(tokens, rows)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_name_trgm")
+        return
+    op.drop_index("ix_user_search_tokens_user_id", table_name="user_search_tokens")
+    op.drop_table("user_search_tokens")
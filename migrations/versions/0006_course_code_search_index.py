@@ -0,0 +1,47 @@
+"""substring search index for course codes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts_code USING fts5("
+    "code, content='courses', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_code_ai AFTER INSERT ON courses BEGIN "
+    "INSERT INTO courses_fts_code(rowid, code) VALUES (new.id, new.code); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_code_ad AFTER DELETE ON courses BEGIN "
+    "INSERT INTO courses_fts_code(courses_fts_code, rowid, code) VALUES ('delete', old.id, old.code); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_code_au AFTER UPDATE OF code ON courses BEGIN "
+    "INSERT INTO courses_fts_code(courses_fts_code, rowid, code) VALUES ('delete', old.id, old.code); "
+    "INSERT INTO courses_fts_code(rowid, code) VALUES (new.id, new.code); END",
+    "INSERT INTO courses_fts_code(courses_fts_code) VALUES ('rebuild')",
+]
+
+POSTGRESQL_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_courses_code_trgm ON courses USING gin (code gin_trgm_ops)",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("courses_fts_code_ai", "courses_fts_code_ad", "courses_fts_code_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS courses_fts_code")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_courses_code_trgm")
@@ -1,14 +1,61 @@
+import os
+
+# Test databases are built with create_all, not migrated
+os.environ.setdefault("CHECK_MIGRATIONS_ON_STARTUP", "false")
+# Any lazy relationship load inside a request fails the test
+os.environ.setdefault("STRICT_LAZY_LOADS", "true")
+# One process serves the suite, so per-process version counters are exact
+os.environ.setdefault("SINGLE_WORKER", "true")
+
+from contextlib import contextmanager
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from apps.config.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from apps.config.config import get_settings
+from apps.config.database import Base, DatabaseSession, async_database_url, get_db
+from apps.common.pagination import list_total_cache
+from apps.common.security import principal_cache
+from apps.common.consistency import recent_writers
+from apps.common.query_stats import record_queries
+from apps.common.versions import version_store
+from apps.courses.cache import catalog_cache
 from main import app
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(class_=DatabaseSession, autocommit=False, autoflush=False, bind=engine)
+
+# Each TestClient runs its own event loop, so async connections are not pooled
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Drop process-wide caches so no state leaks between test databases"""
+    list_total_cache.clear()
+    principal_cache.clear()
+    recent_writers.clear()
+    catalog_cache.clear()
+    version_store.clear()
+    yield
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail if the block (e.g. one client request) issues more than `limit` statements"""
+    @contextmanager
+    def check(limit):
+        with record_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"{stats.count} queries, expected at most {limit}:\n" + "\n".join(stats.statements)
+        )
+    return check
 
 
 @pytest.fixture(scope="function")
@@ -23,6 +70,20 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def session_factory(db_session):
+    """Session factory bound to the test database, for multi-session tests"""
+    return TestingSessionLocal
+
+
+def override_get_async_db():
+    """Request sessions for DATABASE_ASYNC=true runs"""
+    async def get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+    return get_async_db
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database override"""
@@ -32,12 +93,22 @@ def client(db_session):
         finally:
             pass
     
-    app.dependency_overrides[get_db] = override_get_db
+    if get_settings().database_async:
+        app.dependency_overrides[get_db] = override_get_async_db()
+    else:
+        app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def async_client(client):
+    """The test client with requests served through AsyncSession"""
+    app.dependency_overrides[get_db] = override_get_async_db()
+    return client
+
+
 @pytest.fixture
 def admin_token(client):
     """Create an admin user and return auth token"""
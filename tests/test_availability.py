@@ -0,0 +1,156 @@
+import asyncio
+import json
+import httpx
+import pytest
+from apps.config.config import get_settings
+from apps.courses.availability import AvailabilityHub, availability, availability_hub
+from main import app
+
+
+class EventStream:
+    """
+    A Server-Sent Events request driven straight through the ASGI app.
+
+    The test client buffers whole bodies, which an endless stream never
+    finishes, so the app runs as a task and events are read as they are sent.
+    """
+
+    def __init__(self, path: str, query_string: str = ""):
+        self.status = None
+        self.headers = {}
+        self._messages = asyncio.Queue()
+        self._buffer = b""
+        self._disconnect = asyncio.Event()
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                 "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+                 "query_string": query_string.encode(), "headers": [(b"host", b"test")],
+                 "client": ("127.0.0.1", 1), "server": ("test", 80)}
+        self._task = asyncio.ensure_future(app(scope, self._receive, self._messages.put))
+
+    async def _receive(self):
+        await self._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def __aenter__(self):
+        start = await asyncio.wait_for(self._messages.get(), 5)
+        self.status = start["status"]
+        self.headers = {name.decode(): value.decode() for name, value in start["headers"]}
+        return self
+
+    async def __aexit__(self, *exc):
+        self._disconnect.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def next_event(self) -> dict:
+        """The data of the next `availability` event, skipping keepalives"""
+        while True:
+            frame, separator, rest = self._buffer.partition(b"\n\n")
+            if separator:
+                self._buffer = rest
+                for line in frame.decode().splitlines():
+                    if line.startswith("data: "):
+                        return json.loads(line[len("data: "):])
+                continue
+            self._buffer += await self.chunk()
+
+    async def chunk(self) -> bytes:
+        """The next body message as sent"""
+        message = await asyncio.wait_for(self._messages.get(), 5)
+        return message.get("body", b"")
+
+
+class TestAvailabilityStream:
+    """Test the seat availability SSE endpoints"""
+
+    async def test_enrollments_are_pushed(self, client, student_token, sample_course):
+        """Test subscribers get the current seats, then every enrollment change"""
+        course_id = sample_course["id"]
+        headers = {"Authorization": f"Bearer {student_token}"}
+        async with EventStream(f"/api/v1/courses/{course_id}/availability/stream") as stream, \
+                httpx.AsyncClient(app=app, base_url="http://test") as http:
+            assert stream.status == 200
+            assert stream.headers["content-type"].startswith("text/event-stream")
+            assert await stream.next_event() == {"course_id": course_id, "enrolled_count": 0, "capacity": 30,
+                                                 "seats_left": 30, "is_full": False, "is_active": True}
+
+            enrollment = await http.post("/api/v1/enrollments", json={"course_id": course_id}, headers=headers)
+            assert (await stream.next_event())["enrolled_count"] == 1
+
+            await http.delete(f"/api/v1/enrollments/{enrollment.json()['data']['id']}", headers=headers)
+            assert (await stream.next_event())["seats_left"] == 30
+
+        # Closing the connection releases its subscription
+        assert availability_hub.stats()["subscriptions"] == 0
+
+    async def test_multiple_courses(self, client, admin_token, sample_course):
+        """Test the multi-course stream follows capacity and status changes"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        other = client.post("/api/v1/courses", json={"title": "Other", "code": "OT101", "capacity": 1},
+                            headers=headers).json()["data"]["id"]
+        query = f"course_ids={sample_course['id']},{other}"
+        async with EventStream("/api/v1/courses/availability/stream", query) as stream, \
+                httpx.AsyncClient(app=app, base_url="http://test") as http:
+            initial = [await stream.next_event(), await stream.next_event()]
+            assert {event["course_id"] for event in initial} == {sample_course["id"], other}
+
+            await http.put(f"/api/v1/courses/{other}", json={"capacity": 5}, headers=headers)
+            assert await stream.next_event() == {"course_id": other, "enrolled_count": 0, "capacity": 5,
+                                                 "seats_left": 5, "is_full": False, "is_active": True}
+
+            await http.patch(f"/api/v1/courses/{sample_course['id']}/deactivate", headers=headers)
+            event = await stream.next_event()
+            assert event["course_id"] == sample_course["id"] and event["is_active"] is False
+
+    async def test_keepalive(self, client, sample_course, monkeypatch):
+        """Test an idle stream sends comment lines"""
+        monkeypatch.setattr(get_settings(), "availability_heartbeat_seconds", 0.01)
+        async with EventStream(f"/api/v1/courses/{sample_course['id']}/availability/stream") as stream:
+            await stream.next_event()
+            assert await stream.chunk() == b": keepalive\n\n"
+
+    @pytest.mark.parametrize("course_ids", ["", "1,x", ",".join(str(i) for i in range(1, 52))])
+    def test_invalid_course_ids(self, client, course_ids):
+        """Test course_ids must be 1 to AVAILABILITY_MAX_COURSES integers"""
+        response = client.get(f"/api/v1/courses/availability/stream?course_ids={course_ids}")
+        assert response.status_code == 400
+
+    def test_missing_course(self, client):
+        """Test a stream for an unknown course is a 404 and leaves no subscription"""
+        response = client.get("/api/v1/courses/999/availability/stream")
+        assert response.status_code == 404
+        assert availability_hub.stats()["subscriptions"] == 0
+
+
+class TestAvailabilityHub:
+    """Test the in-process broadcast hub"""
+
+    async def test_slow_subscriber_keeps_latest_snapshot(self):
+        """Test a subscriber that is not reading holds one pending snapshot per course"""
+        hub = AvailabilityHub()
+        subscription = hub.subscribe([1, 2])
+        for count in range(1, 101):
+            hub.publish([availability(1, count, 200, True)])
+        hub.publish([availability(2, 1, 10, True)])
+        await asyncio.sleep(0)
+
+        snapshots = await subscription.next(timeout=1)
+        assert sorted((s["course_id"], s["enrolled_count"]) for s in snapshots) == [(1, 100), (2, 1)]
+        assert subscription.conflated == 99
+
+    async def test_publish_from_another_thread(self):
+        """Test commits in the threadpool reach subscribers on the loop"""
+        hub = AvailabilityHub()
+        subscription = hub.subscribe([1])
+        await asyncio.to_thread(hub.publish, [availability(1, 5, 10, True)])
+        assert (await subscription.next(timeout=1))[0]["seats_left"] == 5
+
+    async def test_unsubscribed_courses_are_skipped(self):
+        """Test nothing is dispatched for courses nobody follows"""
+        hub = AvailabilityHub()
+        subscription = hub.subscribe([1])
+        hub.unsubscribe(subscription)
+        hub.publish([availability(1, 5, 10, True)])
+        await asyncio.sleep(0)
+        assert await subscription.next(timeout=0.01) == []
+        assert hub.stats() == {"subscriptions": 0, "courses": 0, "published": 0, "conflated": 0}
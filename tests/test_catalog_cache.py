@@ -0,0 +1,189 @@
+import fnmatch
+import socketserver
+import threading
+import time
+import pytest
+from apps.config.config import get_settings
+from apps.common.cache import RedisCache, TTLCache, build_cache
+from apps.courses.cache import catalog_cache
+from apps.courses.models import Course
+from apps.courses.services import reconcile_enrolled_counts
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for RedisCache"""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def bulk(self, value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        store = self.server.store
+        while (args := self.read_command()) is not None:
+            command = args[0].upper()
+            for key in [k for k, (_, expires) in store.items() if expires and expires <= time.monotonic()]:
+                del store[key]
+            if command == b"GET":
+                reply = self.bulk(store.get(args[1], (None, None))[0])
+            elif command == b"SET":
+                options = [arg.upper() for arg in args[3:]]
+                if b"NX" in options and args[1] in store:
+                    reply = b"$-1\r\n"
+                else:
+                    expires = time.monotonic() + int(args[4]) / 1000 if b"PX" in options else None
+                    store[args[1]] = (args[2], expires)
+                    reply = b"+OK\r\n"
+            elif command in (b"INCR", b"INCRBY"):
+                value = int(store.get(args[1], (b"0", None))[0]) + int(args[2] if len(args) > 2 else 1)
+                store[args[1]] = (str(value).encode(), None)
+                reply = b":%d\r\n" % value
+            elif command == b"DEL":
+                reply = b":%d\r\n" % sum(store.pop(key, None) is not None for key in args[1:])
+            elif command == b"KEYS":
+                keys = [key for key in store if fnmatch.fnmatchcase(key, args[1])]
+                reply = b"*%d\r\n" % len(keys) + b"".join(self.bulk(key) for key in keys)
+            else:
+                reply = b"+OK\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def redis_url():
+    """A local Redis-protocol stand-in"""
+    pytest.importorskip("redis")
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), RESPHandler)
+    server.daemon_threads = True
+    server.store = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "redis://127.0.0.1:%d/0" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestCatalogCache:
+    """Test the course catalog read-through cache"""
+
+    def test_reads_are_served_from_cache(self, client, sample_course, assert_max_queries):
+        """Test repeated anonymous reads do not touch the database"""
+        first = client.get("/api/v1/courses")
+        client.get(f"/api/v1/courses/{sample_course['id']}")
+        with assert_max_queries(0):
+            assert client.get("/api/v1/courses").json() == first.json()
+            assert client.get(f"/api/v1/courses/{sample_course['id']}").json()["data"] == sample_course
+
+    def test_update_invalidates(self, client, admin_token, sample_course):
+        """Test updates, deactivation and activation are visible to cached readers"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/api/v1/courses/{sample_course['id']}"
+        client.get(url)
+        client.get("/api/v1/courses", params={"is_active": True})
+
+        client.put(url, json={"title": "Renamed"}, headers=headers)
+        assert client.get(url).json()["data"]["title"] == "Renamed"
+
+        client.patch(f"{url}/deactivate", headers=headers)
+        assert client.get(url).json()["data"]["is_active"] is False
+        assert client.get("/api/v1/courses", params={"is_active": True}).json()["data"]["items"] == []
+
+        client.patch(f"{url}/activate", headers=headers)
+        assert len(client.get("/api/v1/courses", params={"is_active": True}).json()["data"]["items"]) == 1
+
+        client.delete(url, headers=headers)
+        assert client.get(url).json()["data"]["is_active"] is False
+
+    def test_create_invalidates_pages(self, client, admin_token, sample_course):
+        """Test a new course appears on cached catalog pages"""
+        client.get("/api/v1/courses")
+        client.post("/api/v1/courses", json={"title": "New", "code": "NEW1", "capacity": 5},
+                    headers={"Authorization": f"Bearer {admin_token}"})
+        codes = [c["code"] for c in client.get("/api/v1/courses").json()["data"]["items"]]
+        assert codes == ["PY101", "NEW1"]
+
+    def test_enrollments_update_seat_counts(self, client, student_token, sample_course):
+        """Test enrolling and deregistering refresh the cached seat count"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        url = f"/api/v1/courses/{sample_course['id']}"
+        assert client.get(url).json()["data"]["enrolled_count"] == 0
+
+        enrollment = client.post("/api/v1/enrollments", json={"course_id": sample_course["id"]}, headers=headers)
+        assert client.get(url).json()["data"]["enrolled_count"] == 1
+        assert client.get("/api/v1/courses").json()["data"]["items"][0]["enrolled_count"] == 1
+
+        client.delete(f"/api/v1/enrollments/{enrollment.json()['data']['id']}", headers=headers)
+        assert client.get(url).json()["data"]["enrolled_count"] == 0
+
+    def test_reconcile_invalidates(self, client, db_session, sample_course):
+        """Test repaired counters are not hidden by the cache"""
+        url = f"/api/v1/courses/{sample_course['id']}"
+        db_session.get(Course, sample_course["id"]).enrolled_count = 3
+        db_session.commit()
+        assert client.get(url).json()["data"]["enrolled_count"] == 3
+
+        assert reconcile_enrolled_counts(db_session) == 1
+        assert client.get(url).json()["data"]["enrolled_count"] == 0
+
+
+    def test_per_process_versions_bypass_cache(self, client, sample_course, monkeypatch):
+        """Test reads are not cached when another worker's commits could go unseen"""
+        monkeypatch.setattr(get_settings(), "single_worker", False)
+        url = f"/api/v1/courses/{sample_course['id']}"
+        client.get(url)
+        client.get(url)
+        assert len(catalog_cache) == 0
+
+
+class TestRedisCache:
+    """Test the Redis-protocol backend against a local stand-in"""
+
+    def test_round_trip(self, redis_url):
+        """Test values come back as JSON and counters persist"""
+        cache = build_cache(redis_url, maxsize=10, ttl=60, namespace="test:")
+        assert isinstance(cache, RedisCache)
+        cache.set("course:1:v0", {"id": 1, "title": "Python"})
+        assert cache.get("course:1:v0") == {"id": 1, "title": "Python"}
+        assert cache.get("course:2:v0") is None
+        start = cache.counter("generation")
+        assert cache.incr("generation") == start + 1
+        assert cache.counter("generation") == start + 1
+        assert cache.stats()["hits"] == 1
+
+        cache.clear()
+        assert cache.get("course:1:v0") is None
+        assert cache.counter("generation") > start + 1
+
+    def test_entries_expire(self, redis_url):
+        """Test entries are written with the TTL"""
+        cache = RedisCache(redis_url, ttl=0.05)
+        cache.set("key", 1)
+        time.sleep(0.1)
+        assert cache.get("key") is None
+
+    def test_unreachable_server_is_a_miss(self, redis_url):
+        """Test an unreachable server degrades to cache misses"""
+        cache = RedisCache("redis://127.0.0.1:1/0", ttl=60)
+        cache.set("key", 1)
+        assert cache.get("key") is None
+        assert cache.counter("generation") is None
+        assert cache.stats()["errors"] == 5
+
+    def test_default_backend(self):
+        """Test the in-process LRU is used without a URL"""
+        assert isinstance(build_cache(None, maxsize=10, ttl=60), TTLCache)
+
+    def test_counters_are_bounded(self):
+        """Test the in-process counters are an LRU and a re-seeded counter never repeats a value"""
+        cache = TTLCache(maxsize=0, ttl=0, max_counters=2)
+        first = cache.incr("a")
+        cache.counter("b")
+        cache.counter("c")
+        assert cache.stats()["counters"] == 2
+        assert cache.counter("a") > first
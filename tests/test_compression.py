@@ -0,0 +1,87 @@
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from apps.common.compression import CompressionMiddleware, negotiate_encoding
+from apps.courses.models import Course
+
+CHUNK = b"x" * 4096
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(3):
+            yield CHUNK
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+async def events(request):
+    async def chunks():
+        yield b"data: {}\n\n"
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Enough courses for the catalog page to cross the compression threshold"""
+    db_session.add_all(Course(title=f"Course {i}", code=f"C{i}", capacity=10) for i in range(20))
+    db_session.commit()
+
+
+@pytest.fixture
+def raw_client():
+    """A bare app behind the middleware, with responses left encoded"""
+    app = Starlette(routes=[Route("/stream", stream), Route("/events", events)])
+    app.add_middleware(CompressionMiddleware, minimum_size=100, allow_brotli=False)
+    return TestClient(app)
+
+
+class TestCompression:
+    """Test response compression"""
+
+    def test_large_listing_is_gzipped(self, client, catalog):
+        """Test a response above the threshold is gzipped and decodes to the same payload"""
+        identity = client.get("/api/v1/courses", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/api/v1/courses", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in identity.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["vary"] == "Accept-Encoding"
+        assert compressed.json() == identity.json()
+
+    def test_small_response_is_not_compressed(self, client):
+        """Test a response below the threshold is sent as is"""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_streamed_response(self, raw_client):
+        """Test a streamed body is compressed chunk by chunk without a Content-Length"""
+        with raw_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            body = b"".join(response.iter_raw())
+        assert gzip.decompress(body) == CHUNK * 3
+
+    def test_event_stream_passes_through(self, raw_client):
+        """Test event streams are never compressed"""
+        response = raw_client.get("/events", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"data: {}\n\n"
+
+    def test_brotli(self, client, catalog):
+        """Test brotli is preferred when it is installed and accepted"""
+        pytest.importorskip("brotli")
+        response = client.get("/api/v1/courses", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.json()["status"] == "success"
+
+    def test_negotiation(self):
+        """Test Accept-Encoding quality values are honoured"""
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("gzip;q=0") is None
+        assert negotiate_encoding("deflate, gzip", allow_brotli=False) == "gzip"
+        assert negotiate_encoding("*", allow_brotli=False) == "gzip"
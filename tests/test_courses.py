@@ -179,3 +179,92 @@ class TestCourseDelete:
             headers={"Authorization": f"Bearer {student_token}"}
         )
         assert response.status_code == 403
+
+
+class TestCourseSearch:
+    """Test course catalog search"""
+
+    @pytest.fixture
+    def catalog(self, client, admin_token):
+        courses = [
+            ("Introduction to Python", "PY101"),
+            ("Advanced Python Patterns", "PY301"),
+            ("Data Science with Python and Pandas", "DS201"),
+            ("Introduction to Databases", "DB101"),
+        ]
+        for title, code in courses:
+            response = client.post(
+                "/api/v1/courses",
+                json={"title": title, "code": code, "capacity": 10},
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+            assert response.status_code == 201
+
+    def test_prefix_search(self, client, catalog):
+        """Test word prefixes match via the search index"""
+        response = client.get("/api/v1/courses", params={"search": "pyth"})
+        codes = {c["code"] for c in response.json()["data"]["items"]}
+        assert codes == {"PY101", "PY301", "DS201"}
+
+    def test_all_words_must_match(self, client, catalog):
+        """Test multi-word searches require every word"""
+        response = client.get("/api/v1/courses", params={"search": "intro data"})
+        codes = [c["code"] for c in response.json()["data"]["items"]]
+        assert codes == ["DB101"]
+
+    def test_search_by_code(self, client, catalog):
+        """Test course codes are searchable"""
+        response = client.get("/api/v1/courses", params={"search": "py3"})
+        codes = [c["code"] for c in response.json()["data"]["items"]]
+        assert codes == ["PY301"]
+
+    def test_search_by_part_of_code(self, client, admin_token, catalog):
+        """Test a fragment from inside a course code matches, and follows code changes"""
+        response = client.get("/api/v1/courses", params={"search": "101"})
+        codes = {c["code"] for c in response.json()["data"]["items"]}
+        assert codes == {"PY101", "DB101"}
+
+        course = client.get("/api/v1/courses", params={"search": "Y30"}).json()["data"]["items"]
+        assert [c["code"] for c in course] == ["PY301"]
+        client.put(f"/api/v1/courses/{course[0]['id']}", json={"code": "PY350"},
+                   headers={"Authorization": f"Bearer {admin_token}"})
+        assert client.get("/api/v1/courses", params={"search": "Y30"}).json()["data"]["items"] == []
+        items = client.get("/api/v1/courses", params={"search": "Y35"}).json()["data"]["items"]
+        assert [c["id"] for c in items] == [course[0]["id"]]
+
+    def test_results_ranked_by_relevance(self, client, catalog):
+        """Test the shortest, most focused match ranks first"""
+        response = client.get("/api/v1/courses", params={"search": "python introduction"})
+        data = response.json()["data"]
+        assert data["items"][0]["code"] == "PY101"
+        assert data["next_cursor"] is None
+
+    def test_search_index_follows_updates(self, client, admin_token, catalog):
+        """Test renamed courses are found under their new title"""
+        course = client.get("/api/v1/courses", params={"search": "databases"}).json()["data"]["items"][0]
+        client.put(
+            f"/api/v1/courses/{course['id']}",
+            json={"title": "Relational Modelling"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert client.get("/api/v1/courses", params={"search": "databases"}).json()["data"]["items"] == []
+        items = client.get("/api/v1/courses", params={"search": "relational"}).json()["data"]["items"]
+        assert [c["id"] for c in items] == [course["id"]]
+
+    def test_substring_mode(self, client, catalog):
+        """Test substring mode keeps the infix ilike behaviour"""
+        response = client.get("/api/v1/courses", params={"search": "101", "search_mode": "substring"})
+        codes = {c["code"] for c in response.json()["data"]["items"]}
+        assert codes == {"PY101", "DB101"}
+
+    def test_search_with_explicit_sort_paginates_by_cursor(self, client, catalog):
+        """Test an explicit sort keeps keyset pagination for search results"""
+        response = client.get("/api/v1/courses", params={"search": "python", "sort": "code", "limit": 2})
+        data = response.json()["data"]
+        assert [c["code"] for c in data["items"]] == ["DS201", "PY101"]
+        assert data["next_cursor"] is not None
+
+    def test_invalid_search_mode(self, client):
+        """Test unknown search modes are rejected"""
+        response = client.get("/api/v1/courses", params={"search": "x", "search_mode": "regex"})
+        assert response.status_code == 400
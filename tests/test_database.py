@@ -0,0 +1,274 @@
+import threading
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from apps.config.config import Settings
+from apps.config.database import (
+    Base, DatabaseSession, apply_sqlite_pragmas, async_database_url, sqlite_pragmas
+)
+from apps.common.consistency import recent_writers
+from apps.config.migrations import SchemaOutOfDateError, check_schema_current, migration_heads, VERSIONS_DIR
+from apps.config.pool import PoolMetrics, engine_options, watch_invalidations
+from apps.courses.models import Course
+
+
+@pytest.fixture
+def drivers():
+    """Record the DBAPI driver behind every statement"""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(conn.engine.dialect.driver)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+class TestAsyncDatabase:
+    """Test the async session path"""
+
+    def test_async_database_url(self):
+        """Test sync URLs map onto the asyncio drivers"""
+        assert str(async_database_url("sqlite:///./lms.db")) == "sqlite+aiosqlite:///./lms.db"
+        assert async_database_url("postgresql+psycopg2://u:p@db/lms").render_as_string(hide_password=False) == "postgresql+asyncpg://u:p@db/lms"
+
+    async def test_sync_session_runs_in_threadpool(self, session_factory):
+        """Test the sync session's run_sync keeps ORM work off the event loop"""
+        db = session_factory()
+        try:
+            worker = await db.run_sync(lambda session: threading.get_ident())
+        finally:
+            db.close()
+        assert worker != threading.get_ident()
+
+    def test_requests_use_async_driver(self, async_client, drivers):
+        """Test handlers query through aiosqlite in async mode"""
+        response = async_client.get("/api/v1/courses")
+        assert response.status_code == 200
+        assert drivers and set(drivers) == {"aiosqlite"}
+
+    def test_enrollment_flow(self, async_client, admin_token, student_token, sample_course):
+        """Test relationship-heavy endpoints serialize without lazy loads on the loop"""
+        admin = {"Authorization": f"Bearer {admin_token}"}
+        student = {"Authorization": f"Bearer {student_token}"}
+
+        response = async_client.post("/api/v1/enrollments", json={"course_id": sample_course["id"]}, headers=student)
+        assert response.status_code == 201
+        assert response.json()["data"]["course"]["code"] == "PY101"
+
+        response = async_client.get(f"/api/v1/courses/{sample_course['id']}/with-students", headers=admin)
+        assert response.json()["data"]["enrollments"][0]["email"] == "student@test.com"
+
+        response = async_client.get("/api/v1/users/me/with-enrollments", headers=student)
+        assert response.json()["data"]["enrollments"][0]["code"] == "PY101"
+
+        response = async_client.put("/api/v1/users/me", json={"name": "Renamed Student"}, headers=student)
+        assert response.json()["data"]["name"] == "Renamed Student"
+
+        response = async_client.delete(f"/api/v1/enrollments/courses/{sample_course['id']}/deregister", headers=student)
+        assert response.status_code == 200
+        assert async_client.get(f"/api/v1/courses/{sample_course['id']}").json()["data"]["enrolled_count"] == 0
+
+
+@pytest.fixture
+def small_pool(tmp_path):
+    """A file-backed engine with a 1 + 1 connection pool"""
+    metrics = PoolMetrics()
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    settings = Settings(db_pool_size=1, db_max_overflow=1, db_pool_timeout=0.1)
+    engine = create_engine(url, **engine_options(url, settings, metrics))
+    watch_invalidations(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    """Test connection pool configuration and instrumentation"""
+
+    def test_checkouts_overflow_and_timeouts(self, small_pool):
+        """Test checkouts, overflow connections and pool timeouts are counted"""
+        engine, metrics = small_pool
+        first = engine.connect()
+        second = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        first.close()
+        second.close()
+
+        snapshot = metrics.snapshot(engine.pool)
+        assert snapshot["checkouts"] == 2
+        assert snapshot["overflow_opened"] == 1
+        assert snapshot["timeouts"] == 1
+        assert sum(snapshot["wait_ms"]["histogram"].values()) == 2
+        assert snapshot["pool"]["size"] == 1
+        assert snapshot["pool"]["max_overflow"] == 1
+
+    def test_invalidations_are_counted(self, small_pool):
+        """Test invalidated connections are reported"""
+        engine, metrics = small_pool
+        with engine.connect() as conn:
+            conn.invalidate()
+        assert metrics.snapshot()["invalidations"] == 1
+
+    def test_memory_database_keeps_default_pool(self):
+        """Test in-memory SQLite is left on its single-connection pool"""
+        assert engine_options("sqlite://", Settings(), PoolMetrics()) == {}
+
+    def test_admin_pool_endpoint(self, client, admin_token, student_token):
+        """Test the pool metrics endpoint is admin only"""
+        response = client.get("/api/v1/admin/db-pool", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["config"]["pool_pre_ping"] is True
+        assert "checkouts" in data["engines"]["primary"]
+
+        response = client.get("/api/v1/admin/db-pool", headers={"Authorization": f"Bearer {student_token}"})
+        assert response.status_code == 403
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """Route get_read_db to a second SQLite file that never receives writes"""
+    import apps.config.database as database
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(class_=DatabaseSession, bind=engine))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", None)
+    yield engine
+    engine.dispose()
+
+
+class TestReadReplica:
+    """Test read routing between the primary and a replica"""
+
+    def course_codes(self, client, headers=None):
+        response = client.get("/api/v1/courses", headers=headers or {})
+        assert response.status_code == 200
+        return [c["code"] for c in response.json()["data"]["items"]]
+
+    def test_reads_go_to_replica(self, client, replica, sample_course):
+        """Test anonymous catalog reads are served by the (lagging) replica"""
+        assert self.course_codes(client) == []
+
+    def test_replica_reads_are_not_cached(self, client, replica, sample_course):
+        """Test a page read from a lagging replica is not kept once the replica catches up"""
+        assert self.course_codes(client) == []
+        with replica.begin() as conn:
+            conn.execute(Course.__table__.insert(), [{"title": "Intro", "code": "PY101", "capacity": 30}])
+        assert self.course_codes(client) == ["PY101"]
+
+    def test_writer_reads_own_writes(self, client, replica, admin_token, sample_course):
+        """Test a client that just wrote keeps reading from the primary"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert self.course_codes(client, headers) == ["PY101"]
+
+        # Once the window has passed, reads return to the replica
+        recent_writers.clear()
+        assert self.course_codes(client, headers) == []
+
+    def test_failed_writes_do_not_pin(self, client, replica, admin_token, sample_course):
+        """Test only successful writes pin a client to the primary"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        recent_writers.clear()
+
+        response = client.post("/api/v1/courses", json={"title": "Dup", "code": "PY101", "capacity": 5}, headers=headers)
+        assert response.status_code == 400
+        assert self.course_codes(client, headers) == []
+
+    def test_writes_always_use_primary(self, client, replica, admin_token, sample_course):
+        """Test write handlers see primary data even when reads are routed away"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        recent_writers.clear()
+
+        response = client.patch(f"/api/v1/courses/{sample_course['id']}/deactivate", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["is_active"] is False
+
+
+class TestSQLiteProfile:
+    """Test the SQLite pragma profiles"""
+
+    def pragma(self, conn, name):
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_performance_profile(self, tmp_path):
+        """Test the performance profile is applied to every new connection"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+        apply_sqlite_pragmas(engine, sqlite_pragmas(Settings(sqlite_profile="performance")))
+        try:
+            with engine.connect() as conn:
+                assert self.pragma(conn, "journal_mode") == "wal"
+                assert self.pragma(conn, "synchronous") == 1
+                assert self.pragma(conn, "busy_timeout") == 5000
+                assert self.pragma(conn, "cache_size") == -65536
+                assert self.pragma(conn, "temp_store") == 2
+        finally:
+            engine.dispose()
+
+    def test_default_profile_changes_nothing(self, tmp_path):
+        """Test the default profile keeps SQLite's rollback journal"""
+        assert sqlite_pragmas(Settings()) == {}
+        engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+        apply_sqlite_pragmas(engine, sqlite_pragmas(Settings()))
+        try:
+            with engine.connect() as conn:
+                assert self.pragma(conn, "journal_mode") == "delete"
+        finally:
+            engine.dispose()
+
+    async def test_async_engine(self, tmp_path):
+        """Test the hook also tunes aiosqlite connections"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+        apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(Settings(sqlite_profile="performance")))
+        try:
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        finally:
+            await engine.dispose()
+
+
+@pytest.fixture
+def scratch_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    yield engine
+    engine.dispose()
+
+
+def stamp(engine, revision):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+        conn.execute(text("DELETE FROM alembic_version"))
+        conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": revision})
+
+
+class TestMigrationCheck:
+    """Test the startup schema revision check"""
+
+    def test_heads_match_alembic(self):
+        """Test the ast-based head lookup agrees with Alembic"""
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+
+        config = Config()
+        config.set_main_option("script_location", str(VERSIONS_DIR.parent))
+        assert migration_heads() == set(ScriptDirectory.from_config(config).get_heads())
+
+    def test_unmigrated_database_is_rejected(self, scratch_engine):
+        """Test a database without alembic_version fails the check"""
+        with pytest.raises(SchemaOutOfDateError, match="no revision"):
+            check_schema_current(scratch_engine)
+
+    def test_old_revision_is_rejected(self, scratch_engine):
+        """Test a database behind head fails the check"""
+        stamp(scratch_engine, "0001")
+        with pytest.raises(SchemaOutOfDateError, match="at 0001"):
+            check_schema_current(scratch_engine)
+
+    def test_database_at_head_passes(self, scratch_engine):
+        """Test a migrated database passes the check"""
+        stamp(scratch_engine, next(iter(migration_heads())))
+        check_schema_current(scratch_engine)
@@ -265,3 +265,366 @@ class TestEnrollmentOversight:
         data = response.json()["data"]
         assert len(data) >= 1
         assert data[0]["course_id"] == sample_course["id"]
+
+
+class TestEnrolledCount:
+    """Test the denormalized enrolled_count stays in sync"""
+
+    def test_enroll_and_deregister_update_count(self, client, student_token, sample_course):
+        """Test enrolled_count follows enroll and deregister"""
+        course_id = sample_course["id"]
+        assert sample_course["enrolled_count"] == 0
+
+        client.post(
+            "/api/v1/enrollments",
+            json={"course_id": course_id},
+            headers={"Authorization": f"Bearer {student_token}"}
+        )
+        response = client.get(f"/api/v1/courses/{course_id}")
+        assert response.json()["data"]["enrolled_count"] == 1
+
+        client.delete(
+            f"/api/v1/enrollments/courses/{course_id}/deregister",
+            headers={"Authorization": f"Bearer {student_token}"}
+        )
+        response = client.get(f"/api/v1/courses/{course_id}")
+        assert response.json()["data"]["enrolled_count"] == 0
+
+    def test_admin_remove_updates_count(self, client, admin_token, student_token, sample_course):
+        """Test admin removal releases the seat"""
+        course_id = sample_course["id"]
+        enroll_response = client.post(
+            "/api/v1/enrollments",
+            json={"course_id": course_id},
+            headers={"Authorization": f"Bearer {student_token}"}
+        )
+        enrollment_id = enroll_response.json()["data"]["id"]
+
+        client.delete(
+            f"/api/v1/enrollments/admin/{enrollment_id}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        response = client.get(f"/api/v1/courses/{course_id}")
+        assert response.json()["data"]["enrolled_count"] == 0
+        assert response.json()["data"]["is_full"] is False
+
+    def test_concurrent_deregister_releases_one_seat(self, client, db_session, session_factory, monkeypatch,
+                                                      student_token, sample_course):
+        """Test a deregistration whose row is deleted after it was loaded is a 404 and leaves the count alone"""
+        from fastapi import HTTPException
+        from apps.courses.models import Course
+        from apps.enrollments import services
+        from apps.users.models import User
+
+        course_id = sample_course["id"]
+        enrollment_id = client.post("/api/v1/enrollments", json={"course_id": course_id},
+                                    headers={"Authorization": f"Bearer {student_token}"}).json()["data"]["id"]
+        load = services.get_enrollment_or_404
+
+        def load_then_lose_race(db, enrollment_id):
+            enrollment = load(db, enrollment_id)
+            other = session_factory()
+            try:
+                monkeypatch.setattr(services, "get_enrollment_or_404", load)
+                services.remove_enrollment(other, enrollment_id)
+            finally:
+                other.close()
+            return enrollment
+
+        monkeypatch.setattr(services, "get_enrollment_or_404", load_then_lose_race)
+        db = session_factory()
+        try:
+            student = db.query(User).filter(User.email == "student@test.com").one()
+            with pytest.raises(HTTPException) as exc_info:
+                services.deregister(db, enrollment_id, student)
+            assert exc_info.value.status_code == 404
+        finally:
+            db.close()
+        assert db_session.get(Course, course_id).enrolled_count == 0
+
+    def test_deleting_user_releases_seats(self, client, db_session, student_token, sample_course):
+        """Test enrollments removed with their user release their seats"""
+        from apps.courses.models import Course
+        from apps.users.models import User
+
+        course_id = sample_course["id"]
+        client.post("/api/v1/enrollments", json={"course_id": course_id},
+                    headers={"Authorization": f"Bearer {student_token}"})
+        db_session.delete(db_session.query(User).filter(User.email == "student@test.com").one())
+        db_session.commit()
+        assert db_session.get(Course, course_id).enrolled_count == 0
+
+    def test_reconcile_repairs_drift(self, client, db_session, student_token, sample_course):
+        """Test reconcile_enrolled_counts rewrites drifted counters"""
+        from apps.courses.models import Course
+        from apps.courses.services import reconcile_enrolled_counts
+
+        course_id = sample_course["id"]
+        client.post(
+            "/api/v1/enrollments",
+            json={"course_id": course_id},
+            headers={"Authorization": f"Bearer {student_token}"}
+        )
+        course = db_session.get(Course, course_id)
+        course.enrolled_count = 7
+        db_session.commit()
+
+        assert reconcile_enrolled_counts(db_session) == 1
+        db_session.refresh(course)
+        assert course.enrolled_count == 1
+        assert reconcile_enrolled_counts(db_session) == 0
+
+
+class TestConcurrentEnrollment:
+    """Test the enrollment engine under a registration rush"""
+
+    def test_parallel_enrollments_never_oversubscribe(self, db_session, session_factory):
+        """Test exactly `capacity` of many parallel enrollments succeed"""
+        from concurrent.futures import ThreadPoolExecutor
+        from fastapi import HTTPException
+        from apps.courses.models import Course
+        from apps.enrollments.models import Enrollment
+        from apps.enrollments.services import enroll_student
+        from apps.users.models import User, UserRole
+
+        course = Course(title="Rush Course", code="RUSH101", capacity=30)
+        students = [
+            User(name=f"Student {i}", email=f"rush{i}@test.com",
+                 hashed_password="x", role=UserRole.STUDENT)
+            for i in range(300)
+        ]
+        db_session.add(course)
+        db_session.add_all(students)
+        db_session.commit()
+        course_id = course.id
+        student_ids = [s.id for s in students]
+
+        def attempt(user_id):
+            db = session_factory()
+            try:
+                enroll_student(db, user_id, course_id)
+                return "enrolled"
+            except HTTPException as exc:
+                return exc.detail
+            finally:
+                db.close()
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            outcomes = list(pool.map(attempt, student_ids))
+
+        assert outcomes.count("enrolled") == 30
+        assert outcomes.count("Course is at full capacity") == 270
+
+        db_session.expire_all()
+        assert db_session.get(Course, course_id).enrolled_count == 30
+        assert db_session.query(Enrollment).filter(
+            Enrollment.course_id == course_id).count() == 30
+
+    def test_duplicate_enrollment_releases_seat(self, db_session):
+        """Test a rejected duplicate does not consume a seat"""
+        from fastapi import HTTPException
+        from apps.courses.models import Course
+        from apps.enrollments.services import enroll_student
+        from apps.users.models import User, UserRole
+
+        course = Course(title="Dup Course", code="DUP101", capacity=5)
+        student = User(name="Dup", email="dup@test.com",
+                       hashed_password="x", role=UserRole.STUDENT)
+        db_session.add_all([course, student])
+        db_session.commit()
+
+        enroll_student(db_session, student.id, course.id)
+        with pytest.raises(HTTPException) as exc_info:
+            enroll_student(db_session, student.id, course.id)
+        assert exc_info.value.detail == "Already enrolled"
+
+        db_session.refresh(course)
+        assert course.enrolled_count == 1
+
+
+class TestBulkEnrollment:
+    """Test admin bulk enrollment"""
+
+    @pytest.fixture
+    def cohort(self, db_session):
+        """Five students and a three-seat course"""
+        from apps.courses.models import Course
+        from apps.users.models import User, UserRole
+
+        students = [User(name=f"Student {i}", email=f"cohort{i}@test.com", hashed_password="x",
+                         role=UserRole.STUDENT) for i in range(5)]
+        course = Course(title="Cohort Course", code="CO101", capacity=3)
+        db_session.add_all([*students, course])
+        db_session.commit()
+        return [student.id for student in students], course.id
+
+    def test_bulk_enroll_course(self, client, admin_token, student_token, cohort):
+        """Test seats go in request order and every user gets a result"""
+        user_ids, course_id = cohort
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        admin_id = client.get("/api/v1/users/me", headers=headers).json()["data"]["id"]
+        response = client.post("/api/v1/enrollments/bulk", headers=headers, json={
+            "course_id": course_id, "user_ids": [user_ids[0], 999, admin_id, user_ids[0], *user_ids[1:]]})
+        assert response.status_code == 200
+
+        data = response.json()["data"]
+        assert (data["enrolled"], data["rejected"]) == (3, 5)
+        assert [(r["user_id"], r["status"], r["detail"]) for r in data["results"]] == [
+            (user_ids[0], "enrolled", None),
+            (999, "rejected", "User not found"),
+            (admin_id, "rejected", "Only students can enroll"),
+            (user_ids[0], "rejected", "Duplicate in request"),
+            (user_ids[1], "enrolled", None),
+            (user_ids[2], "enrolled", None),
+            (user_ids[3], "rejected", "Course is at full capacity"),
+            (user_ids[4], "rejected", "Course is at full capacity"),
+        ]
+
+        course = client.get(f"/api/v1/courses/{course_id}").json()["data"]
+        assert course["enrolled_count"] == 3
+        roster = client.get(f"/api/v1/enrollments/courses/{course_id}", headers=headers).json()["data"]
+        assert sorted(e["id"] for e in roster) == sorted(r["enrollment_id"] for r in data["results"] if r["enrollment_id"])
+
+    def test_bulk_enroll_pairs(self, client, admin_token, cohort, sample_course):
+        """Test pairs across courses, including existing enrollments and inactive courses"""
+        user_ids, course_id = cohort
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        client.post("/api/v1/enrollments/bulk", headers=headers,
+                    json={"course_id": course_id, "user_ids": [user_ids[0]]})
+        client.patch(f"/api/v1/courses/{course_id}/deactivate", headers=headers)
+
+        response = client.post("/api/v1/enrollments/bulk/pairs", headers=headers, json={"enrollments": [
+            {"user_id": user_ids[0], "course_id": sample_course["id"]},
+            {"user_id": user_ids[1], "course_id": sample_course["id"]},
+            {"user_id": user_ids[1], "course_id": course_id},
+            {"user_id": user_ids[2], "course_id": 999},
+        ]})
+        assert [r["detail"] for r in response.json()["data"]["results"]] == [
+            None, None, "Cannot enroll in inactive course", "Course not found"]
+
+        response = client.post("/api/v1/enrollments/bulk/pairs", headers=headers, json={"enrollments": [
+            {"user_id": user_ids[0], "course_id": sample_course["id"]}]})
+        assert response.json()["data"]["results"][0]["detail"] == "Already enrolled"
+        assert client.get(f"/api/v1/courses/{sample_course['id']}").json()["data"]["enrolled_count"] == 2
+
+    def test_bulk_enroll_leaves_courses_untouched(self, client, admin_token, db_session, cohort):
+        """Test locking the courses does not bump updated_at when no seat is taken"""
+        from datetime import datetime
+        from apps.courses.models import Course
+
+        user_ids, course_id = cohort
+        course = db_session.get(Course, course_id)
+        course.updated_at = datetime(2020, 1, 1)
+        db_session.commit()
+
+        response = client.post("/api/v1/enrollments/bulk", headers={"Authorization": f"Bearer {admin_token}"},
+                               json={"course_id": course_id, "user_ids": [999]})
+        assert response.json()["data"]["rejected"] == 1
+        db_session.expire_all()
+        assert db_session.get(Course, course_id).updated_at.year == 2020
+
+    def test_single_enrollment_during_bulk(self, db_session, session_factory):
+        """Test an enrollment arriving between the bulk checks and its insert cannot take the last seat"""
+        import threading
+        from fastapi import HTTPException
+        from sqlalchemy import event
+        from apps.courses.models import Course
+        from apps.enrollments.models import Enrollment
+        from apps.enrollments.services import bulk_enroll, enroll_student
+        from apps.users.models import User, UserRole
+
+        students = [User(name=f"Student {i}", email=f"race{i}@test.com", hashed_password="x",
+                         role=UserRole.STUDENT) for i in range(2)]
+        course = Course(title="Race Course", code="RC101", capacity=1)
+        db_session.add_all([*students, course])
+        db_session.commit()
+        course_id = course.id
+        outcome = {}
+
+        def single():
+            db = session_factory()
+            try:
+                enroll_student(db, students[1].id, course_id)
+                outcome["single"] = "enrolled"
+            except HTTPException as exc:
+                outcome["single"] = exc.detail
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=single)
+
+        def interleave(conn, cursor, statement, parameters, context, executemany):
+            # Let the single enrollment run once the bulk checks are done
+            if statement.startswith("INSERT INTO enrollments") and not thread.is_alive() and "single" not in outcome:
+                thread.start()
+                thread.join(timeout=1)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", interleave)
+        try:
+            bulk = session_factory()
+            try:
+                results = bulk_enroll(bulk, [(students[0].id, course_id)])
+            finally:
+                bulk.close()
+        finally:
+            event.remove(engine, "before_cursor_execute", interleave)
+        thread.join()
+
+        assert results[0]["status"] == "enrolled"
+        assert outcome["single"] == "Course is at full capacity"
+        db_session.expire_all()
+        assert db_session.get(Course, course_id).enrolled_count == 1
+        assert db_session.query(Enrollment).filter(Enrollment.course_id == course_id).count() == 1
+
+    def test_bulk_counter_never_overshoots(self, db_session, monkeypatch, cohort):
+        """Test a batch admitted on stale seat counts is rolled back instead of overfilling"""
+        from fastapi import HTTPException
+        from sqlalchemy import select
+        from apps.courses.models import Course
+        from apps.enrollments import services
+
+        user_ids, course_id = cohort
+        services.bulk_enroll(db_session, [(user_id, course_id) for user_id in user_ids[:3]])
+        stale = db_session.execute(select(Course.id, (Course.enrolled_count - 3).label("enrolled_count"),
+                                          Course.capacity, Course.is_active)
+                                   .where(Course.id == course_id)).all()
+        monkeypatch.setattr(services, "_lock_courses", lambda db, course_ids: {row[0]: row for row in stale})
+
+        with pytest.raises(HTTPException) as exc_info:
+            services.bulk_enroll(db_session, [(user_ids[3], course_id)])
+        assert exc_info.value.status_code == 409
+        db_session.expire_all()
+        assert db_session.get(Course, course_id).enrolled_count == 3
+
+    def test_bulk_enroll_query_count(self, client, admin_token, db_session, assert_max_queries):
+        """Test the number of statements does not grow with the batch"""
+        from apps.courses.models import Course
+        from apps.users.models import User, UserRole
+
+        db_session.add_all(User(name=f"S{i}", email=f"s{i}@test.com", hashed_password="x", role=UserRole.STUDENT)
+                           for i in range(200))
+        db_session.add_all(Course(title=f"C{i}", code=f"C{i}", capacity=100) for i in range(4))
+        db_session.commit()
+        user_ids = [user.id for user in db_session.query(User).filter(User.email.like("s%@test.com"))]
+        course_ids = [course.id for course in db_session.query(Course)]
+        pairs = [{"user_id": u, "course_id": c} for u in user_ids for c in course_ids]
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        with assert_max_queries(10):
+            response = client.post("/api/v1/enrollments/bulk/pairs", headers=headers, json={"enrollments": pairs})
+        assert response.json()["data"]["enrolled"] == 400
+        assert response.json()["data"]["rejected"] == 400
+
+    def test_bulk_enroll_requires_admin(self, client, student_token, sample_course):
+        """Test students cannot bulk enroll"""
+        response = client.post("/api/v1/enrollments/bulk", headers={"Authorization": f"Bearer {student_token}"},
+                               json={"course_id": sample_course["id"], "user_ids": [1]})
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("user_ids", [[], list(range(10001))])
+    def test_bulk_enroll_size_limits(self, client, admin_token, user_ids):
+        """Test empty and oversized batches are rejected"""
+        response = client.post("/api/v1/enrollments/bulk", headers={"Authorization": f"Bearer {admin_token}"},
+                               json={"course_id": 1, "user_ids": user_ids})
+        assert response.status_code == 422
@@ -0,0 +1,112 @@
+import pytest
+from apps.config.config import get_settings
+from apps.courses.models import Course
+
+
+def revalidate(client, url, etag, headers=None):
+    return client.get(url, headers={**(headers or {}), "If-None-Match": etag})
+
+
+class TestConditionalRequests:
+    """Test ETags and If-None-Match on the read endpoints"""
+
+    def test_course_not_modified(self, client, sample_course, assert_max_queries):
+        """Test a matching If-None-Match gets an empty 304 without touching the database"""
+        url = f"/api/v1/courses/{sample_course['id']}"
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert etag.startswith('"')
+        assert response.headers["cache-control"] == "public, no-cache"
+
+        with assert_max_queries(0):
+            response = revalidate(client, url, etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_update_changes_etag(self, client, admin_token, sample_course):
+        """Test a course update retires its ETag and the catalog's"""
+        url = f"/api/v1/courses/{sample_course['id']}"
+        course_etag = client.get(url).headers["etag"]
+        catalog_etag = client.get("/api/v1/courses").headers["etag"]
+
+        client.put(url, json={"title": "Renamed"}, headers={"Authorization": f"Bearer {admin_token}"})
+        response = revalidate(client, url, course_etag)
+        assert response.status_code == 200
+        assert response.json()["data"]["title"] == "Renamed"
+        assert response.headers["etag"] != course_etag
+        assert revalidate(client, "/api/v1/courses", catalog_etag).status_code == 200
+
+    def test_other_courses_keep_their_etag(self, client, db_session, admin_token, sample_course):
+        """Test a change to one course does not invalidate another"""
+        db_session.add(Course(title="Other", code="OT101", capacity=5))
+        db_session.commit()
+        other = db_session.query(Course).filter(Course.code == "OT101").one().id
+        etag = client.get(f"/api/v1/courses/{other}").headers["etag"]
+
+        client.patch(f"/api/v1/courses/{sample_course['id']}/deactivate",
+                     headers={"Authorization": f"Bearer {admin_token}"})
+        assert revalidate(client, f"/api/v1/courses/{other}", etag).status_code == 304
+
+    def test_enrollment_changes_etags(self, client, student_token, sample_course):
+        """Test enrolling changes the student's enrollments and the course's seat count"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        course_url = f"/api/v1/courses/{sample_course['id']}"
+        course_etag = client.get(course_url).headers["etag"]
+        mine = client.get("/api/v1/enrollments/my-enrollments", headers=headers)
+        assert mine.headers["cache-control"] == "private, no-cache"
+        assert revalidate(client, "/api/v1/enrollments/my-enrollments", mine.headers["etag"], headers).status_code == 304
+
+        client.post("/api/v1/enrollments", json={"course_id": sample_course["id"]}, headers=headers)
+        response = revalidate(client, "/api/v1/enrollments/my-enrollments", mine.headers["etag"], headers)
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 1
+        assert revalidate(client, course_url, course_etag).status_code == 200
+
+    def test_profile(self, client, student_token):
+        """Test the profile ETag is per user and follows profile updates"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        etag = client.get("/api/v1/users/me", headers=headers).headers["etag"]
+        assert revalidate(client, "/api/v1/users/me", etag, headers).status_code == 304
+
+        client.put("/api/v1/users/me", json={"name": "Renamed"}, headers=headers)
+        response = revalidate(client, "/api/v1/users/me", etag, headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["name"] == "Renamed"
+
+    def test_admin_listings(self, client, admin_token, student_token):
+        """Test admin listings revalidate until a new user registers"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        users_etag = client.get("/api/v1/users", headers=headers).headers["etag"]
+        enrollments_etag = client.get("/api/v1/enrollments", headers=headers).headers["etag"]
+        assert revalidate(client, "/api/v1/users", users_etag, headers).status_code == 304
+
+        response = client.post("/api/v1/users/register",
+                               json={"name": "New", "email": "new@test.com", "password": "Password@123"})
+        assert response.status_code == 201
+        assert revalidate(client, "/api/v1/users", users_etag, headers).status_code == 200
+        assert revalidate(client, "/api/v1/enrollments", enrollments_etag, headers).status_code == 200
+
+    def test_compressed_response(self, client, db_session):
+        """Test compression weakens the ETag and the weak form still revalidates"""
+        db_session.add_all(Course(title=f"Course {i}", code=f"C{i}", capacity=10) for i in range(20))
+        db_session.commit()
+        response = client.get("/api/v1/courses", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].startswith('W/"')
+        assert revalidate(client, "/api/v1/courses", response.headers["etag"]).status_code == 304
+
+    @pytest.mark.parametrize("if_none_match", ['"stale"', ""])
+    def test_mismatch(self, client, sample_course, if_none_match):
+        """Test a stale or empty If-None-Match gets the full response"""
+        response = revalidate(client, f"/api/v1/courses/{sample_course['id']}", if_none_match)
+        assert response.status_code == 200
+
+    def test_per_process_counters(self, client, sample_course, monkeypatch):
+        """Test no ETag is sent from per-process counters unless one worker is declared"""
+        monkeypatch.setattr(get_settings(), "single_worker", False)
+        url = f"/api/v1/courses/{sample_course['id']}"
+        response = client.get(url)
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "public, no-cache"
+        assert revalidate(client, url, "*").status_code == 200
@@ -1,4 +1,7 @@
 import pytest
+from datetime import datetime, timezone
+from apps.common.responses import APIResponse, StandardResponse
+from apps.users.models import UserRole
 
 
 class TestHealthEndpoint:
@@ -56,3 +59,32 @@ class TestHealthEndpoint:
         # Check it contains T separator
         assert "T" in data["timestamp"]
 
+
+
+class TestResponseEncoding:
+    """Test the app-wide orjson response class"""
+
+    def test_envelope_bytes(self, client):
+        """Test the success envelope keeps its key order and compact encoding"""
+        response = client.get("/")
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == (
+            b'{"status":"success","message":"Welcome to the LMS API",'
+            b'"data":{"docs":"/api/docs","version":"1.0.0"}}'
+        )
+
+    def test_error_envelope(self, client):
+        """Test error handlers use the same envelope"""
+        response = client.get("/api/v1/courses/999999")
+        assert response.status_code == 404
+        assert response.content == b'{"status":"error","message":"Course not found","data":null}'
+
+    def test_native_types(self):
+        """Test datetimes and enums encode natively and pydantic models fall back"""
+        body = APIResponse(content={
+            "at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "role": UserRole.ADMIN,
+            "nested": StandardResponse(status="success", message="ok"),
+        }).body
+        assert body == (b'{"at":"2024-01-02T03:04:05+00:00","role":"admin",'
+                        b'"nested":{"status":"success","message":"ok","data":null}}')
@@ -0,0 +1,178 @@
+import pytest
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.users.models import User
+
+
+@pytest.fixture
+def many_courses(client, admin_token):
+    """Create several courses (most share a created_at second)"""
+    codes = []
+    for i in range(7):
+        response = client.post(
+            "/api/v1/courses",
+            json={"title": f"Course {i}", "code": f"PAGE{i}", "capacity": 10},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 201
+        codes.append(response.json()["data"]["code"])
+    return codes
+
+
+def walk_pages(client, url, **params):
+    """Follow next_cursor until the last page, returning every item"""
+    items = []
+    cursor = None
+    for _ in range(50):
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(url, params=query)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        items.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return items
+    pytest.fail("next_cursor never reached the last page")
+
+
+class TestCursorPagination:
+    """Test keyset pagination on list endpoints"""
+
+    def test_cursor_walk_returns_every_course_once(self, client, many_courses):
+        """Test following next_cursor visits each course exactly once"""
+        items = walk_pages(client, "/api/v1/courses", limit=3)
+        ids = [c["id"] for c in items]
+        assert len(ids) == 7
+        assert ids == sorted(ids)
+
+    @pytest.mark.parametrize("sort", ["-id", "title", "-created_at"])
+    def test_cursor_walk_with_sort(self, client, many_courses, sort):
+        """Test cursor walks are stable for other sort fields and ties"""
+        items = walk_pages(client, "/api/v1/courses", limit=2, sort=sort)
+        assert sorted(c["code"] for c in items) == sorted(many_courses)
+        assert len({c["id"] for c in items}) == 7
+
+    def test_cursor_matches_offset_pages(self, client, many_courses):
+        """Test page 2 via cursor equals page 2 via legacy skip"""
+        first = client.get("/api/v1/courses", params={"limit": 3}).json()["data"]
+        by_cursor = client.get(
+            "/api/v1/courses", params={"limit": 3, "cursor": first["next_cursor"]}).json()["data"]
+        by_offset = client.get(
+            "/api/v1/courses", params={"limit": 3, "skip": 3}).json()["data"]
+        assert [c["id"] for c in by_cursor["items"]] == [c["id"] for c in by_offset["items"]]
+
+    def test_last_page_has_no_cursor(self, client, many_courses):
+        """Test next_cursor is null when nothing follows"""
+        data = client.get("/api/v1/courses", params={"limit": 100}).json()["data"]
+        assert data["next_cursor"] is None
+
+    def test_invalid_cursor(self, client, many_courses):
+        """Test a malformed cursor is rejected"""
+        response = client.get("/api/v1/courses", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        assert "invalid cursor" in response.json()["message"].lower()
+
+    def test_cursor_bound_to_sort(self, client, many_courses):
+        """Test a cursor cannot be replayed with a different sort"""
+        first = client.get("/api/v1/courses", params={"limit": 2}).json()["data"]
+        response = client.get(
+            "/api/v1/courses", params={"cursor": first["next_cursor"], "sort": "title"})
+        assert response.status_code == 400
+
+    def test_unknown_sort_field(self, client):
+        """Test sorting by a non-whitelisted field is rejected"""
+        response = client.get("/api/v1/courses", params={"sort": "capacity"})
+        assert response.status_code == 400
+
+    def test_users_and_enrollments_support_cursor(self, client, admin_token, student_token):
+        """Test the admin listings expose next_cursor too"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        data = client.get("/api/v1/users", params={"limit": 1}, headers=headers).json()["data"]
+        assert data["next_cursor"] is not None
+        second = client.get(
+            "/api/v1/users", params={"limit": 1, "cursor": data["next_cursor"]}, headers=headers).json()["data"]
+        assert second["items"][0]["id"] != data["items"][0]["id"]
+
+        response = client.get("/api/v1/enrollments", params={"sort": "-created_at"}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["next_cursor"] is None
+
+
+class TestListTotals:
+    """Test optional, cheap totals on list endpoints"""
+
+    def test_total_is_exact_on_first_page(self, client, many_courses):
+        """Test the first page carries an exact total"""
+        data = client.get("/api/v1/courses", params={"limit": 2}).json()["data"]
+        assert data["total"] == 7
+        assert data["total_is_exact"] is True
+
+    def test_filtered_total(self, client, admin_token, many_courses):
+        """Test totals respect filters"""
+        course_id = client.get("/api/v1/courses").json()["data"]["items"][0]["id"]
+        client.patch(
+            f"/api/v1/courses/{course_id}/deactivate",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        data = client.get("/api/v1/courses", params={"is_active": False}).json()["data"]
+        assert data["total"] == 1
+        assert data["total_is_exact"] is True
+
+    def test_include_total_false(self, client, many_courses):
+        """Test totals can be skipped entirely"""
+        data = client.get("/api/v1/courses", params={"include_total": False}).json()["data"]
+        assert data["total"] is None
+        assert data["total_is_exact"] is False
+        assert len(data["items"]) == 7
+
+    def test_offset_past_end_still_counts(self, client, many_courses):
+        """Test an empty offset page falls back to an exact count"""
+        data = client.get("/api/v1/courses", params={"skip": 50}).json()["data"]
+        assert data["items"] == []
+        assert data["total"] == 7
+        assert data["total_is_exact"] is True
+
+    def test_cursor_page_uses_cached_total(self, client, admin_token, many_courses):
+        """Test unfiltered cursor pages reuse the recent total, flagged inexact"""
+        first = client.get("/api/v1/courses", params={"limit": 2}).json()["data"]
+        client.post(
+            "/api/v1/courses",
+            json={"title": "Late Course", "code": "LATE1", "capacity": 10},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        second = client.get(
+            "/api/v1/courses", params={"limit": 2, "cursor": first["next_cursor"]}).json()["data"]
+        assert second["total"] == 7
+        assert second["total_is_exact"] is False
+
+    def test_filtered_cursor_page_counts_exactly(self, client, many_courses):
+        """Test filtered cursor pages are never served a cached total"""
+        first = client.get(
+            "/api/v1/courses", params={"limit": 2, "search": "Course"}).json()["data"]
+        second = client.get(
+            "/api/v1/courses",
+            params={"limit": 2, "search": "Course", "cursor": first["next_cursor"]}
+        ).json()["data"]
+        assert second["total"] == 7
+        assert second["total_is_exact"] is True
+
+
+class TestProjectedListings:
+    """Test list endpoints serve column projections identical to to_dict()"""
+
+    def test_items_match_to_dict(self, client, db_session, admin_token, student_token, sample_course, assert_max_queries):
+        """Test projected items equal the ORM serialization, with the total on the same query"""
+        admin = {"Authorization": f"Bearer {admin_token}"}
+        student = {"Authorization": f"Bearer {student_token}"}
+        response = client.post("/api/v1/enrollments", json={"course_id": sample_course["id"]}, headers=student)
+        assert response.status_code == 201
+
+        for url, model in (("/api/v1/courses", Course), ("/api/v1/users", User), ("/api/v1/enrollments", Enrollment)):
+            with assert_max_queries(2):
+                response = client.get(url, headers=admin)
+            assert response.status_code == 200
+            expected = [obj.to_dict() for obj in db_session.query(model).order_by(model.id)]
+            assert response.json()["data"]["items"] == expected
+            db_session.expire_all()
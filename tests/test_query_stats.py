@@ -0,0 +1,120 @@
+import pytest
+from apps.common.query_stats import LazyLoadError, track_queries
+from apps.courses.models import Course
+from apps.enrollments.models import Enrollment
+from apps.users.models import User, UserRole
+
+
+@pytest.fixture
+def enrolled_course(db_session, sample_course):
+    """The sample course with three students enrolled directly in the database"""
+    for i in range(3):
+        user = User(name=f"Student {i}", email=f"student{i}@example.com", hashed_password="x",
+                    role=UserRole.STUDENT)
+        db_session.add(user)
+        db_session.flush()
+        db_session.add(Enrollment(user_id=user.id, course_id=sample_course["id"]))
+    db_session.commit()
+    db_session.expunge_all()
+    return sample_course
+
+
+@pytest.fixture
+def enrolled_student(db_session, student_token):
+    """Id of the token's student, enrolled directly in three courses"""
+    student = db_session.query(User).filter(User.email == "student@test.com").one()
+    for i in range(3):
+        course = Course(title=f"Course {i}", code=f"C{i}", capacity=10)
+        db_session.add(course)
+        db_session.flush()
+        db_session.add(Enrollment(user_id=student.id, course_id=course.id))
+    db_session.commit()
+    student_id = student.id
+    db_session.expunge_all()
+    return student_id
+
+
+class TestQueryStats:
+    """Test per-request query counting"""
+
+    def test_debug_headers(self, client, sample_course):
+        """Test responses report the request's query count and DB time"""
+        response = client.get(f"/api/v1/courses/{sample_course['id']}")
+        assert response.status_code == 200
+        assert int(response.headers["X-DB-Query-Count"]) >= 1
+        assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+        assert response.headers["X-DB-Lazy-Loads"] == "0"
+
+    def test_lazy_load_recorded(self, db_session, enrolled_course):
+        """Test lazy relationship loads are recorded by attribute"""
+        course = db_session.get(Course, enrolled_course["id"])
+        with track_queries() as stats:
+            assert len(course.enrollments) == 3
+        assert stats.count == 1
+        assert stats.lazy_loads == ["Course.enrollments"]
+
+    def test_strict_mode_raises_on_lazy_load(self, db_session, enrolled_course):
+        """Test strict mode turns a lazy load into an error"""
+        course = db_session.get(Course, enrolled_course["id"])
+        with track_queries(strict=True):
+            with pytest.raises(LazyLoadError, match="Course.enrollments"):
+                course.enrollments
+
+    def test_assert_max_queries_fails_over_limit(self, client, sample_course, assert_max_queries):
+        """Test the fixture fails a block that exceeds its query budget"""
+        with pytest.raises(AssertionError, match="expected at most 0"):
+            with assert_max_queries(0):
+                client.get(f"/api/v1/courses/{sample_course['id']}")
+
+
+class TestQueryBudgets:
+    """Test relationship endpoints issue a fixed number of queries, whatever the row count"""
+
+    # Each budget includes one principal lookup for the bearer token
+
+    def test_course_with_students(self, client, admin_token, enrolled_course, assert_max_queries):
+        """Test a course roster loads its students in one extra query"""
+        with assert_max_queries(3):
+            response = client.get(f"/api/v1/courses/{enrolled_course['id']}/with-students",
+                                  headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert len(response.json()["data"]["enrollments"]) == 3
+
+    def test_course_enrollments(self, client, admin_token, enrolled_course, assert_max_queries):
+        """Test listing a course's enrollments does not query per enrollment"""
+        with assert_max_queries(3):
+            response = client.get(f"/api/v1/enrollments/courses/{enrolled_course['id']}",
+                                  headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 3
+
+    def test_enrollment_listing(self, client, admin_token, enrolled_course, assert_max_queries):
+        """Test the admin enrollment listing joins students and courses"""
+        with assert_max_queries(2):
+            response = client.get("/api/v1/enrollments", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert len(response.json()["data"]["items"]) == 3
+
+    def test_user_with_enrollments(self, client, admin_token, enrolled_student, assert_max_queries):
+        """Test a user's enrollments load with their courses in one extra query"""
+        with assert_max_queries(3):
+            response = client.get(f"/api/v1/users/{enrolled_student}/with-enrollments",
+                                  headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert len(response.json()["data"]["enrollments"]) == 3
+
+    def test_my_profile_with_enrollments(self, client, student_token, enrolled_student, assert_max_queries):
+        """Test the caller's profile with courses is query-bounded"""
+        with assert_max_queries(3):
+            response = client.get("/api/v1/users/me/with-enrollments",
+                                  headers={"Authorization": f"Bearer {student_token}"})
+        assert response.status_code == 200
+        assert {e["code"] for e in response.json()["data"]["enrollments"]} == {"C0", "C1", "C2"}
+
+    def test_my_enrollments(self, client, student_token, enrolled_student, assert_max_queries):
+        """Test the caller's enrollments load with their courses in the same query"""
+        with assert_max_queries(2):
+            response = client.get("/api/v1/enrollments/my-enrollments",
+                                  headers={"Authorization": f"Bearer {student_token}"})
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 3
@@ -0,0 +1,134 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from apps.common.passwords import PasswordHasher, password_hasher
+
+
+@pytest.fixture
+def user_lookups(db_session):
+    """Record SELECTs against the users table"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+class TestPrincipalCache:
+    """Test the authenticated-principal cache"""
+
+    def test_repeat_requests_skip_user_lookup(self, client, student_token, user_lookups):
+        """Test only the first authenticated request loads the user"""
+        from apps.common.security import principal_cache
+
+        headers = {"Authorization": f"Bearer {student_token}"}
+        for _ in range(3):
+            response = client.get("/api/v1/users/me", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["data"]["email"] == "student@test.com"
+
+        assert len(user_lookups) == 1
+        assert principal_cache.stats()["hits"] == 2
+
+    def test_cached_principal_can_be_updated(self, client, student_token):
+        """Test a cached principal is still a writable, session-bound user"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        client.get("/api/v1/users/me", headers=headers)
+
+        response = client.put("/api/v1/users/me", json={"name": "Renamed"}, headers=headers)
+        assert response.status_code == 200
+        assert client.get("/api/v1/users/me", headers=headers).json()["data"]["name"] == "Renamed"
+
+    def test_deactivation_invalidates_cache(self, client, student_token):
+        """Test a deactivated user is rejected on the very next request"""
+        headers = {"Authorization": f"Bearer {student_token}"}
+        client.get("/api/v1/users/me", headers=headers)
+
+        response = client.put("/api/v1/users/me", json={"is_active": False}, headers=headers)
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 403
+        assert "inactive" in response.json()["message"].lower()
+
+    def test_deleted_user_is_evicted(self, client, db_session, student_token):
+        """Test deleting a user drops it from the cache"""
+        from apps.common.security import principal_cache
+        from apps.users.models import User
+
+        headers = {"Authorization": f"Bearer {student_token}"}
+        client.get("/api/v1/users/me", headers=headers)
+        assert principal_cache.get("student@test.com") is not None
+
+        db_session.delete(db_session.query(User).filter(User.email == "student@test.com").one())
+        db_session.commit()
+
+        assert principal_cache.get("student@test.com") is None
+        assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+    def test_snapshot_is_json_without_password(self, client, student_token):
+        """Test the cached snapshot can be stored in Redis and omits the password hash"""
+        import orjson
+        from apps.common.security import principal_cache
+
+        headers = {"Authorization": f"Bearer {student_token}"}
+        client.get("/api/v1/users/me", headers=headers)
+        snapshot = principal_cache.get("student@test.com")
+
+        assert "hashed_password" not in snapshot
+        assert orjson.loads(orjson.dumps(snapshot)) == snapshot
+
+        response = client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["role"] == "student"
+
+
+class TestPasswordHasher:
+    """Test the bcrypt process pool"""
+
+    async def test_hash_and_verify_in_pool(self):
+        """Test hashes made in the pool verify in the pool"""
+        hasher = PasswordHasher(workers=1, queue_limit=4)
+        try:
+            hashed = await hasher.hash("password123")
+            assert await hasher.verify("password123", hashed)
+            assert not await hasher.verify("wrong", hashed)
+        finally:
+            hasher.shutdown()
+
+    async def test_saturated_pool_rejects(self):
+        """Test work beyond workers + queue_limit is refused with a 503"""
+        hasher = PasswordHasher(workers=1, queue_limit=0)
+        try:
+            busy = asyncio.ensure_future(hasher._run(time.sleep, 0.5))
+            await asyncio.sleep(0)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.hash("password123")
+            assert exc_info.value.status_code == 503
+            assert exc_info.value.headers["Retry-After"] == "1"
+            assert hasher.stats()["rejected"] == 1
+
+            await busy
+            assert hasher.stats()["in_flight"] == 0
+        finally:
+            hasher.shutdown()
+
+    def test_login_returns_503_when_saturated(self, client, student_token, monkeypatch):
+        """Test login surfaces pool backpressure as 503 with Retry-After"""
+        monkeypatch.setattr(password_hasher, "in_flight",
+                            password_hasher.workers + password_hasher.queue_limit)
+
+        response = client.post("/api/v1/auth/login", json={
+            "email": "student@test.com",
+            "password": "Password@123"
+        })
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,67 @@
+import pytest
+from apps.common.projections import course_rows
+from apps.courses.models import Course
+from apps.courses.schemas import course_serializer
+from apps.enrollments.models import Enrollment
+from apps.users.models import User
+
+
+@pytest.fixture
+def enrollment(client, student_token, sample_course):
+    """The student's enrollment in the sample course"""
+    response = client.post("/api/v1/enrollments", json={"course_id": sample_course["id"]},
+                           headers={"Authorization": f"Bearer {student_token}"})
+    assert response.status_code == 201
+    return response.json()["data"]
+
+
+class TestResponseShapes:
+    """Test schema serializers produce the same payloads as the models' to_dict()"""
+
+    def test_course(self, client, db_session, sample_course):
+        """Test a course serializes like Course.to_dict()"""
+        response = client.get(f"/api/v1/courses/{sample_course['id']}")
+        assert response.json()["data"] == db_session.get(Course, sample_course["id"]).to_dict()
+
+    def test_course_with_students(self, client, db_session, admin_token, enrollment):
+        """Test the roster nests each enrollment's student"""
+        response = client.get(f"/api/v1/courses/{enrollment['course_id']}/with-students",
+                              headers={"Authorization": f"Bearer {admin_token}"})
+        expected = db_session.get(Course, enrollment["course_id"]).to_dict(include_enrollments=True)
+        assert response.json()["data"] == expected
+        assert response.json()["data"]["enrollments"][0]["email"] == "student@test.com"
+
+    def test_user_with_enrollments(self, client, db_session, student_token, enrollment):
+        """Test a profile nests each enrollment's course"""
+        response = client.get("/api/v1/users/me/with-enrollments",
+                              headers={"Authorization": f"Bearer {student_token}"})
+        expected = db_session.get(User, enrollment["user_id"]).to_dict(include_enrollments=True)
+        assert response.json()["data"] == expected
+        assert "hashed_password" not in response.json()["data"]
+
+    def test_enrollments(self, client, db_session, student_token, enrollment):
+        """Test enrollments nest their student and course"""
+        expected = db_session.get(Enrollment, enrollment["id"]).to_dict()
+        assert enrollment == expected
+
+        response = client.get("/api/v1/enrollments/my-enrollments",
+                              headers={"Authorization": f"Bearer {student_token}"})
+        assert response.json()["data"] == [expected]
+        assert expected["user"]["role"] == "student"
+
+    def test_projected_rows(self, db_session, sample_course):
+        """Test projected rows serialize like ORM instances"""
+        row = course_rows(db_session).scalar()
+        assert course_serializer.one(row) == course_serializer.one(db_session.get(Course, sample_course["id"]))
+
+    def test_undeclared_keys_are_dropped(self, db_session, sample_course):
+        """Test only the schema's fields are written"""
+        row = {**course_rows(db_session).scalar(), "total": 1}
+        assert set(course_serializer.one(row)) == set(db_session.get(Course, sample_course["id"]).to_dict())
+
+    def test_expired_instance(self, db_session, sample_course):
+        """Test an expired instance is reloaded rather than serialized from a partial state"""
+        course = db_session.get(Course, sample_course["id"])
+        expected = course_serializer.one(course)
+        db_session.expire(course)
+        assert course_serializer.one(course) == expected
@@ -0,0 +1,119 @@
+import asyncio
+import httpx
+import pytest
+from apps.common.singleflight import SingleFlight
+from apps.courses.cache import catalog_flights
+from main import app
+
+
+@pytest.fixture
+def slow_flights(monkeypatch):
+    """Hold every coalesced course read open briefly so concurrent requests overlap"""
+    do = catalog_flights.do
+
+    async def slow_do(key, fn):
+        async def slow_fn():
+            await asyncio.sleep(0.05)
+            return await fn()
+        return await do(key, slow_fn)
+
+    monkeypatch.setattr(catalog_flights, "do", slow_do)
+    catalog_flights.reset()
+    yield catalog_flights
+    catalog_flights.reset()
+
+
+class TestSingleFlight:
+    """Test collapsing concurrent identical calls"""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test callers with the same key get the leader's result"""
+        flights = SingleFlight("test")
+        executions = []
+
+        async def load():
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": 1}
+
+        results = await asyncio.gather(*(flights.do("course:1", load) for _ in range(5)))
+        assert results == [{"id": 1}] * 5
+        assert len(executions) == 1
+        assert flights.snapshot() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+        # Nothing is kept once the call finishes
+        await flights.do("course:1", load)
+        assert len(executions) == 2
+
+    async def test_keys_are_separate(self):
+        """Test different keys run their own calls"""
+        flights = SingleFlight("test")
+
+        async def load(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        assert await asyncio.gather(flights.do(1, lambda: load(1)), flights.do(2, lambda: load(2))) == [1, 2]
+        assert flights.executions == 2
+
+    async def test_exceptions_are_shared(self):
+        """Test every waiting caller sees the leader's exception"""
+        flights = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise LookupError("missing")
+
+        results = await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, LookupError) for result in results)
+        assert flights.executions == 1
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test a caller going away leaves the shared call running"""
+        flights = SingleFlight("test")
+
+        async def load():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("key", load))
+        follower = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "done"
+
+
+class TestCourseCoalescing:
+    """Test the courses router coalesces identical reads"""
+
+    async def test_concurrent_course_reads(self, client, sample_course, slow_flights):
+        """Test simultaneous reads of one course run one query and all get the course"""
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            responses = await asyncio.gather(
+                *(http.get(f"/api/v1/courses/{sample_course['id']}") for _ in range(10)))
+
+        assert all(response.json()["data"] == sample_course for response in responses)
+        assert slow_flights.executions == 1
+        assert slow_flights.snapshot()["coalesced"] == 9
+
+    async def test_different_pages_are_not_coalesced(self, client, sample_course, slow_flights):
+        """Test requests for different parameters each run their own query"""
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            await asyncio.gather(http.get("/api/v1/courses?limit=1"), http.get("/api/v1/courses?limit=2"))
+        assert slow_flights.executions == 2
+
+    async def test_missing_course(self, client, slow_flights):
+        """Test coalesced callers all get the 404"""
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            responses = await asyncio.gather(*(http.get("/api/v1/courses/999") for _ in range(3)))
+        assert [response.status_code for response in responses] == [404] * 3
+        assert slow_flights.executions == 1
+
+    def test_metrics(self, client, admin_token, student_token):
+        """Test the admin metrics endpoint"""
+        response = client.get("/api/v1/admin/request-coalescing", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert set(response.json()["data"]["courses"]) == {"calls", "executions", "coalesced", "in_flight"}
+
+        response = client.get("/api/v1/admin/request-coalescing", headers={"Authorization": f"Bearer {student_token}"})
+        assert response.status_code == 403
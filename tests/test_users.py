@@ -141,3 +141,83 @@ class TestUserProfile:
         )
         assert response.status_code == 200
         assert response.json()["data"]["name"] == "Updated Name"
+
+
+class TestUserSearch:
+    """Test admin user search"""
+
+    @pytest.fixture
+    def people(self, client):
+        for name, email in [
+            ("Grace Hopper", "grace.hopper@navy.com"),
+            ("Ada Lovelace", "ada@analytical.com"),
+            ("Alan Turing", "alan.turing@bletchley.com"),
+        ]:
+            client.post(
+                "/api/v1/users/register",
+                json={"name": name, "email": email, "password": "Password@123", "role": "student"}
+            )
+
+    def search(self, client, admin_token, term, **params):
+        response = client.get(
+            "/api/v1/users",
+            params={"search": term, **params},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        return sorted(u["name"] for u in response.json()["data"]["items"])
+
+    def test_prefix_search_on_name_and_email(self, client, admin_token, people):
+        """Test word prefixes of names and email parts match"""
+        assert self.search(client, admin_token, "hop") == ["Grace Hopper"]
+        assert self.search(client, admin_token, "bletch") == ["Alan Turing"]
+        assert self.search(client, admin_token, "a") == ["Ada Lovelace", "Admin User", "Alan Turing"]
+
+    def test_all_words_must_match(self, client, admin_token, people):
+        """Test multi-word terms narrow the results"""
+        assert self.search(client, admin_token, "alan tur") == ["Alan Turing"]
+        assert self.search(client, admin_token, "alan hop") == []
+
+    def test_index_follows_profile_update(self, client, admin_token, student_token, people):
+        """Test renaming through update_my_profile reindexes the user"""
+        client.put(
+            "/api/v1/users/me",
+            json={"name": "Katherine Johnson"},
+            headers={"Authorization": f"Bearer {student_token}"}
+        )
+        assert self.search(client, admin_token, "kath") == ["Katherine Johnson"]
+        assert self.search(client, admin_token, "student u") == []
+
+    def test_substring_mode(self, client, admin_token, people):
+        """Test substring mode keeps the infix ilike behaviour"""
+        assert self.search(client, admin_token, "oppe", search_mode="substring") == ["Grace Hopper"]
+        assert self.search(client, admin_token, "oppe") == []
+
+    def test_rebuild_index(self, client, db_session, admin_token, people):
+        """Test the index can be regenerated from the users table"""
+        from apps.users.search import rebuild_user_search_index
+
+        assert rebuild_user_search_index(db_session) == 4
+        assert self.search(client, admin_token, "grace") == ["Grace Hopper"]
+
+    def test_deleted_user_leaves_no_tokens(self, client, db_session, people):
+        """Test deleting a user drops its search tokens"""
+        from apps.users.models import User, UserSearchToken
+
+        user = db_session.query(User).filter(User.email == "ada@analytical.com").one()
+        user_id = user.id
+        db_session.delete(user)
+        db_session.commit()
+        assert db_session.query(UserSearchToken).filter(UserSearchToken.user_id == user_id).count() == 0
+
+    def test_no_token_table_on_postgresql(self):
+        """Test create_all leaves the token table out where trigram indexes serve search"""
+        from sqlalchemy import create_mock_engine
+        from apps.config.database import Base
+
+        statements = []
+        engine = create_mock_engine(
+            "postgresql://", lambda sql, *a, **kw: statements.append(str(sql.compile(dialect=engine.dialect))))
+        Base.metadata.create_all(engine, checkfirst=False)
+        assert any("ix_users_name_trgm" in s for s in statements)
+        assert not any("user_search_tokens" in s for s in statements)